@@ -0,0 +1,241 @@
+# backend/admission.py
+"""
+Admission control for the expensive routes (/api/exams/<id>, /api/exam-progress,
+/api/submit-answers), per worker. Each route runs at most `limit` requests at once; up to
+`queue` more wait for a slot until ADMISSION_QUEUE_TIMEOUT_MS, and anything beyond that is
+answered at once with 503 and Retry-After instead of piling up on the connection pool.
+
+Under gthread a queued request still holds a worker thread, so the limited routes together
+never occupy more than ADMISSION_MAX_THREADS threads (GUNICORN_THREADS minus a reserve); the
+reserved threads keep health checks, auth and the cheap reads answering while the expensive
+routes are saturated. asgi.py's async routes hold no thread and use AsyncRouteLimit, sized to the
+asyncpg pool.
+"""
+
+import asyncio
+import threading
+import time
+from functools import wraps
+from flask import jsonify, current_app
+
+REJECTED_QUEUE_FULL = 'queue_full'
+REJECTED_TIMEOUT = 'timeout'
+
+class AdmissionRejected(Exception):
+    def __init__(self, route, reason):
+        super().__init__(f"{route}: {reason}")
+        self.route = route
+        self.reason = reason
+
+class RouteLimit:
+    """Concurrency limit and bounded wait queue for one route (thread-based)."""
+
+    def __init__(self, name, limit, queue, timeout, control):
+        self.name = name
+        self.limit = limit
+        self.queue = queue
+        self.timeout = timeout
+        self._control = control
+        self._slots = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = {REJECTED_QUEUE_FULL: 0, REJECTED_TIMEOUT: 0}
+
+    def acquire(self):
+        """Take a slot, waiting at most timeout seconds; raises AdmissionRejected otherwise."""
+        if self._slots.acquire(blocking=False):
+            if self._control.occupy():
+                return self._admitted(0.0)
+            self._slots.release()
+            raise self._rejected(REJECTED_QUEUE_FULL)
+
+        with self._lock:
+            if self.waiting >= self.queue or not self._control.occupy():
+                full = True
+            else:
+                full = False
+                self.waiting += 1
+        if full:
+            raise self._rejected(REJECTED_QUEUE_FULL)
+
+        start = time.perf_counter()
+        try:
+            acquired = self._slots.acquire(timeout=self.timeout)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        if not acquired:
+            self._control.vacate()
+            raise self._rejected(REJECTED_TIMEOUT)
+        # The thread stays occupied: it moved from the queue to a slot.
+        return self._admitted(time.perf_counter() - start)
+
+    def release(self):
+        with self._lock:
+            self.active -= 1
+        self._slots.release()
+        self._control.vacate()
+
+    def _admitted(self, waited):
+        with self._lock:
+            self.active += 1
+            self.admitted += 1
+        self._control.notify(self.name, 'admitted', waited)
+        return waited
+
+    def _rejected(self, reason):
+        with self._lock:
+            self.rejected[reason] += 1
+        self._control.notify(self.name, reason, None)
+        return AdmissionRejected(self.name, reason)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'limit': self.limit,
+                'queue': self.queue,
+                'active': self.active,
+                'waiting': self.waiting,
+                'admitted': self.admitted,
+                'rejected_queue_full': self.rejected[REJECTED_QUEUE_FULL],
+                'rejected_timeout': self.rejected[REJECTED_TIMEOUT]
+            }
+
+class AsyncRouteLimit(RouteLimit):
+    """RouteLimit for coroutines on one event loop; no thread is held while waiting."""
+
+    def __init__(self, name, limit, queue, timeout, control):
+        super().__init__(name, limit, queue, timeout, control)
+        self._async_slots = asyncio.Semaphore(limit)
+
+    async def acquire(self):
+        if not self._async_slots.locked():
+            await self._async_slots.acquire()
+            return self._admitted(0.0)
+        if self.waiting >= self.queue:
+            raise self._rejected(REJECTED_QUEUE_FULL)
+
+        self.waiting += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._async_slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            raise self._rejected(REJECTED_TIMEOUT)
+        finally:
+            self.waiting -= 1
+        return self._admitted(time.perf_counter() - start)
+
+    def release(self):
+        self.active -= 1
+        self._async_slots.release()
+
+class AdmissionControl:
+    """Per-worker RouteLimits for the routes wrapped with admit(), plus the shared thread cap."""
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._observers = []
+        self.limits = {}
+        self.async_limits = {}
+        self.occupied = 0
+        self.max_occupied = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('ADMISSION_ENABLED', True)
+        app.config.setdefault('ADMISSION_CONCURRENCY', 2)
+        app.config.setdefault('ADMISSION_QUEUE_SIZE', 4)
+        app.config.setdefault('ADMISSION_MAX_THREADS', 3)
+        app.config.setdefault('ADMISSION_ROUTE_LIMITS', {})
+        app.config.setdefault('ADMISSION_QUEUE_TIMEOUT_MS', 2000)
+        app.config.setdefault('ADMISSION_RETRY_AFTER_SECONDS', 2)
+        self.app = app
+        self.max_occupied = app.config['ADMISSION_MAX_THREADS']
+        metrics = app.extensions.get('metrics')
+        if metrics is not None:
+            self.add_observer(metrics.observe_admission)
+        app.extensions['admission'] = self
+
+    def add_observer(self, callback):
+        """Call callback(route, outcome, waited_seconds) for every admitted or rejected request."""
+        self._observers.append(callback)
+
+    def notify(self, route, outcome, waited):
+        for callback in self._observers:
+            callback(route, outcome, waited)
+
+    def occupy(self):
+        """Count one more thread in the limited routes, unless that would exceed the cap."""
+        with self._lock:
+            if self.occupied >= self.max_occupied:
+                return False
+            self.occupied += 1
+            return True
+
+    def vacate(self):
+        with self._lock:
+            self.occupied -= 1
+
+    def limit_for(self, route):
+        limit = self.limits.get(route)
+        if limit is None:
+            with self._lock:
+                limit = self.limits.get(route)
+                if limit is None:
+                    config = self.app.config
+                    limit = self.limits[route] = RouteLimit(
+                        route,
+                        config['ADMISSION_ROUTE_LIMITS'].get(route, config['ADMISSION_CONCURRENCY']),
+                        config['ADMISSION_QUEUE_SIZE'],
+                        config['ADMISSION_QUEUE_TIMEOUT_MS'] / 1000,
+                        self
+                    )
+        return limit
+
+    def add_async_limit(self, route, limit, queue):
+        """Register an AsyncRouteLimit for one of asgi.py's routes."""
+        self.async_limits[route] = AsyncRouteLimit(
+            route, limit, queue, self.app.config['ADMISSION_QUEUE_TIMEOUT_MS'] / 1000, self
+        )
+        return self.async_limits[route]
+
+    def stats(self):
+        return {
+            'threads_occupied': self.occupied,
+            'max_threads': self.max_occupied,
+            'routes': {name: limit.stats() for name, limit in self.limits.items()},
+            'async_routes': {name: limit.stats() for name, limit in self.async_limits.items()}
+        }
+
+def rejected_response():
+    response = jsonify({
+        'error': 'Service busy',
+        'message': 'Too many requests in progress, please retry shortly'
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(current_app.config['ADMISSION_RETRY_AFTER_SECONDS'])
+    return response
+
+def admit(route):
+    """Run the view only once it is admitted under the route's limit; otherwise answer 503."""
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            control = current_app.extensions.get('admission')
+            if control is None or not current_app.config['ADMISSION_ENABLED']:
+                return f(*args, **kwargs)
+            limit = control.limit_for(route)
+            try:
+                limit.acquire()
+            except AdmissionRejected as rejected:
+                current_app.logger.warning(f"Shedding {route} request: {rejected.reason}")
+                return rejected_response()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                limit.release()
+        return decorated
+    return decorator
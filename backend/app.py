@@ -1,77 +1,118 @@
 # backend/app.py
 
-from flask import Flask, jsonify
+from startup import StartupTimer
+
+from flask import Flask
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from authlib.integrations.flask_client import OAuth
 from config import Config
+from compression import Compress
+from request_timing import RequestTiming
+from metrics import Metrics
+from slow_queries import SlowQueryLog
+from admission import AdmissionControl
+from json_provider import make_json_provider
+from db_pool import install_idle_pre_ping
+from db_routing import RoutingSession, PIN_HEADER, init_read_your_writes
+from cache import ByteLRUCache, cached_body_size, register_cache
 from werkzeug.middleware.proxy_fix import ProxyFix
-from sqlalchemy import text
 import os
 
-db = SQLAlchemy()
-oauth = OAuth()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 def create_app():
-    flask_app = Flask(__name__)
-    flask_app.config.from_object(Config)
-    
-    flask_app.secret_key = flask_app.config['JWT_SECRET_KEY']
-    
-    flask_app.wsgi_app = ProxyFix(
-        flask_app.wsgi_app,
-        x_for=1,
-        x_proto=1,
-        x_host=1,
-        x_prefix=1
-    )
+    timer = StartupTimer()
+
+    with timer.phase('config'):
+        flask_app = Flask(__name__)
+        flask_app.config.from_object(Config)
+        flask_app.extensions['startup'] = timer
+        flask_app.json = make_json_provider(flask_app)
+        
+        flask_app.secret_key = flask_app.config['JWT_SECRET_KEY']
     
-    origins = flask_app.config.get('CORS_ORIGINS', '').split(',') if isinstance(flask_app.config.get('CORS_ORIGINS'), str) else flask_app.config.get('CORS_ORIGINS', [])
-    CORS(flask_app, resources={
-        r"/api/*": {
-            "origins": origins,
-            "supports_credentials": True,
-            "allow_headers": ["Content-Type", "Authorization"],
-            "expose_headers": ["Content-Type", "Authorization"],
-            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
-        }
-    })
+    with timer.phase('middleware'):
+        # after_request hooks run in reverse: timing, then compression, then metrics on the final body.
+        Metrics(flask_app)
+        Compress(flask_app)
+        RequestTiming(flask_app)
+        
+        flask_app.wsgi_app = ProxyFix(
+            flask_app.wsgi_app,
+            x_for=1,
+            x_proto=1,
+            x_host=1,
+            x_prefix=1
+        )
+        
+        origins = flask_app.config.get('CORS_ORIGINS', '').split(',') if isinstance(flask_app.config.get('CORS_ORIGINS'), str) else flask_app.config.get('CORS_ORIGINS', [])
+        CORS(flask_app, resources={
+            r"/api/*": {
+                "origins": origins,
+                "supports_credentials": True,
+                "allow_headers": ["Content-Type", "Authorization", "Idempotency-Key", PIN_HEADER],
+                "expose_headers": ["Content-Type", "Authorization", "Idempotent-Replayed", "Retry-After", PIN_HEADER],
+                "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
+            }
+        })
     
-    db.init_app(flask_app)
-    oauth.init_app(flask_app)
+    with timer.phase('extensions'):
+        db.init_app(flask_app)
+        init_read_your_writes(flask_app)
+        SlowQueryLog(flask_app)
+        AdmissionControl(flask_app)
+        flask_app.extensions['exam_cache'] = register_cache(
+            'exam_payloads',
+            ByteLRUCache(flask_app.config['EXAM_CACHE_MAX_BYTES'], sizeof=cached_body_size)
+        )
     
     with flask_app.app_context():
-        from models import Provider, Exam, Topic, UserPreference, FavoriteQuestion, UserAnswer, ExamAttempt, ExamVisit
-        from auth import User, init_oauth, auth_bp
-        
-        init_oauth(flask_app)
+        for engine in db.engines.values():
+            install_idle_pre_ping(engine, flask_app.config['DB_PRE_PING_IDLE_SECONDS'])
         
-        try:
-            db.create_all()
-        except Exception as e:
-            flask_app.logger.error(f"Error creating database tables: {str(e)}")
+        with timer.phase('import_models'):
+            from models import Provider, Exam, Topic, UserPreference, FavoriteQuestion, UserAnswer, ExamAttempt, ExamAttemptResult, ExamVisit, ExamScoreTally, QuestionStat, QuestionStatShard, PurgeJob, SubmissionIdempotency
+            from auth import User, auth_bp
+            from routes import routes_bp
+            from purge import PurgeQueue
+            from question_stats import QuestionStats
+            from idempotency import IdempotencyStore
+            from health import HealthMonitor, health_bp
+            from scoring import answer_key_size
         
-        flask_app.register_blueprint(auth_bp)
+        PurgeQueue(flask_app)
+        QuestionStats(flask_app)
+        IdempotencyStore(flask_app)
+        HealthMonitor(flask_app)
+        flask_app.extensions['answer_key_cache'] = register_cache(
+            'answer_keys',
+            ByteLRUCache(flask_app.config['ANSWER_KEY_CACHE_MAX_BYTES'], sizeof=answer_key_size)
+        )
         
-        from routes import routes_bp
-        flask_app.register_blueprint(routes_bp)
+        # OAuth clients are registered lazily on the first login request, see auth.get_oauth().
+        if flask_app.config['CREATE_TABLES_ON_STARTUP']:
+            with timer.phase('create_tables'):
+                try:
+                    db.create_all()
+                except Exception as e:
+                    flask_app.logger.error(f"Error creating database tables: {str(e)}")
         
-        @flask_app.route('/health')
-        def health_check():
-            try:
-                db.session.execute(text('SELECT 1'))
-                return jsonify({
-                    'status': 'healthy',
-                    'database': 'connected',
-                    'env': os.getenv('FLASK_ENV', 'production')
-                }), 200
-            except Exception as e:
-                flask_app.logger.error(f"Health check failed: {str(e)}")
-                return jsonify({
-                    'status': 'unhealthy',
-                    'database': str(e),
-                    'env': os.getenv('FLASK_ENV', 'production')
-                }), 500
+        with timer.phase('register_blueprints'):
+            flask_app.register_blueprint(auth_bp)
+            flask_app.register_blueprint(routes_bp)
+            flask_app.register_blueprint(health_bp)
+            flask_app.register_blueprint(health_bp, url_prefix='/api', name='api_health')
+    
+    @flask_app.before_request
+    def record_first_request():
+        if timer.mark_first_request():
+            flask_app.logger.info(
+                f"startup_to_first_request_seconds={timer.seconds_to_first_request:.3f} "
+                f"phases={timer.summary()['phases']}"
+            )
+    
+    timer.mark_ready()
+    flask_app.logger.info(f"startup_to_ready_seconds={timer.seconds_to_ready:.3f}")
     
     return flask_app
 
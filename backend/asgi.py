@@ -0,0 +1,469 @@
+# backend/asgi.py
+"""
+ASGI entry point for SERVER_MODE=async (see scripts/init-backend.sh):
+
+    gunicorn --worker-class uvicorn.workers.UvicornWorker asgi:app
+
+The dashboard reads /api/providers, /api/exams/<id> and /api/exam-progress are almost all
+database wait, so here they run on the event loop with an asyncpg engine and the same models
+and queries as routes.py; a worker keeps serving other requests while they wait. Every other
+route is the Flask app, mounted through a2wsgi's WSGIMiddleware on a pool of ASYNC_WSGI_THREADS
+threads, so Flask requests still run side by side as under gthread (asgiref's WsgiToAsgi would
+run them one at a time on a single thread per worker).
+
+The async routes bypass Flask's middleware (metrics, Server-Timing, on-the-fly compression);
+responses are compressed here with the same settings and cached variants.
+"""
+
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime
+from urllib.parse import unquote
+
+import jwt
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from sqlalchemy import select, func, exists
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import selectinload
+from sqlalchemy.pool import NullPool
+from werkzeug.http import parse_accept_header
+
+from admission import AdmissionRejected
+from singleflight import AsyncGroup, SingleFlightTimeout, register_group
+from app import app as flask_app
+from auth import User
+from cache import CachedBody
+from compression import available_encodings, negotiate_encoding, compress_body, compress_variants
+from db_routing import PIN_HEADER, is_pinned, pin_to_primary, pin_token
+from exam_progress import exam_progress_query, group_by_provider, STATUSES
+from models import Provider, Exam, ExamRevision, ExamVisit, UserPreference
+from pagination import encode_cursor, decode_cursor, TTLValue
+from purge import active_jobs_query, hidden_conditions, tombstoned_condition
+from routes import build_exam_payload, serialize_provider
+
+config = flask_app.config
+
+def async_url(url):
+    """The asyncpg form of a psycopg2 DATABASE_URL; sslmode becomes asyncpg's ssl argument."""
+    url = make_url(url).set(drivername='postgresql+asyncpg')
+    sslmode = url.query.get('sslmode')
+    return url.difference_update_query(['sslmode']), ({'ssl': sslmode} if sslmode else {})
+
+def async_engine_options(connect_args):
+    """Pool settings for one event loop, mirroring config._engine_options for DB_PGBOUNCER_MODE."""
+    options = {'connect_args': {'timeout': 60, **connect_args}}
+    pgbouncer_mode = os.getenv('DB_PGBOUNCER_MODE', '').lower()
+    if pgbouncer_mode:
+        # Transaction pooling cannot keep prepared statements across transactions.
+        options['connect_args']['statement_cache_size'] = 0
+    else:
+        options['connect_args']['server_settings'] = {'statement_timeout': '60000'}
+    if pgbouncer_mode == 'null':
+        options['poolclass'] = NullPool
+        return options
+    options.update({
+        'pool_size': config['ASYNC_DB_POOL_SIZE'],
+        'max_overflow': config['ASYNC_DB_MAX_OVERFLOW'] if pgbouncer_mode != 'small' else 0,
+        'pool_timeout': config['SQLALCHEMY_ENGINE_OPTIONS'].get('pool_timeout', 60),
+        'pool_recycle': config['SQLALCHEMY_ENGINE_OPTIONS'].get('pool_recycle', 1800),
+        'pool_pre_ping': True
+    })
+    return options
+
+def create_engine_for(url):
+    url, connect_args = async_url(url)
+    return create_async_engine(url, **async_engine_options(connect_args))
+
+primary_engine = create_engine_for(config['SQLALCHEMY_DATABASE_URI'])
+replica_engine = create_engine_for(config['SQLALCHEMY_REPLICA_URL']) if config['SQLALCHEMY_REPLICA_URL'] else None
+PrimarySession = async_sessionmaker(primary_engine, expire_on_commit=False)
+ReplicaSession = async_sessionmaker(replica_engine, expire_on_commit=False) if replica_engine else PrimarySession
+
+def read_session(primary=False):
+    """Replica session for read-only routes; primary for a user inside the read-your-writes window."""
+    return PrimarySession() if primary else ReplicaSession()
+
+def json_response(request, obj, status_code=200):
+    """A jsonify()-identical body, compressed like compression.Compress would."""
+    body = flask_app.json.dumps_bytes(obj) + b'\n'
+    headers = {'Vary': 'Accept-Encoding'}
+    encoding = None
+    if config['COMPRESS_ENABLED'] and len(body) >= config['COMPRESS_MIN_SIZE']:
+        encoding = negotiate_encoding(parse_accept_header(request.headers.get('accept-encoding')))
+    if encoding is not None:
+        body = compress_body(body, encoding, config['COMPRESS_GZIP_LEVEL'], config['COMPRESS_BROTLI_QUALITY'])
+        headers['Content-Encoding'] = encoding
+    return Response(body, status_code=status_code, headers=headers, media_type='application/json')
+
+def error_response(request, status_code, error, message=None):
+    body = {'error': error}
+    if message is not None:
+        body['message'] = message
+    return json_response(request, body, status_code)
+
+def token_user_id(request):
+    """(user_id, None) for a valid bearer token, else (None, error response), as routes.require_auth."""
+    auth_header = request.headers.get('authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return None, error_response(request, 401, 'No token provided')
+    try:
+        payload = jwt.decode(auth_header.split(' ')[1], config['JWT_SECRET_KEY'], algorithms=['HS256'])
+    except jwt.ExpiredSignatureError:
+        return None, error_response(request, 401, 'Token expired')
+    except jwt.InvalidTokenError:
+        return None, error_response(request, 401, 'Invalid token')
+    return payload['user_id'], None
+
+async def load_user(request, session, user_id):
+    """(user, None), or (None, 404 response) when the token's user does not exist."""
+    user = await session.get(User, user_id)
+    if user is None and replica_engine is not None:
+        # A just-created account may not have reached the replica yet.
+        async with PrimarySession() as primary:
+            user = await primary.get(User, user_id)
+    if user is None:
+        return None, error_response(request, 404, 'User not found')
+    return user, None
+
+def int_arg(args, name):
+    """Like Flask's request.args.get(name, type=int): None when missing or not an int."""
+    try:
+        return int(args[name])
+    except (KeyError, ValueError):
+        return None
+
+def provider_total():
+    total = flask_app.extensions.get('provider_total')
+    if total is None:
+        total = flask_app.extensions.setdefault('provider_total', TTLValue(config['PROVIDER_TOTAL_CACHE_SECONDS']))
+    return total
+
+async_exam_loads = register_group(AsyncGroup('exam_payloads_async'))
+async_catalog_loads = register_group(AsyncGroup('catalog_async'))
+
+def busy_response(request):
+    """admission.rejected_response for the async routes."""
+    response = error_response(request, 503, 'Service busy', 'Too many requests in progress, please retry shortly')
+    response.headers['Retry-After'] = str(config['ADMISSION_RETRY_AFTER_SECONDS'])
+    return response
+
+async def get_providers(request):
+    """Async twin of routes.get_providers, with the same three pagination modes."""
+    args = request.query_params
+    limit, page, per_page = int_arg(args, 'limit'), int_arg(args, 'page'), int_arg(args, 'per_page')
+
+    if limit is not None:
+        limit = max(1, min(limit, config['PROVIDERS_MAX_PAGE_SIZE']))
+        cursor = args.get('cursor')
+        after_id = None
+        if cursor:
+            try:
+                after_id = int(decode_cursor(cursor, required_keys=('id',))['id'])
+            except (ValueError, TypeError):
+                return error_response(request, 400, 'Invalid cursor')
+        key, load = ('cursor', after_id, limit), lambda: provider_keyset_page(after_id, limit)
+    elif page is None or per_page is None:
+        key, load = ('all',), all_providers
+    else:
+        key, load = ('page', page, per_page), lambda: provider_offset_page(page, per_page)
+
+    try:
+        result = await async_catalog_loads.do(key, load, config['SINGLEFLIGHT_TIMEOUT_SECONDS'])
+    except SingleFlightTimeout:
+        return busy_response(request)
+
+    if limit is not None and args.get('include_total', 'false').lower() == 'true':
+        total = provider_total()
+        count = total.cached()
+        if count is None:
+            async with read_session() as session:
+                count = await session.scalar(select(func.count(Provider.id)))
+            total.set(count)
+        result = {**result, 'total': count}
+    return json_response(request, result)
+
+def provider_query():
+    return select(Provider).options(selectinload(Provider.exams))
+
+async def provider_keyset_page(after_id, limit):
+    query = provider_query()
+    if after_id is not None:
+        query = query.where(Provider.id > after_id)
+    async with read_session() as session:
+        providers = (await session.execute(query.order_by(Provider.id).limit(limit + 1))).scalars().all()
+    has_more = len(providers) > limit
+    providers = providers[:limit]
+    return {
+        'providers': [serialize_provider(provider) for provider in providers],
+        'next_cursor': encode_cursor({'id': providers[-1].id}) if has_more else None,
+        'has_more': has_more,
+        'limit': limit
+    }
+
+async def all_providers():
+    async with read_session() as session:
+        providers = (await session.execute(provider_query())).scalars().all()
+    return {
+        'providers': [serialize_provider(provider) for provider in providers],
+        'total': len(providers),
+        'pages': 1,
+        'current_page': 1
+    }
+
+async def provider_offset_page(page, per_page):
+    # Same clamping as Flask-SQLAlchemy's paginate(error_out=False).
+    offset_page = max(page, 1)
+    per_page = per_page if per_page > 0 else 20
+    async with read_session() as session:
+        total = await session.scalar(select(func.count(Provider.id)))
+        providers = (await session.execute(
+            provider_query().order_by(Provider.id).offset((offset_page - 1) * per_page).limit(per_page)
+        )).scalars().all()
+    return {
+        'providers': [serialize_provider(provider) for provider in providers],
+        'total': total,
+        'pages': -(-total // per_page),
+        'current_page': page
+    }
+
+def build_exam_body(exam, provider_name):
+    """routes.get_exam_body's cache-miss path: serialize and pre-compress (CPU-bound, run off the loop)."""
+    body = flask_app.json.dumps_bytes(build_exam_payload(exam, provider_name)) + b'\n'
+    variants = {}
+    if config['COMPRESS_ENABLED'] and len(body) >= config['COMPRESS_MIN_SIZE']:
+        variants = compress_variants(body, config['COMPRESS_GZIP_LEVEL'], config['COMPRESS_BROTLI_QUALITY'])
+    return CachedBody(body, variants)
+
+async def get_exam_body(session, exam, provider_name, primary=False):
+    """Serialized exam payload from the same per-worker cache routes.get_exam_body uses."""
+    cache = flask_app.extensions.get('exam_cache')
+    version = await session.scalar(select(ExamRevision.version).where(ExamRevision.exam_id == exam.id)) or 0
+    key = (exam.id, version)
+    entry = cache.get(key) if cache is not None else None
+    if entry is None:
+        # Concurrent misses wait for one load, which reads from the same side as this session.
+        entry = await async_exam_loads.do(
+            key,
+            lambda: load_exam_body(cache, key, exam.id, provider_name, primary),
+            config['SINGLEFLIGHT_TIMEOUT_SECONDS']
+        )
+    return entry
+
+async def load_exam_body(cache, key, exam_id, provider_name, primary):
+    entry = cache.get(key) if cache is not None else None
+    if entry is not None:
+        return entry
+    async with read_session(primary) as session:
+        exam = (await session.execute(
+            select(Exam).options(selectinload(Exam.topics)).where(Exam.id == exam_id)
+        )).scalar_one()
+    entry = await run_in_threadpool(build_exam_body, exam, provider_name)
+    if cache is not None:
+        cache.put(key, entry)
+    return entry
+
+async def track_visit(user_id, exam_id):
+    """Record the visit and last visited exam on the primary, as routes.get_exam does."""
+    async with PrimarySession() as session:
+        jobs = (await session.execute(active_jobs_query(user_id))).scalars().all()
+        visit = (await session.execute(select(ExamVisit).where(
+            ExamVisit.user_id == user_id,
+            ExamVisit.exam_id == exam_id
+        ))).scalars().first()
+        if visit is not None and jobs and await session.scalar(select(exists().where(
+                ExamVisit.id == visit.id, tombstoned_condition(jobs, ExamVisit)))):
+            # See purge.discard_if_tombstoned: start fresh instead of updating a row being purged.
+            await session.delete(visit)
+            await session.flush()
+            visit = None
+
+        if visit is None:
+            session.add(ExamVisit(user_id=user_id, exam_id=exam_id))
+        else:
+            visit.last_visit_date = datetime.utcnow()
+
+        preference = (await session.execute(
+            select(UserPreference).where(UserPreference.user_id == user_id)
+        )).scalars().first()
+        if preference:
+            preference.last_visited_exam = exam_id
+        else:
+            session.add(UserPreference(user_id=user_id, last_visited_exam=exam_id))
+        await session.commit()
+    return pin_to_primary(user_id, config['DB_READ_YOUR_WRITES_SECONDS'])
+
+async def get_exam(request):
+    """Async twin of routes.get_exam."""
+    exam_id = request.path_params['exam_id']
+    if exam_id == 'undefined' or '-' not in exam_id:
+        return error_response(request, 400, 'Bad request', 'Invalid exam ID')
+
+    exam_id = unquote(exam_id)
+    provider_name, exam_details = exam_id.split('-', 1)
+    exam_code, exam_title = exam_details.split(': ', 1) if ': ' in exam_details else ('', exam_details)
+
+    user_id, error = token_user_id(request)
+    if error is not None:
+        return error
+
+    primary = is_pinned(user_id, request.headers.get(PIN_HEADER), config['JWT_SECRET_KEY'])
+    async with read_session(primary) as session:
+        user, error = await load_user(request, session, user_id)
+        if error is not None:
+            return error
+
+        provider = (await session.execute(select(Provider).where(Provider.name == provider_name))).scalars().first()
+        if not provider:
+            return error_response(request, 404, 'Not found', '404 Not Found: Provider not found')
+
+        exam = (await session.execute(select(Exam).where(
+            Exam.provider_id == provider.id,
+            Exam.id == exam_id
+        ))).scalars().first()
+        if not exam:
+            title = f"{exam_code}: {exam_title}" if exam_code else exam_title
+            exam = (await session.execute(select(Exam).where(
+                Exam.provider_id == provider.id,
+                Exam.title == title
+            ))).scalars().first()
+        if not exam:
+            return error_response(request, 404, 'Not found', '404 Not Found: Exam not found')
+
+        try:
+            exam_body = await get_exam_body(session, exam, provider.name, primary)
+        except SingleFlightTimeout:
+            return busy_response(request)
+
+    pinned_until = None
+    try:
+        pinned_until = await track_visit(user.id, exam.id)
+    except Exception as e:
+        flask_app.logger.error(f"Error tracking exam visit: {str(e)}")
+
+    variants = exam_body.variants
+    encoding = parse_accept_header(request.headers.get('accept-encoding')).best_match(
+        [e for e in available_encodings() if e in variants]
+    )
+    headers = {'Vary': 'Accept-Encoding'}
+    if pinned_until is not None:
+        headers[PIN_HEADER] = pin_token(user.id, pinned_until, config['JWT_SECRET_KEY'])
+    if encoding is not None:
+        headers['Content-Encoding'] = encoding
+    return Response(variants[encoding] if encoding else exam_body.identity, headers=headers, media_type='application/json')
+
+async def get_exam_progress(request):
+    """Async twin of routes.get_exam_progress, on the primary like the sync route."""
+    args = request.query_params
+    try:
+        provider_names = [
+            name.strip()
+            for value in args.getlist('provider')
+            for name in value.split(',') if name.strip()
+        ]
+        status = args.get('status')
+        if status and status not in STATUSES:
+            return error_response(request, 400, f"Invalid status, expected one of: {', '.join(STATUSES)}")
+
+        limit = int_arg(args, 'limit')
+        after = None
+        if limit is not None:
+            limit = max(1, min(limit, config['EXAM_PROGRESS_MAX_PAGE_SIZE']))
+            cursor = args.get('cursor')
+            if cursor:
+                try:
+                    position = decode_cursor(cursor, required_keys=('sort_key', 'id'))
+                    after = (float(position['sort_key']), str(position['id']))
+                except (ValueError, TypeError):
+                    return error_response(request, 400, 'Invalid cursor')
+
+        user_id, error = token_user_id(request)
+        if error is not None:
+            return error
+        async with PrimarySession() as session:
+            user, error = await load_user(request, session, user_id)
+            if error is not None:
+                return error
+            jobs = (await session.execute(active_jobs_query(user.id))).scalars().all()
+            rows = (await session.execute(exam_progress_query(
+                user.id,
+                provider_names=provider_names or None,
+                status=status,
+                after=after,
+                limit=limit + 1 if limit is not None else None,
+                visibility=lambda model: hidden_conditions(jobs, model)
+            ))).all()
+
+        if limit is None:
+            return json_response(request, {'providers': group_by_provider(rows)})
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return json_response(request, {
+            'providers': group_by_provider(rows),
+            'next_cursor': encode_cursor({'sort_key': rows[-1].sort_key, 'id': rows[-1].id}) if has_more else None,
+            'has_more': has_more,
+            'limit': limit
+        })
+
+    except Exception as e:
+        flask_app.logger.error(f"Error in get_exam_progress: {str(e)}")
+        return error_response(request, 500, 'Internal server error',
+                              str(e) if flask_app.debug else 'An unexpected error occurred')
+
+def admitted(route, endpoint):
+    """
+    admission.admit for an async route. Both limited routes share the asyncpg pool, so each may
+    run on half its connections, with as many waiting; past that, 503 with Retry-After.
+    """
+    capacity = config['ASYNC_DB_POOL_SIZE'] + config['ASYNC_DB_MAX_OVERFLOW']
+    limit = flask_app.extensions['admission'].add_async_limit(route, max(1, capacity // 2), capacity)
+
+    async def handler(request):
+        if not config['ADMISSION_ENABLED']:
+            return await endpoint(request)
+        try:
+            await limit.acquire()
+        except AdmissionRejected as rejected:
+            flask_app.logger.warning(f"Shedding {route} request: {rejected.reason}")
+            return busy_response(request)
+        try:
+            return await endpoint(request)
+        finally:
+            limit.release()
+    return handler
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await primary_engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+
+def cors_middleware():
+    """Flask-CORS settings from app.py for the async routes; preflights still reach Flask."""
+    origins = config.get('CORS_ORIGINS', '')
+    return [Middleware(
+        CORSMiddleware,
+        allow_origins=origins.split(',') if isinstance(origins, str) else origins,
+        allow_credentials=True,
+        allow_methods=['GET'],
+        allow_headers=['Content-Type', 'Authorization', PIN_HEADER],
+        expose_headers=['Content-Type', 'Authorization', 'Retry-After', PIN_HEADER]
+    )]
+
+app = Starlette(
+    routes=[
+        Route('/api/providers', get_providers, methods=['GET'], middleware=cors_middleware()),
+        Route('/api/exams/{exam_id}', admitted('exam', get_exam), methods=['GET'], middleware=cors_middleware()),
+        Route('/api/exam-progress', admitted('exam_progress', get_exam_progress), methods=['GET'], middleware=cors_middleware()),
+        Mount('/', app=WSGIMiddleware(flask_app, workers=config['ASYNC_WSGI_THREADS']))
+    ],
+    lifespan=lifespan
+)
@@ -0,0 +1,130 @@
+# backend/attempt_results.py
+
+from sqlalchemy import select, func, tuple_
+from app import db
+from models import Topic, ExamAttemptResult, ExamRevision
+
+def bitmap_to_int(bitmap):
+    """LSB-first bitmap as an int: bit i of the result is question ordinal i."""
+    return int.from_bytes(bitmap, 'little')
+
+def int_to_bitmap(bits, question_count):
+    return bits.to_bytes((question_count + 7) // 8, 'little')
+
+def set_ordinals(bits):
+    """Ordinals of the set bits, ascending."""
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+def question_ids(layout):
+    """Question id ("T<topic> Q<n>") for every ordinal of a layout."""
+    return [f"T{topic_number} Q{index + 1}" for topic_number, count in layout for index in range(count)]
+
+def ordinal_index(layout):
+    """"T<topic> Q<n>" -> ordinal, the inverse of question_ids."""
+    return {question_id: ordinal for ordinal, question_id in enumerate(question_ids(layout))}
+
+def parse_question_id(question_id):
+    """"T3 Q17" -> (3, 17); None for anything else."""
+    try:
+        topic_part, question_part = question_id.split(' ')
+        return int(topic_part[1:]), int(question_part[1:])
+    except (AttributeError, ValueError):
+        return None
+
+def decode_incorrect(layout, bitmap):
+    """The incorrect_questions list a bitmap stands for, in grading order."""
+    if not any(bitmap):
+        return []
+    ids = question_ids(layout)
+    return [ids[ordinal] for ordinal in set_ordinals(bitmap_to_int(bitmap)) if ordinal < len(ids)]
+
+def serialize_topic_scores(topic_scores):
+    return [
+        {'topic': topic_number, 'correct': correct, 'total': total}
+        for topic_number, correct, total in topic_scores
+    ]
+
+def results_for(attempts):
+    """attempt id -> ExamAttemptResult for the attempts that have one."""
+    ids = [attempt.id for attempt in attempts]
+    if not ids:
+        return {}
+    return {result.attempt_id: result for result in ExamAttemptResult.query.filter(ExamAttemptResult.attempt_id.in_(ids))}
+
+def incorrect_questions(attempt, result=None):
+    """An attempt's wrong answers in the original list shape, from its bitmap when it has one."""
+    if result is None:
+        return attempt.incorrect_questions or []
+    return decode_incorrect(result.layout, result.incorrect_bitmap)
+
+def diff_attempts(before, before_result, after, after_result):
+    """
+    Questions fixed (wrong before, right after) and broken (right before, wrong after) between
+    two attempts of the same exam. With bitmaps over the same layout this is two bitwise
+    operations; otherwise (exam content changed, or attempts stored before bitmaps) the
+    question id lists are compared.
+    """
+    if before_result is not None and after_result is not None and before_result.layout == after_result.layout:
+        ids = question_ids(after_result.layout)
+        before_bits = bitmap_to_int(before_result.incorrect_bitmap)
+        after_bits = bitmap_to_int(after_result.incorrect_bitmap)
+        fixed = [ids[ordinal] for ordinal in set_ordinals(before_bits & ~after_bits)]
+        broken = [ids[ordinal] for ordinal in set_ordinals(after_bits & ~before_bits)]
+        still_incorrect = bin(before_bits & after_bits).count('1')
+    else:
+        before_ids = incorrect_questions(before, before_result)
+        after_ids = incorrect_questions(after, after_result)
+        before_set, after_set = set(before_ids), set(after_ids)
+        fixed = [question_id for question_id in before_ids if question_id not in after_set]
+        broken = [question_id for question_id in after_ids if question_id not in before_set]
+        still_incorrect = len(before_set & after_set)
+
+    return {
+        'fixed': fixed,
+        'broken': broken,
+        'still_incorrect': still_incorrect
+    }
+
+def changed_topics(exam_id, result, topic_numbers):
+    """
+    The topic_numbers whose content may no longer be what result was graded against. With the
+    exam revision recorded on the result this is one primary-key lookup: any bump since means
+    every topic asked about may have changed. Results from before revisions were recorded fall
+    back to comparing question counts, reading only those topics.
+    """
+    if result is None or not topic_numbers:
+        return set()
+    if result.revision is not None:
+        current = db.session.query(ExamRevision.version).filter_by(exam_id=exam_id).scalar() or 0
+        return set() if current == result.revision else set(topic_numbers)
+
+    counts = dict(db.session.execute(
+        select(Topic.number, func.json_array_length(Topic.data)).where(
+            Topic.exam_id == exam_id,
+            Topic.number.in_(sorted(topic_numbers))
+        )
+    ).all())
+    graded = dict(map(tuple, result.layout))
+    return {number for number in topic_numbers if counts.get(number) != graded.get(number)}
+
+def question_bodies(exam_id, positions):
+    """
+    {(topic_number, question_number): question} for 1-based positions of an exam, without
+    loading whole exams: only topics holding a requested question are read, and their arrays
+    are unnested in SQL (json_array_elements WITH ORDINALITY) so just the matching elements
+    come back.
+    """
+    if not positions:
+        return {}
+    elements = func.json_array_elements(Topic.data).table_valued('value', with_ordinality='ordinality').render_derived()
+    rows = db.session.execute(
+        select(Topic.number, elements.c.ordinality, elements.c.value).select_from(Topic).join(elements, db.true()).where(
+            Topic.exam_id == exam_id,
+            Topic.number.in_(sorted({number for number, _ in positions})),
+            tuple_(Topic.number, elements.c.ordinality).in_(list(positions))
+        )
+    ).all()
+    return {(number, ordinality): value for number, ordinality, value in rows}
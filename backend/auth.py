@@ -4,11 +4,14 @@ from flask import Blueprint, jsonify, request, redirect, current_app, url_for, s
 import jwt
 from datetime import datetime, timedelta
 import os
-from app import db, oauth
+from app import db
 from urllib.parse import urljoin, urlparse
 import logging
 import traceback
 import secrets
+import threading
+
+_oauth_lock = threading.Lock()
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -45,33 +48,60 @@ def validate_url(url):
         url = f"https://{url}"
     return url.rstrip('/').strip()
 
-def init_oauth(app):
+def get_oauth():
+    """Return the OAuth registry, importing authlib and registering clients on first use"""
+    oauth = current_app.extensions.get('oauth')
+    if oauth is not None:
+        return oauth
+    
+    with _oauth_lock:
+        oauth = current_app.extensions.get('oauth')
+        if oauth is None:
+            from authlib.integrations.flask_client import OAuth
+            
+            app = current_app._get_current_object()
+            oauth = OAuth(app)
+            init_oauth(app, oauth)
+            app.extensions['oauth'] = oauth
+    return oauth
+
+def init_oauth(app, oauth):
     """Initialize OAuth with GitHub and Google"""
+    from oidc_cache import outbound_pool, OpenIDConfiguration, PooledOAuth2App, OpenIDApp
+    
     try:
-        oauth.register(
+        pool = outbound_pool()
+        github = oauth.register(
             name='github',
             client_id=app.config['GITHUB_CLIENT_ID'],
             client_secret=app.config['GITHUB_CLIENT_SECRET'],
-            access_token_url='https://github.com/login/oauth/access_token',
-            authorize_url='https://github.com/login/oauth/authorize',
-            api_base_url='https://api.github.com/',
-            client_kwargs={'scope': 'user:email'}
+            access_token_url=app.config['GITHUB_ACCESS_TOKEN_URL'],
+            authorize_url=app.config['GITHUB_AUTHORIZE_URL'],
+            api_base_url=app.config['GITHUB_API_URL'],
+            client_kwargs={'scope': 'user:email'},
+            client_cls=PooledOAuth2App
         )
+        github.pool = pool
 
         base_url = app.config['API_URL'].rstrip('/')
         redirect_uri = f"{base_url}/auth/google/callback"
         
-        oauth.register(
+        # Discovery metadata and JWKS come from a per-worker TTL cache instead of authlib's
+        # fetch-once copy; both are prefetched now so the first callback does not wait on them.
+        google = oauth.register(
             name='google',
             client_id=app.config['GOOGLE_CLIENT_ID'],
             client_secret=app.config['GOOGLE_CLIENT_SECRET'],
-            server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
             client_kwargs={
                 'scope': 'openid email profile',
                 'prompt': 'select_account',
                 'redirect_uri': redirect_uri
-            }
+            },
+            client_cls=OpenIDApp
         )
+        google.pool = pool
+        google.openid = OpenIDConfiguration(app.config['GOOGLE_METADATA_URL'], pool, app.config, app.logger)
+        google.openid.warm()
         
         app.logger.info(f"OAuth initialized with Google redirect URI: {redirect_uri}")
         
@@ -87,7 +117,7 @@ def github_auth():
         state = secrets.token_hex(16)
         session['oauth_state'] = state
         
-        return oauth.github.authorize_redirect(
+        return get_oauth().github.authorize_redirect(
             redirect_uri=callback_url,
             state=state
         )
@@ -96,6 +126,21 @@ def github_auth():
         frontend_url = validate_url(current_app.config['FRONTEND_URL'])
         return redirect(f"{frontend_url}/auth?error=github_auth_failed")
 
+def fetch_github_profile(token):
+    """The user's profile and email addresses, requested concurrently over the keep-alive pool."""
+    from oidc_cache import outbound_pool
+    
+    pool = outbound_pool()
+    api_base_url = current_app.config['GITHUB_API_URL']
+    headers = {
+        'Authorization': f"Bearer {token['access_token']}",
+        'Accept': 'application/vnd.github+json'
+    }
+    return pool.concurrently(
+        lambda: pool.get_json(urljoin(api_base_url, 'user'), headers=headers),
+        lambda: pool.get_json(urljoin(api_base_url, 'user/emails'), headers=headers)
+    )
+
 @auth_bp.route('/auth/github/callback')
 def github_callback():
     """Handle GitHub OAuth callback"""
@@ -104,15 +149,11 @@ def github_callback():
         if state and session.get('oauth_state') != state:
             raise ValueError("State verification failed")
         
-        token = oauth.github.authorize_access_token()
+        token = get_oauth().github.authorize_access_token()
         if not token:
             raise ValueError("No token received from GitHub")
 
-        resp = oauth.github.get('user', token=token)
-        profile = resp.json()
-
-        emails_resp = oauth.github.get('user/emails', token=token)
-        emails = emails_resp.json()
+        profile, emails = fetch_github_profile(token)
         primary_email = next((email['email'] for email in emails if email['primary']), None)
 
         user = User.query.filter_by(github_id=str(profile['id'])).first()
@@ -156,7 +197,7 @@ def google_auth():
         base_url = current_app.config['API_URL'].rstrip('/')
         redirect_uri = f"{base_url}/auth/google/callback"
         
-        return oauth.google.authorize_redirect(
+        return get_oauth().google.authorize_redirect(
             redirect_uri=redirect_uri,
             state=state,
             nonce=nonce
@@ -174,12 +215,12 @@ def google_callback():
         if state and session.get('oauth_state') != state:
             raise ValueError("State verification failed")
 
-        token = oauth.google.authorize_access_token()
+        token = get_oauth().google.authorize_access_token()
         if not token:
             raise ValueError("No token received from Google")
 
         nonce = session.get('nonce')
-        userinfo = oauth.google.parse_id_token(token, nonce=nonce)
+        userinfo = get_oauth().google.parse_id_token(token, nonce=nonce)
         if not userinfo:
             raise ValueError("Failed to get user info from Google")
 
@@ -0,0 +1,154 @@
+# backend/benchmarks/bench_async.py
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import subprocess
+from pathlib import Path
+
+bench_dir = Path(__file__).resolve().parent
+backend_dir = bench_dir.parent
+sys.path.append(str(backend_dir))
+
+os.environ.setdefault('CREATE_TABLES_ON_STARTUP', 'false')
+
+from load_test import load_fixture, Scenario, HttpTarget, run, summarize, parse_mix
+
+# 'async' is only the endpoints asgi.py serves on asyncio; 'mixed' adds the routes that stay on
+# Flask in both modes, so a regression in how asgi.py runs the mounted Flask app shows up too.
+WORKLOADS = {
+    'async': 'providers=20,exam=30,progress=50',
+    'mixed': 'providers=10,exam=15,progress=25,save=30,review=15,submit_stored=5',
+}
+# Operations that are Flask routes in both server modes.
+FLASK_OPERATIONS = ('save', 'review', 'submit', 'submit_stored')
+
+SERVERS = {
+    'sync': ('gthread', 'app:app'),
+    'async': ('uvicorn.workers.UvicornWorker', 'asgi:app'),
+}
+
+def start_server(mode, port, workers, threads):
+    """Launch gunicorn the way init-backend.sh does for SERVER_MODE=mode and wait until it answers."""
+    import requests
+    worker_class, app_module = SERVERS[mode]
+    env = dict(os.environ, SERVER_MODE=mode, GUNICORN_WORKERS=str(workers), GUNICORN_THREADS=str(threads))
+    process = subprocess.Popen([
+        sys.executable, '-m', 'gunicorn',
+        '--workers', str(workers),
+        '--threads', str(threads),
+        '--worker-class', worker_class,
+        '--bind', f'127.0.0.1:{port}',
+        '--log-level', 'warning',
+        app_module
+    ], cwd=backend_dir, env=env)
+
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f'{url}/health', timeout=2).status_code == 200:
+                return process, url
+        except requests.RequestException:
+            pass
+        if process.poll() is not None:
+            raise SystemExit(f"{mode} server exited with {process.returncode}")
+        time.sleep(0.5)
+    process.terminate()
+    raise SystemExit(f"{mode} server did not become ready on {url}")
+
+def capacity(levels, slo_ms, max_error_rate):
+    """Highest concurrency whose p99 stays within the SLO with (almost) no errors."""
+    best = None
+    for concurrency, row in levels:
+        if row['p99_ms'] <= slo_ms and row['errors'] <= max_error_rate * max(row['requests'], 1):
+            best = concurrency
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare concurrent-connection capacity of the sync (gthread) and async (uvicorn) server modes.')
+    parser.add_argument('--sync-url', help='Base URL of a running SERVER_MODE=sync server')
+    parser.add_argument('--async-url', help='Base URL of a running SERVER_MODE=async server')
+    parser.add_argument('--workers', type=int, default=4, help='Workers per locally started server (one pod)')
+    parser.add_argument('--threads', type=int, default=4, help='Threads per sync worker')
+    parser.add_argument('--port', type=int, default=5101, help='First port for locally started servers')
+    parser.add_argument('--levels', default='8,32,128,256', help='Concurrent connections to try, comma-separated')
+    parser.add_argument('--duration', type=float, default=20, help='Measured seconds per level')
+    parser.add_argument('--warmup', type=float, default=3, help='Unmeasured seconds before each level')
+    parser.add_argument('--workloads', default=','.join(WORKLOADS),
+                        help=f'Workloads to run, comma-separated, from {", ".join(WORKLOADS)} (default: all)')
+    parser.add_argument('--mix', help='Run only this custom operation mix instead, e.g. providers=50,save=50')
+    parser.add_argument('--users', type=int, default=100, help='Number of synthetic users to spread requests over')
+    parser.add_argument('--slo-ms', type=float, default=1000, help='p99 latency a level must stay under to count')
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help='Also write the report to this file')
+    args = parser.parse_args()
+
+    exams, tokens = load_fixture(args.users)
+    if args.mix:
+        workloads = {'custom': parse_mix(args.mix)}
+    else:
+        workloads = {name: parse_mix(WORKLOADS[name]) for name in args.workloads.split(',')}
+    levels = [int(level) for level in args.levels.split(',')]
+
+    processes = []
+    urls = {}
+    try:
+        for offset, mode in enumerate(('sync', 'async')):
+            url = getattr(args, f'{mode}_url')
+            if url is None:
+                process, url = start_server(mode, args.port + offset, args.workers, args.threads)
+                processes.append(process)
+            urls[mode] = url
+
+        results = {}
+        for workload, mix in workloads.items():
+            print(f"\nWorkload {workload}: {', '.join(f'{name}={weight:g}' for name, weight in mix.items())}")
+            flask_operations = [name for name in mix if name in FLASK_OPERATIONS]
+            for mode, url in urls.items():
+                rows = results.setdefault(workload, {}).setdefault(mode, [])
+                for concurrency in levels:
+                    samples = run(HttpTarget(url), lambda worker_id: Scenario(exams, mix, random.Random(args.seed + worker_id)),
+                                  tokens, concurrency, args.duration, args.warmup)
+                    report = summarize(samples, args.duration)
+                    rows.append((concurrency, report))
+                    row = report['ALL']
+                    line = (f"{mode:6} {concurrency:>6} conns {row['throughput_rps']:>9.1f} req/s "
+                            f"p50 {row['p50_ms']:>8.1f} ms  p99 {row['p99_ms']:>8.1f} ms  errors {row['errors']}")
+                    flask_rows = [report[name] for name in flask_operations if name in report]
+                    if flask_rows:
+                        line += f"  flask-route p99 {max(r['p99_ms'] for r in flask_rows):>8.1f} ms"
+                    print(line)
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    print(f"\nCapacity per pod (p99 <= {args.slo_ms:.0f} ms, errors <= {args.max_error_rate:.0%}):")
+    for workload, modes in results.items():
+        for mode, rows in modes.items():
+            overall = [(concurrency, report['ALL']) for concurrency, report in rows]
+            best = capacity(overall, args.slo_ms, args.max_error_rate)
+            peak = max(row['throughput_rps'] for _, row in overall)
+            print(f"  {workload:7} {mode:6} {best if best is not None else '<' + str(levels[0]):>6} concurrent connections, "
+                  f"peak {peak:.1f} req/s")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'results': {
+                workload: {
+                    mode: [{
+                        'concurrency': concurrency, **report['ALL'],
+                        'operations': {name: row for name, row in report.items() if name != 'ALL'}
+                    } for concurrency, report in rows]
+                    for mode, rows in modes.items()
+                }
+                for workload, modes in results.items()
+            }}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+# backend/benchmarks/bench_json.py
+
+import os
+import sys
+import argparse
+import statistics
+import timeit
+from pathlib import Path
+from types import SimpleNamespace
+
+bench_dir = Path(__file__).resolve().parent
+backend_dir = bench_dir.parent
+sys.path.append(str(backend_dir))
+sys.path.append(str(backend_dir / 'scripts'))
+
+os.environ.setdefault('CREATE_TABLES_ON_STARTUP', 'false')
+
+from app import app
+from json_provider import JSONProvider, OrjsonProvider, orjson
+from routes import build_exam_payload
+
+def payloads_from_db(limit):
+    """Real /api/exams payloads for the largest exams in the database."""
+    from models import Exam
+    with app.app_context():
+        exams = Exam.query.order_by(Exam.total_questions.desc()).limit(limit).all()
+        return [(exam.id, build_exam_payload(exam, exam.provider.name)) for exam in exams]
+
+def payloads_from_providers_dir(root, limit):
+    """Build the same payloads from a providers/ tree without touching the database."""
+    from migrate_providers import parse_exam_file, load_exam_file, get_exam_title_from_code
+
+    exams = {}
+    for provider_name in sorted(os.listdir(root)):
+        provider_path = os.path.join(root, provider_name)
+        if not os.path.isdir(provider_path):
+            continue
+        for file_name in sorted(os.listdir(provider_path)):
+            if not file_name.endswith('.json'):
+                continue
+            try:
+                exam_title, exam_code, topic_number = parse_exam_file(file_name)
+                data = load_exam_file(os.path.join(provider_path, file_name))
+            except Exception:
+                continue
+            exam_id = f"{provider_name}-{exam_title}-code-{exam_code}"
+            exam = exams.setdefault(exam_id, SimpleNamespace(
+                id=exam_id,
+                title=get_exam_title_from_code(exam_title, exam_code),
+                provider_name=provider_name,
+                topics=[]
+            ))
+            exam.topics.append(SimpleNamespace(number=topic_number, data=data))
+
+    largest = sorted(exams.values(), key=lambda e: sum(len(t.data) for t in e.topics), reverse=True)[:limit]
+    return [(exam.id, build_exam_payload(exam, exam.provider_name)) for exam in largest]
+
+def time_encoder(encode, payload, repeat):
+    timer = timeit.Timer(lambda: encode(payload))
+    number, _ = timer.autorange()
+    return statistics.median(t / number for t in timer.repeat(repeat=repeat, number=number))
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare stdlib and orjson encoding of real exam payloads.')
+    parser.add_argument('--providers-dir', help='Read payloads from a providers/ tree instead of the database')
+    parser.add_argument('--limit', type=int, default=10, help='Number of largest exams to benchmark')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if orjson is None:
+        raise SystemExit("orjson is not installed")
+
+    payloads = payloads_from_providers_dir(args.providers_dir, args.limit) if args.providers_dir else payloads_from_db(args.limit)
+    if not payloads:
+        raise SystemExit("No exam payloads found")
+
+    stdlib = JSONProvider(app)
+    fast = OrjsonProvider(app)
+
+    total_stdlib = total_fast = 0.0
+    mismatches = 0
+    print(f"{'exam':60} {'bytes':>10} {'stdlib ms':>10} {'orjson ms':>10} {'speedup':>8}")
+    for exam_id, payload in payloads:
+        expected = stdlib.dumps_bytes(payload)
+        if fast.dumps_bytes(payload) != expected:
+            mismatches += 1
+            print(f"!! {exam_id}: orjson output differs from the stdlib")
+
+        stdlib_seconds = time_encoder(stdlib.dumps_bytes, payload, args.repeat)
+        fast_seconds = time_encoder(fast.dumps_bytes, payload, args.repeat)
+        total_stdlib += stdlib_seconds
+        total_fast += fast_seconds
+        print(f"{exam_id[:60]:60} {len(expected):>10} {stdlib_seconds * 1000:>10.3f} {fast_seconds * 1000:>10.3f} {stdlib_seconds / fast_seconds:>7.1f}x")
+
+    print(f"\nTotal: stdlib {total_stdlib * 1000:.2f}ms, orjson {total_fast * 1000:.2f}ms, speedup {total_stdlib / total_fast:.1f}x")
+    if mismatches:
+        print(f"{mismatches} payload(s) were not byte-identical")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
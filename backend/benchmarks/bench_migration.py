@@ -0,0 +1,88 @@
+# backend/benchmarks/bench_migration.py
+
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import resource
+import tempfile
+from pathlib import Path
+
+bench_dir = Path(__file__).resolve().parent
+backend_dir = bench_dir.parent
+sys.path.append(str(backend_dir))
+sys.path.append(str(backend_dir / 'scripts'))
+
+os.environ.setdefault('CREATE_TABLES_ON_STARTUP', 'false')
+
+from app import app, db
+from migrate_providers import migrate_providers_to_db
+from generate_providers import generate_tree, GENERATED_PROVIDER_PREFIX
+from synthetic_data import reset
+
+def peak_rss_mib():
+    """High-water resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure migrate_providers.py throughput and peak memory on a generated tree.')
+    parser.add_argument('--providers-dir', help='Migrate an existing tree instead of generating one')
+    parser.add_argument('--providers', type=int, default=10)
+    parser.add_argument('--exams', type=int, default=10, help='Exams per provider')
+    parser.add_argument('--topics', default='1-5')
+    parser.add_argument('--questions', default='50-200')
+    parser.add_argument('--question-size', type=float, default=1.0)
+    parser.add_argument('--malformed', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--keep', action='store_true', help='Keep the generated tree and migrated rows')
+    parser.add_argument('--verbose', action='store_true', help='Keep the migration\'s per-file INFO logging')
+    args = parser.parse_args()
+
+    tree = args.providers_dir
+    generated = None
+    if not tree:
+        generated = tempfile.mkdtemp(prefix='providers-')
+        tree = generated
+        start = time.perf_counter()
+        summary = generate_tree(tree, args.providers, args.exams, args.topics, args.questions,
+                                args.question_size, args.malformed, args.seed)
+        print(f"Generated {summary['files']} files, {summary['questions']} questions, "
+              f"{summary['bytes'] / 1024 / 1024:.1f} MiB in {time.perf_counter() - start:.1f}s")
+
+    files = sum(1 for _ in Path(tree).glob('*/*.json'))
+    size_mib = sum(path.stat().st_size for path in Path(tree).glob('*/*.json')) / 1024 / 1024
+
+    if not args.verbose:
+        # Per-file INFO lines would dominate the timing at scale.
+        logging.getLogger('migrate_providers').setLevel(logging.WARNING)
+
+    try:
+        with app.app_context():
+            if generated:
+                reset(db, GENERATED_PROVIDER_PREFIX, user_prefix=None)
+
+            rss_before = peak_rss_mib()
+            start = time.perf_counter()
+            stats = migrate_providers_to_db(tree)
+            elapsed = time.perf_counter() - start
+            rss_after = peak_rss_mib()
+
+            print(f"Migrated {files} files ({size_mib:.1f} MiB) in {elapsed:.2f}s: "
+                  f"{files / elapsed:.1f} files/s, {size_mib / elapsed:.2f} MiB/s")
+            print(f"Created {stats['providers_migrated']} providers, {stats['exams_migrated']} exams, "
+                  f"{stats['topics_migrated']} topics; {len(stats['errors'])} provider-level errors")
+            print(f"Peak RSS {rss_after:.0f} MiB (+{rss_after - rss_before:.0f} MiB during migration)")
+
+            if generated and not args.keep:
+                reset(db, GENERATED_PROVIDER_PREFIX, user_prefix=None)
+    finally:
+        if generated and not args.keep:
+            shutil.rmtree(generated, ignore_errors=True)
+        elif generated:
+            print(f"Tree kept at {generated}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+# backend/benchmarks/generate_providers.py
+
+import os
+import sys
+import json
+import random
+import argparse
+import logging
+from pathlib import Path
+
+bench_dir = Path(__file__).resolve().parent
+sys.path.append(str(bench_dir))
+
+from synthetic_data import make_question
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+GENERATED_PROVIDER_PREFIX = 'GenProvider'
+
+# Error paths in migrate_providers.py: unparseable JSON, a non-list payload, undecodable bytes,
+# an empty file, and a file without the -code- marker (parsed as a separate, code-less exam).
+MALFORMED_KINDS = ('truncated', 'not_a_list', 'bad_utf8', 'empty', 'missing_code')
+
+def _parse_range(value):
+    """'3' -> (3, 3); '1-5' -> (1, 5)."""
+    low, _, high = str(value).partition('-')
+    return int(low), int(high or low)
+
+def exam_file_name(title, code, topic_number):
+    """The <title>-code-<code>__topic-<n>.json layout parse_exam_file expects."""
+    return f"{title}-code-{code}__topic-{topic_number}.json"
+
+def write_malformed(path, kind, rng):
+    if kind == 'truncated':
+        text = json.dumps([make_question(rng, 1)])
+        path.write_text(text[:len(text) // 2], encoding='utf-8')
+    elif kind == 'not_a_list':
+        path.write_text(json.dumps({'questions': [make_question(rng, 1)]}), encoding='utf-8')
+    elif kind == 'bad_utf8':
+        path.write_bytes(b'[{"question": "\xff\xfe broken"}]')
+    elif kind == 'empty':
+        path.write_bytes(b'')
+
+def generate_tree(output, providers=10, exams_per_provider=10, topics='1-5', questions='50-200',
+                  question_size=1.0, malformed=0.0, seed=42):
+    """
+    Write a providers/ tree under output: one directory per provider and one JSON file per exam topic.
+    A malformed fraction of files (0..1) is replaced with broken content. Returns a summary dict.
+    """
+    rng = random.Random(seed)
+    topic_range = _parse_range(topics)
+    question_range = _parse_range(questions)
+    output = Path(output)
+    summary = {'providers': 0, 'exams': 0, 'files': 0, 'questions': 0, 'bytes': 0,
+               'malformed': {kind: 0 for kind in MALFORMED_KINDS}}
+
+    for p in range(providers):
+        provider_dir = output / f"{GENERATED_PROVIDER_PREFIX}{p:04d}"
+        provider_dir.mkdir(parents=True, exist_ok=True)
+        summary['providers'] += 1
+
+        for e in range(exams_per_provider):
+            title = f"Generated Certification {e:04d}"
+            code = f"G{p:04d}-{e:04d}"
+            summary['exams'] += 1
+            number = 0
+            for topic_number in range(1, rng.randint(*topic_range) + 1):
+                path = provider_dir / exam_file_name(title, code, topic_number)
+                if malformed and rng.random() < malformed:
+                    kind = rng.choice(MALFORMED_KINDS)
+                    if kind == 'missing_code':
+                        path = provider_dir / f"{title} Legacy__topic-{topic_number}.json"
+                        path.write_text(json.dumps([make_question(rng, 1, question_size)]), encoding='utf-8')
+                    else:
+                        write_malformed(path, kind, rng)
+                    summary['malformed'][kind] += 1
+                else:
+                    data = []
+                    for _ in range(rng.randint(*question_range)):
+                        number += 1
+                        data.append(make_question(rng, number, question_size))
+                    with open(path, 'w', encoding='utf-8') as f:
+                        json.dump(data, f, ensure_ascii=False)
+                    summary['questions'] += len(data)
+                summary['files'] += 1
+                summary['bytes'] += path.stat().st_size
+
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Write a synthetic providers/ tree for migration scale tests.',
+        epilog='--providers 125 matches provider_categories.py; raise --exams (or --providers) by 10x '
+               'and 100x over the current catalog for scale runs.'
+    )
+    parser.add_argument('output', help='Directory to write the tree into (created if missing)')
+    parser.add_argument('--providers', type=int, default=10)
+    parser.add_argument('--exams', type=int, default=10, help='Exams per provider')
+    parser.add_argument('--topics', default='1-5', help='Topics per exam, N or MIN-MAX')
+    parser.add_argument('--questions', default='50-200', help='Questions per topic, N or MIN-MAX')
+    parser.add_argument('--question-size', type=float, default=1.0, help='Scales question and explanation length')
+    parser.add_argument('--malformed', type=float, default=0.0, help='Fraction of files to break (0..1)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if os.path.isdir(args.output) and os.listdir(args.output):
+        logger.warning(f"{args.output} is not empty; existing files with the same names are overwritten")
+
+    summary = generate_tree(args.output, args.providers, args.exams, args.topics, args.questions,
+                            args.question_size, args.malformed, args.seed)
+    logger.info(f"Generated {summary['files']} files ({summary['bytes'] / 1024 / 1024:.1f} MiB), "
+                f"{summary['exams']} exams, {summary['questions']} questions, malformed: {summary['malformed']}")
+
+if __name__ == '__main__':
+    main()
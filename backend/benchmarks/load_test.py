@@ -0,0 +1,236 @@
+# backend/benchmarks/load_test.py
+
+import os
+import re
+import math
+import sys
+import json
+import random
+import argparse
+import threading
+import time
+from pathlib import Path
+
+bench_dir = Path(__file__).resolve().parent
+backend_dir = bench_dir.parent
+sys.path.append(str(backend_dir))
+
+# Queries per request come from the Server-Timing header added by request_timing.py.
+os.environ.setdefault('SERVER_TIMING', 'true')
+os.environ.setdefault('CREATE_TABLES_ON_STARTUP', 'false')
+
+from app import app, db
+from auth import generate_token
+from synthetic_data import PROVIDER_PREFIX, USER_PREFIX
+from sqlalchemy import text
+
+DEFAULT_MIX = 'providers=15,exam=25,save=35,submit=5,progress=20'
+QUERY_COUNT = re.compile(r'desc="(\d+) queries"')
+
+def load_fixture(limit_users):
+    """Synthetic exam layouts (topic sizes) and bearer tokens for synthetic users."""
+    with app.app_context():
+        rows = db.session.execute(text("""
+            SELECT t.exam_id, t.number, json_array_length(t.data)
+            FROM topic t
+            JOIN exam e ON e.id = t.exam_id
+            JOIN provider p ON p.id = e.provider_id
+            WHERE p.name LIKE :pattern
+            ORDER BY t.exam_id, t.number
+        """), {'pattern': f'{PROVIDER_PREFIX}%'}).all()
+        user_ids = db.session.scalars(
+            text("SELECT id FROM users WHERE username LIKE :pattern ORDER BY id LIMIT :limit"),
+            {'pattern': f'{USER_PREFIX}%', 'limit': limit_users}
+        ).all()
+        tokens = [generate_token(user_id) for user_id in user_ids]
+
+    exams = {}
+    for exam_id, number, size in rows:
+        exams.setdefault(exam_id, []).append((number, size))
+    if not exams or not tokens:
+        raise SystemExit("No synthetic data found; run benchmarks/synthetic_data.py first")
+    return exams, tokens
+
+class Scenario:
+    """Builds one request per call for a weighted mix of operations against the synthetic tenant."""
+
+    def __init__(self, exams, mix, rng):
+        self.exams = exams
+        self.exam_ids = sorted(exams)
+        # Same Zipf-like popularity skew the generator used for user activity.
+        self.exam_weights = [1 / (rank + 1) for rank in range(len(self.exam_ids))]
+        self.operations = list(mix)
+        self.weights = [mix[name] for name in self.operations]
+        self.rng = rng
+
+    def pick_exam(self):
+        return self.rng.choices(self.exam_ids, self.exam_weights)[0]
+
+    def next_request(self):
+        """(operation, method, path, json body or None)."""
+        operation = self.rng.choices(self.operations, self.weights)[0]
+        if operation == 'providers':
+            return operation, 'GET', '/api/providers', None
+        if operation == 'progress':
+            return operation, 'GET', '/api/exam-progress', None
+
+        exam_id = self.pick_exam()
+        topics = self.exams[exam_id]
+        if operation == 'exam':
+            return operation, 'GET', f'/api/exams/{exam_id}', None
+        if operation == 'review':
+            return operation, 'GET', f'/api/review-questions/{exam_id}?limit=20', None
+        if operation == 'save':
+            number, size = self.rng.choice(topics)
+            return operation, 'POST', '/api/save-answer', {
+                'exam_id': exam_id, 'topic_number': number,
+                'question_index': self.rng.randrange(size), 'selected_options': [self.rng.randint(0, 3)]
+            }
+        if operation == 'submit':
+            answers = {
+                f"T{number} Q{index + 1}": [self.rng.randint(0, 3)]
+                for number, size in topics for index in range(size) if self.rng.random() < 0.9
+            }
+            return operation, 'POST', '/api/submit-answers', {'exam_id': exam_id, 'user_answers': answers}
+        if operation == 'submit_stored':
+            return operation, 'POST', '/api/submit-answers', {'exam_id': exam_id, 'mode': 'stored'}
+        raise ValueError(f"Unknown operation: {operation}")
+
+class TestClientTarget:
+    """Drives the app in-process through Flask's test client (one client per thread)."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def request(self, method, path, token, body):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = app.test_client()
+        response = client.open(path, method=method, json=body, headers={
+            'Authorization': f'Bearer {token}', 'Accept-Encoding': 'gzip, br'
+        })
+        response.get_data()
+        return response.status_code, response.headers.get('Server-Timing', '')
+
+class HttpTarget:
+    """Drives a running server (e.g. gunicorn started by init-backend.sh) over HTTP."""
+
+    def __init__(self, base_url):
+        import requests
+        self.requests = requests
+        self.base_url = base_url.rstrip('/')
+        self._local = threading.local()
+
+    def request(self, method, path, token, body):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self.requests.Session()
+        response = session.request(method, self.base_url + path, json=body, headers={
+            'Authorization': f'Bearer {token}', 'Accept-Encoding': 'gzip, br'
+        }, timeout=60)
+        return response.status_code, response.headers.get('Server-Timing', '')
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+def run(target, scenario_factory, tokens, concurrency, duration, warmup):
+    samples = []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + warmup + duration
+    record_after = time.perf_counter() + warmup
+
+    def worker(worker_id):
+        scenario = scenario_factory(worker_id)
+        local = []
+        while True:
+            now = time.perf_counter()
+            if now >= stop_at:
+                break
+            operation, method, path, body = scenario.next_request()
+            token = tokens[scenario.rng.randrange(len(tokens))]
+            start = time.perf_counter()
+            try:
+                status, server_timing = target.request(method, path, token, body)
+            except Exception:
+                status, server_timing = 599, ''
+            elapsed = time.perf_counter() - start
+            if start >= record_after:
+                match = QUERY_COUNT.search(server_timing)
+                local.append((operation, elapsed, status, int(match.group(1)) if match else None))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples
+
+def summarize(samples, duration):
+    groups = {}
+    for operation, elapsed, status, queries in samples:
+        groups.setdefault(operation, []).append((elapsed, status, queries))
+    groups['ALL'] = [(elapsed, status, queries) for _, elapsed, status, queries in samples]
+
+    report = {}
+    for operation, rows in groups.items():
+        latencies = sorted(elapsed for elapsed, _, _ in rows)
+        queries = [q for _, _, q in rows if q is not None]
+        report[operation] = {
+            'requests': len(rows),
+            'errors': sum(1 for _, status, _ in rows if status >= 400),
+            'throughput_rps': round(len(rows) / duration, 2),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+            'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None
+        }
+    return report
+
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(','):
+        name, weight = part.split('=')
+        mix[name.strip()] = float(weight)
+    return mix
+
+def main():
+    parser = argparse.ArgumentParser(description='Drive a scripted request mix against the synthetic tenant.')
+    parser.add_argument('--url', help='Base URL of a running server; defaults to the in-process test client')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30, help='Measured seconds')
+    parser.add_argument('--warmup', type=float, default=5, help='Unmeasured seconds before measuring')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Operation weights (default: {DEFAULT_MIX}); also available: review, submit_stored')
+    parser.add_argument('--users', type=int, default=100, help='Number of synthetic users to spread requests over')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help='Also write the report to this file')
+    args = parser.parse_args()
+
+    exams, tokens = load_fixture(args.users)
+    mix = parse_mix(args.mix)
+    target = HttpTarget(args.url) if args.url else TestClientTarget()
+
+    print(f"Target: {args.url or 'test client'}, concurrency {args.concurrency}, {args.duration}s "
+          f"(+{args.warmup}s warm-up), {len(exams)} exams, {len(tokens)} users")
+    samples = run(target, lambda worker_id: Scenario(exams, mix, random.Random(args.seed + worker_id)),
+                  tokens, args.concurrency, args.duration, args.warmup)
+    report = summarize(samples, args.duration)
+
+    print(f"\n{'operation':12} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8}")
+    for operation in sorted(report, key=lambda name: (name == 'ALL', name)):
+        row = report[operation]
+        queries = '-' if row['queries_per_request'] is None else f"{row['queries_per_request']:.1f}"
+        print(f"{operation:12} {row['requests']:>9} {row['errors']:>7} {row['throughput_rps']:>8.1f} "
+              f"{row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f} {queries:>8}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'report': report}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+# backend/benchmarks/micro.py
+
+import os
+import sys
+import json
+import random
+import argparse
+import platform
+import statistics
+import timeit
+from pathlib import Path
+from types import SimpleNamespace
+
+bench_dir = Path(__file__).resolve().parent
+backend_dir = bench_dir.parent
+sys.path.append(str(backend_dir))
+sys.path.append(str(backend_dir / 'scripts'))
+
+os.environ.setdefault('CREATE_TABLES_ON_STARTUP', 'false')
+
+from app import app  # noqa: F401  (routes must be imported after the app is created)
+from utils import get_exam_order, format_display_title
+from grading import grade_answers, grade_attempt
+from attempt_results import decode_incorrect, diff_attempts
+from provider_categories import get_provider_categories
+from routes import get_provider_description
+from migrate_providers import parse_exam_file
+from synthetic_data import make_question, topic_sizes
+
+DEFAULT_BASELINE = bench_dir / 'micro_baseline.json'
+
+# Real catalog titles for the providers get_exam_order special-cases, plus generic ones.
+KNOWN_TITLES = {
+    'Amazon': [
+        ('AWS Certified Cloud Practitioner', 'CLF-C02'),
+        ('AWS Certified Solutions Architect Associate', 'SAA-C03'),
+        ('AWS Certified Developer Associate', 'DVA-C02'),
+        ('AWS Certified SysOps Administrator Associate', 'SOA-C02'),
+        ('AWS Certified Solutions Architect Professional', 'SAP-C02'),
+        ('AWS Certified DevOps Engineer Professional', 'DOP-C02'),
+        ('AWS Certified Security Specialty', 'SCS-C02'),
+        ('AWS Certified Big Data Specialty', 'BDS-C00'),
+    ],
+    'Google': [
+        ('Google Cloud Digital Leader', 'CDL'),
+        ('Google Associate Cloud Engineer', 'ACE'),
+        ('Google Professional Cloud Architect', 'PCA'),
+        ('Google Professional Data Engineer', 'PDE'),
+    ],
+    'Microsoft': [
+        ('Microsoft Azure Fundamentals', 'AZ-900'),
+        ('Microsoft Azure Administrator', 'AZ-104'),
+        ('Designing Microsoft Azure Infrastructure Solutions', 'AZ-305'),
+    ]
+}
+
+def build_inputs(seed):
+    """Catalog-shaped inputs: every provider in provider_categories.py with a few exams each."""
+    rng = random.Random(seed)
+    providers = [p['name'] for category in get_provider_categories() for p in category['providers']]
+
+    exams = []
+    for provider in providers:
+        titles = KNOWN_TITLES.get(provider) or [
+            (f"{provider} Certified {level} Exam", f"{provider[:3].upper()}-{100 + i}")
+            for i, level in enumerate(('Associate', 'Professional', 'Specialty'))
+        ]
+        for title, code in titles:
+            exams.append((provider, title, code))
+
+    display_titles = [f"{code}: {title}" for _, title, code in exams]
+    raw_titles = [f"{title}-code-{code}" for _, title, code in exams] + [title for _, title, _ in exams]
+    order_args = [(f"{code}: {title}", provider) for provider, title, code in exams]
+    file_names = [f"{title}-code-{code}__topic-{rng.randint(1, 5)}.json" for _, title, code in exams]
+
+    sizes = topic_sizes(rng, 150)
+    number = 0
+    topics = []
+    for topic_number, size in enumerate(sizes, start=1):
+        questions = []
+        for _ in range(size):
+            number += 1
+            questions.append(make_question(rng, number))
+        topics.append(SimpleNamespace(number=topic_number, data=questions))
+    user_answers = {
+        f"T{topic.number} Q{index + 1}": [rng.randint(0, 3)]
+        for topic in topics for index in range(len(topic.data)) if rng.random() < 0.9
+    }
+    retry_answers = {question_id: [rng.randint(0, 3)] if rng.random() < 0.2 else selected
+                     for question_id, selected in user_answers.items()}
+    graded = [grade_attempt(topics, answers) for answers in (user_answers, retry_answers)]
+    results = [SimpleNamespace(layout=g.layout, incorrect_bitmap=g.incorrect_bitmap) for g in graded]
+
+    return {
+        'providers': providers,
+        'display_titles': display_titles,
+        'raw_titles': raw_titles,
+        'order_args': order_args,
+        'file_names': file_names,
+        'topics': topics,
+        'user_answers': user_answers,
+        'results': results,
+        'question_count': number
+    }
+
+def benchmarks(inputs):
+    """name -> (zero-argument callable, number of items it processes per call)."""
+    return {
+        'format_display_title': (
+            lambda: [format_display_title(title) for title in inputs['raw_titles']],
+            len(inputs['raw_titles'])
+        ),
+        'get_exam_order': (
+            lambda: [get_exam_order(title, provider) for title, provider in inputs['order_args']],
+            len(inputs['order_args'])
+        ),
+        'get_provider_description': (
+            lambda: [get_provider_description(name) for name in inputs['providers']],
+            len(inputs['providers'])
+        ),
+        'parse_exam_file': (
+            lambda: [parse_exam_file(name) for name in inputs['file_names']],
+            len(inputs['file_names'])
+        ),
+        'grade_answers': (
+            lambda: grade_answers(inputs['topics'], inputs['user_answers']),
+            inputs['question_count']
+        ),
+        'decode_incorrect': (
+            lambda: decode_incorrect(inputs['results'][0].layout, inputs['results'][0].incorrect_bitmap),
+            inputs['question_count']
+        ),
+        'diff_attempts': (
+            lambda: diff_attempts(None, inputs['results'][0], None, inputs['results'][1]),
+            inputs['question_count']
+        )
+    }
+
+def _calibration_workload():
+    total = 0
+    for i in range(2000):
+        total += i * i % 7
+    return {str(i): i for i in range(200)}, total
+
+def measure(fn, repeat):
+    """Best-of-repeat seconds per call; the minimum is the least noisy estimate for pure functions."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+def run(repeat, seed, rounds=5, names=None):
+    """
+    Time every benchmark (or just names) and express it in calibration units (multiples of a
+    fixed pure-Python workload), so numbers stay comparable across machines and CI runners.
+    Calibration is re-timed next to each benchmark in every round and the median ratio is kept,
+    which cancels most of the drift from CPU frequency scaling and noisy neighbours.
+    """
+    inputs = build_inputs(seed)
+    suite = {name: entry for name, entry in benchmarks(inputs).items() if names is None or name in names}
+    ratios = {name: [] for name in suite}
+    seconds = {name: [] for name in suite}
+    calibrations = []
+    for _ in range(rounds):
+        for name, (fn, _) in suite.items():
+            calibration = measure(_calibration_workload, repeat)
+            elapsed = measure(fn, repeat)
+            calibrations.append(calibration)
+            seconds[name].append(elapsed)
+            ratios[name].append(elapsed / calibration)
+
+    results = {}
+    for name, (_, items) in suite.items():
+        results[name] = {
+            'ns_per_item': round(statistics.median(seconds[name]) / items * 1e9, 1),
+            'normalized': round(statistics.median(ratios[name]), 4),
+            'items': items
+        }
+    return {
+        'calibration_us': round(statistics.median(calibrations) * 1e6, 2),
+        'python': platform.python_version(),
+        'results': results
+    }
+
+def record_baseline(runs, repeat, seed, rounds):
+    """
+    A baseline from several runs: the median of their normalized times, and as spread the range
+    of those medians relative to it, i.e. how far a clean run of the same code strays.
+    """
+    samples = [run(repeat, seed, rounds) for _ in range(runs)]
+    results = {}
+    for name, result in samples[0]['results'].items():
+        normalized = [sample['results'][name]['normalized'] for sample in samples]
+        median = statistics.median(normalized)
+        results[name] = {
+            'ns_per_item': statistics.median(sample['results'][name]['ns_per_item'] for sample in samples),
+            'normalized': median,
+            'spread': round((max(normalized) - min(normalized)) / median, 4),
+            'items': result['items']
+        }
+    return {
+        'calibration_us': statistics.median(sample['calibration_us'] for sample in samples),
+        'python': samples[0]['python'],
+        'runs': runs,
+        'results': results
+    }
+
+def compare(current, baseline, threshold):
+    """
+    Names of benchmarks whose normalized time regressed by more than threshold (a fraction) plus
+    the noise margin, the spread recorded with that benchmark's baseline.
+    """
+    regressions = []
+    for name, result in current['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+        change = result['normalized'] / previous['normalized'] - 1
+        result['change'] = round(change, 4)
+        result['allowed'] = round(threshold + previous.get('spread', 0), 4)
+        if change > result['allowed']:
+            regressions.append(name)
+    return regressions
+
+def confirm(regressions, baseline, threshold, repeat, seed, rounds):
+    """Re-run the regressed benchmarks and keep those that regress again, so one noisy run does not fail."""
+    rerun = run(repeat, seed, rounds, names=regressions)
+    return compare(rerun, baseline, threshold), rerun
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmarks for the pure functions on the catalog and grading paths.')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+    parser.add_argument('--update-baseline', action='store_true', help='Write a new baseline from --baseline-runs runs')
+    parser.add_argument('--threshold', type=float, default=float(os.getenv('MICRO_BENCH_THRESHOLD', 0.25)),
+                        help='Allowed slowdown against the baseline as a fraction, on top of each benchmark\'s recorded spread (default 0.25)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repeats per measurement (best is kept)')
+    parser.add_argument('--rounds', type=int, default=5, help='Interleaved rounds (median is kept)')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--no-confirm', action='store_true', help='Fail on the first run instead of re-running regressions')
+    parser.add_argument('--baseline-runs', type=int, default=3, help='Runs combined by --update-baseline to measure the spread')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    args = parser.parse_args()
+
+    if args.update_baseline:
+        current = record_baseline(args.baseline_runs, args.repeat, args.seed, args.rounds)
+    else:
+        current = run(args.repeat, args.seed, args.rounds)
+
+    baseline = None
+    if not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions = compare(current, baseline, args.threshold) if baseline else []
+    unconfirmed = []
+    if regressions and not args.no_confirm:
+        confirmed, rerun = confirm(regressions, baseline, args.threshold, args.repeat, args.seed, args.rounds)
+        unconfirmed = [name for name in regressions if name not in confirmed]
+        for name in regressions:
+            current['results'][name]['confirm_change'] = rerun['results'][name]['change']
+        regressions = confirmed
+
+    if args.json:
+        print(json.dumps(current, indent=2))
+    else:
+        print(f"calibration unit: {current['calibration_us']}us (Python {current['python']})")
+        print(f"{'benchmark':26} {'ns/item':>10} {'normalized':>11} {'vs baseline':>12} {'allowed':>9}")
+        for name, result in current['results'].items():
+            change = f"{result['change'] * 100:+.1f}%" if 'change' in result else '-'
+            allowed = f"{result['allowed'] * 100:+.1f}%" if 'allowed' in result else '-'
+            flag = ''
+            if 'confirm_change' in result:
+                status = 'REGRESSION' if name in regressions else 'noise'
+                flag = f"  {status} (re-run {result['confirm_change'] * 100:+.1f}%)"
+            print(f"{name:26} {result['ns_per_item']:>10.1f} {result['normalized']:>11.4f} {change:>12} {allowed:>9}{flag}")
+        if unconfirmed:
+            print(f"Not confirmed on re-run, ignored: {', '.join(unconfirmed)}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(current, f, indent=2)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold * 100:.0f}% plus their noise margin, "
+              f"twice in a row: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
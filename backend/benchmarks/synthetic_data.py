@@ -0,0 +1,212 @@
+# backend/benchmarks/synthetic_data.py
+
+import sys
+import math
+import random
+import argparse
+import logging
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+bench_dir = Path(__file__).resolve().parent
+backend_dir = bench_dir.parent
+sys.path.append(str(backend_dir))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROVIDER_PREFIX = 'SynthProvider'
+USER_PREFIX = 'synth-user-'
+
+WORDS = (
+    'cluster network storage policy latency replica gateway bucket identity region instance '
+    'container pipeline encryption subnet endpoint throughput function queue topic snapshot '
+    'database failover scaling budget compliance audit token certificate routing cache'
+).split()
+
+def _sentence(rng, low, high):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(low, high))]
+    return ' '.join(words).capitalize() + '.'
+
+def make_question(rng, number, size=1.0):
+    """
+    A question in the providers/ JSON shape: 4-6 options, ~10% multi-answer, with votes.
+    size scales the number of sentences in the question and explanation (1.0 is roughly 1.3 KB of JSON).
+    """
+    option_count = rng.randint(4, 6)
+    letters = [chr(ord('A') + i) for i in range(option_count)]
+    answer = ''.join(sorted(rng.sample(letters, 2 if rng.random() < 0.1 else 1)))
+    question_sentences = max(int(rng.randint(2, 6) * size), 1)
+    description_sentences = max(int(rng.randint(1, 4) * size), 1)
+    return {
+        'question': f"Question {number}: " + ' '.join(_sentence(rng, 8, 20) for _ in range(question_sentences)),
+        'options': [f"{letter}. {_sentence(rng, 4, 14)}" for letter in letters],
+        'answer': answer,
+        'answerDescription': ' '.join(_sentence(rng, 8, 18) for _ in range(description_sentences)),
+        'votes': [{'answer': answer, 'count': rng.randint(5, 300)}] + [
+            {'answer': letter, 'count': rng.randint(0, 40)} for letter in rng.sample(letters, 2) if letter not in answer
+        ]
+    }
+
+def topic_sizes(rng, median_questions):
+    """
+    Question counts per topic for one exam. Exam sizes are log-normal around median_questions
+    (a few very large exams dominate payload sizes, as in the real catalog), split into 1-5 topics.
+    """
+    total = int(min(max(rng.lognormvariate(math.log(median_questions), 0.7), 10), median_questions * 10))
+    topic_count = min(rng.randint(1, 5), total)
+    cuts = sorted(rng.sample(range(1, total), topic_count - 1)) if topic_count > 1 else []
+    bounds = [0] + cuts + [total]
+    return [bounds[i + 1] - bounds[i] for i in range(topic_count)]
+
+def reset(db, provider_prefix=PROVIDER_PREFIX, user_prefix=USER_PREFIX):
+    """
+    Delete every row created by a previous run: providers named provider_prefix*, their exams
+    and everything hanging off them, and users named user_prefix* (skipped when None).
+    """
+    from sqlalchemy import text
+    params = {'provider_pattern': f'{provider_prefix}%', 'user_pattern': f'{user_prefix}%'}
+    exam_ids = "SELECT e.id FROM exam e JOIN provider p ON p.id = e.provider_id WHERE p.name LIKE :provider_pattern"
+    user_ids = "SELECT id FROM users WHERE username LIKE :user_pattern"
+    for table in ('user_answer', 'favorite_question', 'exam_attempt', 'exam_visit', 'exam_score_tally', 'user_preference'):
+        if user_prefix:
+            db.session.execute(text(f"DELETE FROM {table} WHERE user_id IN ({user_ids})"), params)
+        column = 'last_visited_exam' if table == 'user_preference' else 'exam_id'
+        db.session.execute(text(f"DELETE FROM {table} WHERE {column} IN ({exam_ids})"), params)
+    for table in ('question_stat', 'question_stat_shard', 'topic'):
+        db.session.execute(text(f"DELETE FROM {table} WHERE exam_id IN ({exam_ids})"), params)
+    db.session.execute(text(f"DELETE FROM exam_revision WHERE exam_id IN ({exam_ids})"), params)
+    db.session.execute(text(f"DELETE FROM exam WHERE id IN ({exam_ids})"), params)
+    db.session.execute(text("DELETE FROM provider WHERE name LIKE :provider_pattern"), params)
+    if user_prefix:
+        for table in ('purge_job', 'submission_idempotency'):
+            db.session.execute(text(f"DELETE FROM {table} WHERE user_id IN ({user_ids})"), params)
+        db.session.execute(text(f"DELETE FROM users WHERE id IN ({user_ids})"), params)
+    db.session.commit()
+
+def generate(db, providers=10, exams_per_provider=10, median_questions=150, users=100,
+             exams_per_user=5, seed=42, batch_size=5000):
+    """
+    Insert a synthetic tenant: providers, exams with topics, and users with answers,
+    favorites, attempts and visits spread over the last 90 days. Returns a summary dict.
+    """
+    from sqlalchemy import insert
+    from models import Provider, Exam, Topic, ExamRevision, UserAnswer, FavoriteQuestion, ExamAttempt, ExamVisit
+    from auth import User
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    counts = {}
+
+    def bulk(model, rows):
+        for start in range(0, len(rows), batch_size):
+            db.session.execute(insert(model), rows[start:start + batch_size])
+        counts[model.__tablename__] = counts.get(model.__tablename__, 0) + len(rows)
+
+    provider_ids = db.session.scalars(
+        insert(Provider).returning(Provider.id),
+        [{'name': f'{PROVIDER_PREFIX}{p:03d}', 'is_popular': p < 3} for p in range(providers)]
+    ).all()
+    counts['provider'] = len(provider_ids)
+
+    exams = {}
+    exam_rows, topic_rows = [], []
+    for p, provider_id in enumerate(provider_ids):
+        for e in range(exams_per_provider):
+            code = f"S{p:03d}-{e:03d}"
+            title = f"Synthetic Exam {e}"
+            exam_id = f"{PROVIDER_PREFIX}{p:03d}-{title}-code-{code}"
+            sizes = topic_sizes(rng, median_questions)
+            exams[exam_id] = sizes
+            exam_rows.append({'id': exam_id, 'title': f"{code}: {title}", 'progress': 0,
+                              'total_questions': sum(sizes), 'provider_id': provider_id})
+            number = 0
+            for topic_number, size in enumerate(sizes, start=1):
+                questions = []
+                for _ in range(size):
+                    number += 1
+                    questions.append(make_question(rng, number))
+                topic_rows.append({'number': topic_number, 'exam_id': exam_id, 'data': questions})
+        # Topics carry the bulk of the bytes; flush them per provider to bound memory.
+        bulk(Exam, exam_rows)
+        bulk(Topic, topic_rows)
+        bulk(ExamRevision, [{'exam_id': row['id'], 'version': 1} for row in exam_rows])
+        exam_rows, topic_rows = [], []
+
+    user_ids = db.session.scalars(
+        insert(User).returning(User.id),
+        [{'username': f'{USER_PREFIX}{u}', 'name': f'Synthetic User {u}'} for u in range(users)]
+    ).all()
+    counts['users'] = len(user_ids)
+
+    # Popular exams get most of the traffic: pick per-user exams with a Zipf-like skew.
+    exam_ids = list(exams)
+    weights = [1 / (rank + 1) for rank in range(len(exam_ids))]
+    answer_rows, favorite_rows, attempt_rows, visit_rows = [], [], [], []
+    for user_id in user_ids:
+        chosen = []
+        while len(chosen) < min(exams_per_user, len(exam_ids)):
+            exam_id = rng.choices(exam_ids, weights)[0]
+            if exam_id not in chosen:
+                chosen.append(exam_id)
+        for exam_id in chosen:
+            sizes = exams[exam_id]
+            first_visit = now - timedelta(days=rng.uniform(1, 90))
+            visit_rows.append({'user_id': user_id, 'exam_id': exam_id, 'first_visit_date': first_visit,
+                               'last_visit_date': first_visit + timedelta(days=rng.uniform(0, 1))})
+
+            answered = rng.random()
+            for topic_number, size in enumerate(sizes, start=1):
+                for index in range(size):
+                    if rng.random() < answered:
+                        answer_rows.append({'user_id': user_id, 'exam_id': exam_id, 'topic_number': topic_number,
+                                            'question_index': index, 'selected_options': [rng.randint(0, 3)]})
+                    if rng.random() < 0.02:
+                        favorite_rows.append({'user_id': user_id, 'exam_id': exam_id,
+                                              'topic_number': topic_number, 'question_index': index})
+
+            total = sum(sizes)
+            for attempt in range(rng.choice((0, 0, 1, 1, 2, 3))):
+                correct = rng.randint(0, total)
+                attempt_rows.append({
+                    'user_id': user_id, 'exam_id': exam_id, 'score': correct / total * 100,
+                    'total_questions': total, 'correct_answers': correct,
+                    'incorrect_questions': [f"T1 Q{i + 1}" for i in range(min(total - correct, sizes[0]))],
+                    'attempt_date': first_visit + timedelta(hours=attempt + 1, seconds=user_id)
+                })
+
+    bulk(UserAnswer, answer_rows)
+    bulk(FavoriteQuestion, favorite_rows)
+    bulk(ExamAttempt, attempt_rows)
+    bulk(ExamVisit, visit_rows)
+    db.session.commit()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic tenant for load benchmarks.')
+    parser.add_argument('--providers', type=int, default=10)
+    parser.add_argument('--exams', type=int, default=10, help='Exams per provider')
+    parser.add_argument('--questions', type=int, default=150, help='Median questions per exam')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--exams-per-user', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--reset', action='store_true', help='Delete the previous synthetic tenant first')
+    parser.add_argument('--reset-only', action='store_true', help='Only delete the synthetic tenant')
+    args = parser.parse_args()
+
+    from app import app, db
+
+    with app.app_context():
+        if args.reset or args.reset_only:
+            reset(db)
+            logger.info("Removed previous synthetic data")
+            if args.reset_only:
+                return
+
+        start = time.perf_counter()
+        counts = generate(db, args.providers, args.exams, args.questions, args.users, args.exams_per_user, args.seed)
+        logger.info(f"Generated synthetic tenant in {time.perf_counter() - start:.1f}s: {counts}")
+
+if __name__ == '__main__':
+    main()
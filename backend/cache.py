@@ -0,0 +1,86 @@
+# backend/cache.py
+
+import threading
+from collections import OrderedDict, namedtuple
+
+# A serialized response body plus its pre-compressed variants ({'gzip': bytes, 'br': bytes}).
+CachedBody = namedtuple('CachedBody', ['identity', 'variants'])
+
+def cached_body_size(entry):
+    return len(entry.identity) + sum(len(data) for data in entry.variants.values())
+
+class ByteLRUCache:
+    """Thread-safe LRU cache bounded by the total size of its values rather than their count."""
+
+    def __init__(self, max_bytes, sizeof=len):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes_used -= previous[1]
+            self._entries[key] = (value, size)
+            self.bytes_used += size
+            while self.bytes_used > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes_used -= evicted_size
+                self.evictions += 1
+        return True
+
+    def discard(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.bytes_used -= entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes_used = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes_used': self.bytes_used,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions
+            }
+
+_registry = {}
+
+def register_cache(name, cache):
+    """Make an in-process cache visible to health and metrics reporting."""
+    _registry[name] = cache
+    return cache
+
+def cache_stats():
+    return {name: cache.stats() for name, cache in _registry.items()}
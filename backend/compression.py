@@ -0,0 +1,127 @@
+# backend/compression.py
+
+import gzip
+import zlib
+from flask import request, current_app
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+def available_encodings():
+    """Encodings the server can produce, in order of preference."""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+def negotiate_encoding(accept_encodings):
+    """Pick the best supported encoding from a parsed Accept-Encoding header, or None."""
+    return accept_encodings.best_match(available_encodings())
+
+def compress_body(data, encoding, gzip_level=5, brotli_quality=4):
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    # mtime=0 keeps the output deterministic, so cached variants are byte-stable.
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+def compress_variants(data, gzip_level=5, brotli_quality=4):
+    """Compress a body once per supported encoding, for caches that serve pre-compressed variants."""
+    return {
+        encoding: compress_body(data, encoding, gzip_level, brotli_quality)
+        for encoding in available_encodings()
+    }
+
+def _compress_stream(chunks, encoding, gzip_level, brotli_quality):
+    """Compress an iterable of byte chunks, flushing after each so streamed output is not held back."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=brotli_quality)
+        for chunk in chunks:
+            out = compressor.process(chunk) + compressor.flush()
+            if out:
+                yield out
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            out = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if out:
+                yield out
+        yield compressor.flush()
+
+class Compress:
+    """
+    Negotiated gzip/brotli response compression.
+
+    Responses that already carry a Content-Encoding (e.g. pre-compressed cache entries)
+    are passed through untouched. Levels default to the cheap end: gzip 5 and brotli 4
+    get most of the size win on JSON for a fraction of the CPU of the maximum levels.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('COMPRESS_ENABLED', True)
+        app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+        app.config.setdefault('COMPRESS_GZIP_LEVEL', 5)
+        app.config.setdefault('COMPRESS_BROTLI_QUALITY', 4)
+        app.config.setdefault('COMPRESS_MIMETYPES', ['application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript'])
+        app.extensions['compress'] = self
+        app.after_request(self.after_request)
+
+    def after_request(self, response):
+        config = current_app.config
+
+        if not config['COMPRESS_ENABLED'] or response.mimetype not in config['COMPRESS_MIMETYPES']:
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        if (request.method == 'HEAD'
+                or response.status_code < 200
+                or response.status_code in (204, 206, 304)
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        encoding = negotiate_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        gzip_level = config['COMPRESS_GZIP_LEVEL']
+        brotli_quality = config['COMPRESS_BROTLI_QUALITY']
+
+        if response.is_streamed:
+            original = response.response
+            response.response = _compress_stream(response.iter_encoded(), encoding, gzip_level, brotli_quality)
+            if hasattr(original, 'close'):
+                response.call_on_close(original.close)
+            response.headers.pop('Content-Length', None)
+            response.headers['Content-Encoding'] = encoding
+            return response
+
+        data = response.get_data()
+        if len(data) < config['COMPRESS_MIN_SIZE']:
+            return response
+
+        compressed = compress_body(data, encoding, gzip_level, brotli_quality)
+        if len(compressed) >= len(data):
+            return response
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+def precompressed_response(variants, identity, mimetype='application/json'):
+    """
+    Build a response from a cached body and its pre-compressed variants,
+    picking the variant that matches the request's Accept-Encoding.
+    """
+    encoding = request.accept_encodings.best_match([e for e in available_encodings() if e in variants])
+    if encoding is not None:
+        response = current_app.response_class(variants[encoding], mimetype=mimetype)
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = current_app.response_class(identity, mimetype=mimetype)
+    response.vary.add('Accept-Encoding')
+    return response
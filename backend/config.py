@@ -3,10 +3,105 @@
 import os
 from dotenv import load_dotenv
 
+from db_pool import TimedQueuePool, pool_sizing
+from sqlalchemy.pool import NullPool
+
 env = os.getenv('FLASK_ENV', 'development')
 env_file = f'.env.{env}'
 load_dotenv(env_file)
 
+def _engine_options():
+    """
+    Build engine options for one process.
+
+    With DB_CONNECTION_BUDGET set, pool_size/max_overflow are derived from the budget divided
+    across BACKEND_REPLICAS * GUNICORN_WORKERS; otherwise SQLALCHEMY_POOL_SIZE/MAX_OVERFLOW apply.
+    DB_PGBOUNCER_MODE=null|small targets a transaction-pooling PgBouncer: no per-connection
+    startup options (set statement_timeout on the role instead) and NullPool or a small pool.
+    """
+    workers = int(os.getenv('GUNICORN_WORKERS', 4))
+    threads = int(os.getenv('GUNICORN_THREADS', 4))
+    replicas = int(os.getenv('BACKEND_REPLICAS', 1))
+    budget = int(os.getenv('DB_CONNECTION_BUDGET', 0))
+    pgbouncer_mode = os.getenv('DB_PGBOUNCER_MODE', '').lower()
+
+    if budget > 0:
+        pool_size, max_overflow = pool_sizing(budget, workers, threads, replicas)
+        if os.getenv('SERVER_MODE', 'sync').lower() == 'async':
+            # The overflow share goes to asgi.py's asyncpg pool instead, see _async_pool_sizing().
+            max_overflow = 0
+    else:
+        pool_size = int(os.getenv('SQLALCHEMY_POOL_SIZE', 30))
+        max_overflow = int(os.getenv('SQLALCHEMY_MAX_OVERFLOW', 10))
+
+    connect_args = {'connect_timeout': 60}
+    options = {
+        'echo': bool(os.getenv('SQL_ECHO', False)),
+        'connect_args': connect_args
+    }
+
+    if pgbouncer_mode == 'null':
+        options['poolclass'] = NullPool
+        return options
+
+    options.update({
+        'poolclass': TimedQueuePool,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': int(os.getenv('SQLALCHEMY_POOL_TIMEOUT', 60)),
+        'pool_recycle': int(os.getenv('SQLALCHEMY_POOL_RECYCLE', 1800)),
+        # Liveness is checked by db_pool.install_idle_pre_ping only after an idle period.
+        'pool_pre_ping': False
+    })
+
+    if pgbouncer_mode == 'small':
+        options['pool_size'] = min(pool_size, threads)
+        options['max_overflow'] = 0
+    else:
+        connect_args['options'] = '-c statement_timeout=60000'
+
+    return options
+
+def _async_pool_sizing():
+    """
+    (pool_size, max_overflow) of the asyncpg pool in SERVER_MODE=async. Under DB_CONNECTION_BUDGET
+    it is the part of each process's share that the Flask pool does not keep steady.
+    """
+    budget = int(os.getenv('DB_CONNECTION_BUDGET', 0))
+    if budget > 0:
+        pool_size, overflow = pool_sizing(
+            budget,
+            int(os.getenv('GUNICORN_WORKERS', 4)),
+            int(os.getenv('GUNICORN_THREADS', 4)),
+            int(os.getenv('BACKEND_REPLICAS', 1))
+        )
+        return max(overflow, 1), 0
+    return int(os.getenv('ASYNC_DB_POOL_SIZE', 20)), int(os.getenv('ASYNC_DB_MAX_OVERFLOW', 10))
+
+def _admission_sizing():
+    """
+    (per-route concurrency, queue size, thread cap) for admission.py, derived from the worker's
+    GUNICORN_THREADS unless set: about half the threads per expensive route, and all limited
+    routes together leave ADMISSION_RESERVED_THREADS (a quarter, at least one) to the rest.
+    """
+    threads = int(os.getenv('GUNICORN_THREADS', 4))
+    reserved = int(os.getenv('ADMISSION_RESERVED_THREADS', max(1, threads // 4)))
+    max_threads = max(1, threads - reserved)
+    return (
+        int(os.getenv('ADMISSION_CONCURRENCY', max(1, (threads + 1) // 2))),
+        int(os.getenv('ADMISSION_QUEUE_SIZE', threads)),
+        max_threads
+    )
+
+def _route_limits(value):
+    """'exam=2,submit_answers=1' -> {'exam': 2, 'submit_answers': 1}"""
+    limits = {}
+    for item in value.split(','):
+        if '=' in item:
+            route, limit = item.split('=', 1)
+            limits[route.strip()] = int(limit)
+    return limits
+
 class Config:
     """Flask application configuration."""
     
@@ -23,24 +118,117 @@ class Config:
         f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_size': int(os.getenv('SQLALCHEMY_POOL_SIZE', 30)),
-        'max_overflow': int(os.getenv('SQLALCHEMY_MAX_OVERFLOW', 10)),
-        'pool_timeout': int(os.getenv('SQLALCHEMY_POOL_TIMEOUT', 60)),
-        'pool_recycle': int(os.getenv('SQLALCHEMY_POOL_RECYCLE', 1800)),
-        'pool_pre_ping': True,
-        'echo': bool(os.getenv('SQL_ECHO', False)),
-        'connect_args': {
-            'connect_timeout': 60,
-            'options': '-c statement_timeout=60000'
-        }
-    }
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options()
+
+    # Optional read replica; routes marked with db_routing.read_only read from it.
+    SQLALCHEMY_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+    SQLALCHEMY_BINDS = {
+        'replica': {'url': SQLALCHEMY_REPLICA_URL, **_engine_options()}
+    } if SQLALCHEMY_REPLICA_URL else {}
+    # After a write, that user's reads stay on the primary for this long, on any worker that gets
+    # the signed X-Read-Your-Writes header back from the client (db_routing.py); 0 disables.
+    DB_READ_YOUR_WRITES_SECONDS = float(os.getenv('DB_READ_YOUR_WRITES_SECONDS', 5))
+
+    # SERVER_MODE=async (asgi.py): asyncpg pool per worker for the async read endpoints, in
+    # addition to the regular pool that the mounted Flask app keeps using.
+    ASYNC_DB_POOL_SIZE, ASYNC_DB_MAX_OVERFLOW = _async_pool_sizing()
+    # Threads per async worker running the mounted Flask routes; as many as a gthread worker has.
+    ASYNC_WSGI_THREADS = int(os.getenv('ASYNC_WSGI_THREADS', os.getenv('GUNICORN_THREADS', 4)))
+
+    # Connections idle in the pool for longer than this are pinged on checkout; -1 disables.
+    DB_PRE_PING_IDLE_SECONDS = float(os.getenv('DB_PRE_PING_IDLE_SECONDS', 30))
+
+    # init-backend.sh runs scripts/init_db.py when a migration is needed, so pods can skip the DDL on boot.
+    CREATE_TABLES_ON_STARTUP = os.getenv('CREATE_TABLES_ON_STARTUP', 'true').lower() == 'true'
 
     SQLALCHEMY_RECORD_QUERIES = False
     SQLALCHEMY_COMMIT_ON_TEARDOWN = False
     SQLALCHEMY_ECHO = False
     
     JSON_SORT_KEYS = False
+    # 'orjson' (falls back to the stdlib when not installed) or 'stdlib'; see json_provider.py.
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'orjson')
+
+    # Per-request SQL accounting (request_timing.py); Server-Timing is opt-in for production.
+    SERVER_TIMING = os.getenv('SERVER_TIMING', 'true' if ENV != 'production' else 'false').lower() == 'true'
+    SLOW_REQUEST_QUERY_COUNT = int(os.getenv('SLOW_REQUEST_QUERY_COUNT', 50))
+    SLOW_REQUEST_DB_MS = float(os.getenv('SLOW_REQUEST_DB_MS', 500))
+
+    # Opt-in slow statement recorder with EXPLAIN capture (slow_queries.py), viewable by admins.
+    SLOW_QUERY_ENABLED = os.getenv('SLOW_QUERY_ENABLED', 'false').lower() == 'true'
+    SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', 200))
+    SLOW_QUERY_EXPLAIN = os.getenv('SLOW_QUERY_EXPLAIN', 'true').lower() == 'true'
+    SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv('SLOW_QUERY_EXPLAIN_INTERVAL', 60))
+    SLOW_QUERY_BUFFER_SIZE = int(os.getenv('SLOW_QUERY_BUFFER_SIZE', 200))
+
+    # Comma-separated user ids / emails allowed to use /api/admin/* endpoints.
+    ADMIN_USER_IDS = [int(i) for i in os.getenv('ADMIN_USER_IDS', '').split(',') if i.strip()]
+    ADMIN_EMAILS = [e.strip().lower() for e in os.getenv('ADMIN_EMAILS', '').split(',') if e.strip()]
+
+    # Prometheus metrics at /metrics (not routed by the ingress, which only forwards /api/).
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_GAUGE_INTERVAL = float(os.getenv('METRICS_GAUGE_INTERVAL', 1.0))
+
+    # Readiness probes (health.py) read a database status refreshed in the background every
+    # HEALTH_CHECK_INTERVAL_SECONDS; older than HEALTH_STALE_SECONDS counts as not ready.
+    HEALTH_CHECK_INTERVAL_SECONDS = float(os.getenv('HEALTH_CHECK_INTERVAL_SECONDS', 10))
+    HEALTH_STALE_SECONDS = float(os.getenv('HEALTH_STALE_SECONDS', 60))
+    HEALTH_CHECK_TIMEOUT_MS = int(os.getenv('HEALTH_CHECK_TIMEOUT_MS', 2000))
+
+    # Admission control (admission.py) for /api/exams/<id>, /api/exam-progress and /api/submit-answers,
+    # per worker: concurrency per route (ADMISSION_ROUTE_LIMITS overrides it, e.g. 'submit_answers=1'),
+    # how many more may wait and for how long, and the threads all of them may hold together; the
+    # rest get 503 with Retry-After. Async routes (asgi.py) are limited to their asyncpg pool instead.
+    ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'true').lower() == 'true'
+    ADMISSION_CONCURRENCY, ADMISSION_QUEUE_SIZE, ADMISSION_MAX_THREADS = _admission_sizing()
+    ADMISSION_ROUTE_LIMITS = _route_limits(os.getenv('ADMISSION_ROUTE_LIMITS', ''))
+    ADMISSION_QUEUE_TIMEOUT_MS = int(os.getenv('ADMISSION_QUEUE_TIMEOUT_MS', 2000))
+    ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv('ADMISSION_RETRY_AFTER_SECONDS', 2))
+
+    # Concurrent misses for the same exam payload or catalog page share one load (singleflight.py);
+    # a waiter gives up after this long and gets 503 with Retry-After, while the load carries on.
+    SINGLEFLIGHT_TIMEOUT_SECONDS = float(os.getenv('SINGLEFLIGHT_TIMEOUT_SECONDS', 10))
+
+    # Keyset-paginated /api/providers: page size cap and how long the optional total is cached per worker.
+    PROVIDERS_MAX_PAGE_SIZE = int(os.getenv('PROVIDERS_MAX_PAGE_SIZE', 100))
+    PROVIDER_TOTAL_CACHE_SECONDS = float(os.getenv('PROVIDER_TOTAL_CACHE_SECONDS', 60))
+    EXAM_PROGRESS_MAX_PAGE_SIZE = int(os.getenv('EXAM_PROGRESS_MAX_PAGE_SIZE', 100))
+    REVIEW_MAX_PAGE_SIZE = int(os.getenv('REVIEW_MAX_PAGE_SIZE', 50))
+
+    # Background progress resets (purge.py): rows per delete transaction, optional pause between
+    # chunks, when a running job's heartbeat counts as dead, and how long finished jobs are kept.
+    # A failing job is retried after PURGE_RETRY_BACKOFF_SECONDS, doubling each time, and after
+    # PURGE_MAX_ATTEMPTS stays 'failed' (its rows still hidden) until run_purge_jobs.py re-runs it.
+    PURGE_WORKERS = int(os.getenv('PURGE_WORKERS', 1))
+    PURGE_CHUNK_SIZE = int(os.getenv('PURGE_CHUNK_SIZE', 1000))
+    PURGE_CHUNK_PAUSE_SECONDS = float(os.getenv('PURGE_CHUNK_PAUSE_SECONDS', 0))
+    PURGE_STALE_SECONDS = float(os.getenv('PURGE_STALE_SECONDS', 120))
+    PURGE_JOB_RETENTION_DAYS = int(os.getenv('PURGE_JOB_RETENTION_DAYS', 7))
+    PURGE_MAX_ATTEMPTS = int(os.getenv('PURGE_MAX_ATTEMPTS', 5))
+    PURGE_RETRY_BACKOFF_SECONDS = float(os.getenv('PURGE_RETRY_BACKOFF_SECONDS', 30))
+
+    # Per-question difficulty counters (question_stats.py): increment shards per question, and how
+    # often (per worker) and in what batches they are merged into question_stat.
+    QUESTION_STATS_SHARDS = int(os.getenv('QUESTION_STATS_SHARDS', 16))
+    QUESTION_STATS_MERGE_SECONDS = float(os.getenv('QUESTION_STATS_MERGE_SECONDS', 300))
+    QUESTION_STATS_MERGE_BATCH = int(os.getenv('QUESTION_STATS_MERGE_BATCH', 5000))
+
+    # Idempotency-Key on /api/submit-answers (idempotency.py): how long a key replays its result,
+    # the per-worker cache of recent results, and how often (per worker) expired keys are pruned.
+    IDEMPOTENCY_TTL_HOURS = float(os.getenv('IDEMPOTENCY_TTL_HOURS', 24))
+    IDEMPOTENCY_CACHE_MAX_BYTES = int(os.getenv('IDEMPOTENCY_CACHE_MAX_BYTES', 8 * 1024 * 1024))
+    IDEMPOTENCY_PRUNE_SECONDS = float(os.getenv('IDEMPOTENCY_PRUNE_SECONDS', 600))
+    IDEMPOTENCY_PRUNE_BATCH = int(os.getenv('IDEMPOTENCY_PRUNE_BATCH', 1000))
+
+    # Per-worker budget for serialized /api/exams payloads (including compressed variants).
+    EXAM_CACHE_MAX_BYTES = int(os.getenv('EXAM_CACHE_MAX_BYTES', 128 * 1024 * 1024))
+    # Per-worker budget for answer keys used by the running score tally (scoring.py).
+    ANSWER_KEY_CACHE_MAX_BYTES = int(os.getenv('ANSWER_KEY_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 5))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 4))
     CORS_HEADERS = 'Content-Type'
     
     API_URL = os.getenv('API_URL', 
@@ -63,6 +251,23 @@ class Config:
 
     GOOGLE_CLIENT_ID = os.getenv('GOOGLE_CLIENT_ID')
     GOOGLE_CLIENT_SECRET = os.getenv('GOOGLE_CLIENT_SECRET')    
+
+    # Identity provider endpoints; overridable so logins can run against scripts/fake_idp.py.
+    GITHUB_AUTHORIZE_URL = os.getenv('GITHUB_AUTHORIZE_URL', 'https://github.com/login/oauth/authorize')
+    GITHUB_ACCESS_TOKEN_URL = os.getenv('GITHUB_ACCESS_TOKEN_URL', 'https://github.com/login/oauth/access_token')
+    GITHUB_API_URL = os.getenv('GITHUB_API_URL', 'https://api.github.com/')
+    GOOGLE_METADATA_URL = os.getenv('GOOGLE_METADATA_URL', 'https://accounts.google.com/.well-known/openid-configuration')
+
+    # Outbound calls to the identity providers (oidc_cache.py): keep-alive pool per worker, request
+    # timeout, and how long OpenID metadata and JWKS are reused before a background refresh. Past
+    # OIDC_MAX_STALE_SECONDS a login waits for a fresh copy; an unknown key id refetches the JWKS
+    # at most every OIDC_JWKS_MIN_REFRESH_SECONDS.
+    OAUTH_HTTP_POOL_SIZE = int(os.getenv('OAUTH_HTTP_POOL_SIZE', 10))
+    OAUTH_HTTP_TIMEOUT = float(os.getenv('OAUTH_HTTP_TIMEOUT', 10))
+    OIDC_METADATA_TTL_SECONDS = float(os.getenv('OIDC_METADATA_TTL_SECONDS', 3600))
+    OIDC_JWKS_TTL_SECONDS = float(os.getenv('OIDC_JWKS_TTL_SECONDS', 3600))
+    OIDC_MAX_STALE_SECONDS = float(os.getenv('OIDC_MAX_STALE_SECONDS', 86400))
+    OIDC_JWKS_MIN_REFRESH_SECONDS = float(os.getenv('OIDC_JWKS_MIN_REFRESH_SECONDS', 60))
     
     PREFERRED_URL_SCHEME = 'https'
     
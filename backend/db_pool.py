@@ -0,0 +1,115 @@
+# backend/db_pool.py
+
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+class PoolStats:
+    """Process-wide pool checkout wait statistics, shared by every TimedQueuePool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._observers = []
+
+    def add_observer(self, callback):
+        """Call callback(seconds, timed_out) for every checkout, e.g. to feed a histogram."""
+        self._observers.append(callback)
+
+    def record(self, seconds, timed_out=False):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            if seconds > self.wait_seconds_max:
+                self.wait_seconds_max = seconds
+            if timed_out:
+                self.timeouts += 1
+        for callback in self._observers:
+            callback(seconds, timed_out)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'checkout_timeouts': self.timeouts,
+                'checkout_wait_seconds_total': round(self.wait_seconds_total, 6),
+                'checkout_wait_seconds_max': round(self.wait_seconds_max, 6),
+                'checkout_wait_seconds_avg': round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0
+            }
+
+pool_stats = PoolStats()
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            pool_stats.record(time.perf_counter() - start, timed_out)
+
+def install_idle_pre_ping(engine, idle_seconds):
+    """
+    Ping a pooled connection on checkout only if it sat idle for longer than idle_seconds.
+    Replaces pool_pre_ping, which costs a round trip on every checkout.
+    """
+    if idle_seconds is None or idle_seconds < 0:
+        return
+
+    @event.listens_for(engine, 'checkin')
+    def record_checkin(dbapi_connection, connection_record):
+        connection_record.info['last_checkin'] = time.monotonic()
+
+    @event.listens_for(engine, 'checkout')
+    def ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        last_checkin = connection_record.info.get('last_checkin')
+        if last_checkin is None or time.monotonic() - last_checkin < idle_seconds:
+            return
+
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute('SELECT 1')
+            dbapi_connection.rollback()
+        except Exception:
+            # The pool discards this connection and retries the checkout with a fresh one.
+            raise exc.DisconnectionError()
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+def pool_status(engine):
+    """Current pool occupancy plus checkout wait statistics for an engine."""
+    pool = engine.pool
+    status = {'pool_class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow
+        })
+    status.update(pool_stats.snapshot())
+    return status
+
+def pool_sizing(budget, workers, threads, replicas):
+    """
+    Split a fleet-wide connection budget across replicas * workers processes.
+    Each process keeps one steady connection per thread (capped by its share) and may
+    overflow up to the rest of its share.
+    """
+    processes = max(workers, 1) * max(replicas, 1)
+    per_process = max(budget // processes, 1)
+    pool_size = min(max(threads, 1), per_process)
+    return pool_size, per_process - pool_size
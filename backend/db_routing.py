@@ -0,0 +1,135 @@
+# backend/db_routing.py
+
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import g, has_request_context, current_app, request
+from flask_sqlalchemy.session import Session
+from itsdangerous import Signer, BadSignature
+from sqlalchemy import event
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND_KEY = 'replica'
+
+# The read-your-writes pin travels with the client: a response after a write carries a signed
+# "<user_id>:<until ms>" in this header, and the frontend sends it back on its next requests,
+# whichever worker or pod serves them. The per-process pin below only covers clients that don't.
+PIN_HEADER = 'X-Read-Your-Writes'
+
+_pins = {}
+_pins_lock = threading.Lock()
+
+def _pin_signer(secret_key=None):
+    # asgi.py has no app context and passes the key itself.
+    return Signer(secret_key or current_app.config['JWT_SECRET_KEY'], salt='read-your-writes')
+
+def pin_token(user_id, until, secret_key=None):
+    """Signed PIN_HEADER value keeping user_id on the primary until the wall-clock time until."""
+    return _pin_signer(secret_key).sign(f"{user_id}:{int(until * 1000)}").decode()
+
+def token_pins(user_id, token, secret_key=None):
+    """True if token is a valid, unexpired PIN_HEADER value for user_id."""
+    if not token or user_id is None:
+        return False
+    try:
+        pinned_user, until_ms = _pin_signer(secret_key).unsign(token).decode().split(':')
+        return int(pinned_user) == user_id and int(until_ms) > time.time() * 1000
+    except (BadSignature, ValueError):
+        return False
+
+def pin_to_primary(user_id, seconds=None):
+    """
+    Send this user's reads to the primary for the read-your-writes window. Returns the window's
+    end as a wall-clock time for pin_token, or None when pinning is disabled.
+    """
+    if user_id is None:
+        return None
+    if seconds is None:
+        seconds = current_app.config.get('DB_READ_YOUR_WRITES_SECONDS', 0)
+    if seconds <= 0:
+        return None
+
+    now = time.monotonic()
+    with _pins_lock:
+        _pins[user_id] = now + seconds
+        if len(_pins) > 10000:
+            for key in [key for key, expires in _pins.items() if expires <= now]:
+                del _pins[key]
+    until = time.time() + seconds
+    if has_request_context():
+        g.db_pinned = (user_id, until)
+    return until
+
+def is_pinned(user_id, token=None, secret_key=None):
+    """Whether user_id's reads go to the primary, by this process's pin or the client's PIN_HEADER token."""
+    expires = _pins.get(user_id)
+    return (expires is not None and expires > time.monotonic()) or token_pins(user_id, token, secret_key)
+
+def _use_replica():
+    if not has_request_context() or not g.get('db_read_only') or g.get('db_force_primary'):
+        return False
+    return not is_pinned(g.get('current_user_id'), request.headers.get(PIN_HEADER))
+
+def init_read_your_writes(app):
+    """Hand the pin set by this request's writes to the client in PIN_HEADER."""
+    @app.after_request
+    def _send_pin(response):
+        pinned = g.get('db_pinned')
+        if pinned is not None:
+            response.headers[PIN_HEADER] = pin_token(*pinned)
+        return response
+
+def read_only(f):
+    """Mark a route as read-only so its queries may be served by the replica engine."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        g.db_read_only = True
+        return f(*args, **kwargs)
+    return decorated
+
+@contextmanager
+def use_primary():
+    """Force queries inside the block to the primary, e.g. read-modify-write inside a read-only route."""
+    previous = g.get('db_force_primary', False)
+    g.db_force_primary = True
+    try:
+        yield
+    finally:
+        g.db_force_primary = previous
+
+def replica_in_use():
+    return _use_replica() and REPLICA_BIND_KEY in current_app.extensions['sqlalchemy'].engines
+
+class RoutingSession(Session):
+    """
+    Session that routes reads of read-only requests to the replica bind when one is configured.
+    Flushes and bulk UPDATE/DELETE always go to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not isinstance(clause, UpdateBase) and _use_replica():
+            replica = self._db.engines.get(REPLICA_BIND_KEY)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_flush_writes(session, flush_context):
+    session.info['has_writes'] = True
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _mark_bulk_writes(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        orm_execute_state.session.info['has_writes'] = True
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _pin_writer(session):
+    # Writes committed inside use_primary() already read their own data from the primary,
+    # so bookkeeping such as visit tracking does not pin the whole user.
+    if session.info.pop('has_writes', False) and has_request_context() and not g.get('db_force_primary'):
+        pin_to_primary(g.get('current_user_id'))
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _clear_writes(session):
+    session.info.pop('has_writes', None)
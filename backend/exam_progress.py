@@ -0,0 +1,194 @@
+# backend/exam_progress.py
+
+from datetime import datetime
+from sqlalchemy import select, union, case, cast, func, and_, or_, Float
+from models import Provider, Exam, UserPreference, UserAnswer, ExamAttempt, ExamVisit
+from utils import format_display_title
+
+STATUSES = ('Passed', 'Failed', 'Not Attempted', 'In Progress')
+
+# Sort key (ms) for exams with answers but no attempt: later than any real activity, so they
+# come first, as the old utcnow() timestamp did, while staying stable for keyset cursors.
+IN_PROGRESS_SORT_KEY = 1e15
+
+def exam_progress_query(user_id, provider_names=None, status=None, after=None, limit=None, visibility=None):
+    """
+    One statement for a user's exam progress rows, newest activity first.
+
+    The exam set is every exam the user answered, attempted, visited or last opened. Per-exam
+    aggregates come from CTEs: answer counts, the latest attempt with attempt count and average
+    (a window over exam_attempt), and the last visit. Filtering by provider name and status, the
+    activity sort and keyset pagination (after=(sort_key, exam_id)) all happen in SQL.
+
+    Status is Passed/Failed from the latest attempt; without attempts it is In Progress when
+    any answer is saved and Not Attempted otherwise.
+
+    visibility, when given, maps a model to extra WHERE conditions for its rows (used to hide
+    rows a pending purge has tombstoned).
+    """
+    def visible(model):
+        return visibility(model) if visibility else []
+
+    answers = select(
+        UserAnswer.exam_id,
+        func.count().label('answered')
+    ).where(UserAnswer.user_id == user_id, *visible(UserAnswer)).group_by(UserAnswer.exam_id).cte('answers')
+
+    ranked = select(
+        ExamAttempt.exam_id,
+        ExamAttempt.score,
+        ExamAttempt.total_questions,
+        ExamAttempt.attempt_date,
+        func.count().over(partition_by=ExamAttempt.exam_id).label('attempt_count'),
+        func.avg(ExamAttempt.score).over(partition_by=ExamAttempt.exam_id).label('average_score'),
+        func.row_number().over(partition_by=ExamAttempt.exam_id, order_by=ExamAttempt.attempt_date.desc()).label('rank')
+    ).where(ExamAttempt.user_id == user_id, *visible(ExamAttempt)).subquery('ranked_attempts')
+    attempts = select(ranked).where(ranked.c.rank == 1).cte('attempts')
+
+    visits = select(
+        ExamVisit.exam_id,
+        func.max(ExamVisit.last_visit_date).label('last_visit_date')
+    ).where(ExamVisit.user_id == user_id, *visible(ExamVisit)).group_by(ExamVisit.exam_id).cte('visits')
+
+    touched = union(
+        select(answers.c.exam_id),
+        select(attempts.c.exam_id),
+        select(visits.c.exam_id),
+        select(UserPreference.last_visited_exam.label('exam_id')).where(
+            UserPreference.user_id == user_id,
+            UserPreference.last_visited_exam.isnot(None)
+        )
+    ).subquery('touched')
+
+    answered = func.coalesce(answers.c.answered, 0)
+    status_expr = case(
+        (attempts.c.attempt_count.isnot(None), case((attempts.c.score >= 75, 'Passed'), else_='Failed')),
+        (answered > 0, 'In Progress'),
+        else_='Not Attempted'
+    )
+    sort_key = cast(case(
+        (attempts.c.attempt_date.isnot(None), func.extract('epoch', attempts.c.attempt_date) * 1000),
+        (answered > 0, IN_PROGRESS_SORT_KEY),
+        (visits.c.last_visit_date.isnot(None), func.extract('epoch', visits.c.last_visit_date) * 1000),
+        else_=0
+    ), Float)
+
+    stmt = select(
+        Exam.id,
+        Exam.title,
+        Exam.total_questions,
+        Provider.name.label('provider_name'),
+        Provider.is_popular,
+        answered.label('answered'),
+        func.coalesce(attempts.c.attempt_count, 0).label('attempt_count'),
+        attempts.c.average_score,
+        attempts.c.score.label('latest_score'),
+        attempts.c.total_questions.label('latest_total'),
+        attempts.c.attempt_date.label('latest_attempt_date'),
+        visits.c.last_visit_date,
+        status_expr.label('status'),
+        sort_key.label('sort_key')
+    ).select_from(touched).join(
+        Exam, Exam.id == touched.c.exam_id
+    ).join(
+        Provider, Provider.id == Exam.provider_id
+    ).outerjoin(
+        answers, answers.c.exam_id == Exam.id
+    ).outerjoin(
+        attempts, attempts.c.exam_id == Exam.id
+    ).outerjoin(
+        visits, visits.c.exam_id == Exam.id
+    )
+
+    if provider_names:
+        stmt = stmt.where(Provider.name.in_(provider_names))
+    if status:
+        stmt = stmt.where(status_expr == status)
+    if after is not None:
+        after_key, after_id = after
+        stmt = stmt.where(or_(sort_key < after_key, and_(sort_key == after_key, Exam.id > after_id)))
+
+    stmt = stmt.order_by(sort_key.desc(), Exam.id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+def relative_time(moment, now):
+    """'Just now', '5 minutes ago', 'Yesterday', '3 weeks ago', ..."""
+    time_diff = now - moment
+    if time_diff.days == 0:
+        if time_diff.seconds < 3600:
+            if time_diff.seconds < 300:
+                return "Just now"
+            minutes = time_diff.seconds // 60
+            return f"{minutes} {'minute' if minutes == 1 else 'minutes'} ago"
+        hours = time_diff.seconds // 3600
+        return f"{hours} {'hour' if hours == 1 else 'hours'} ago"
+    if time_diff.days == 1:
+        return "Yesterday"
+    if time_diff.days < 7:
+        return f"{time_diff.days} {'day' if time_diff.days == 1 else 'days'} ago"
+    if time_diff.days < 30:
+        weeks = time_diff.days // 7
+        return f"{weeks} {'week' if weeks == 1 else 'weeks'} ago"
+    months = time_diff.days // 30
+    return f"{months} {'month' if months == 1 else 'months'} ago"
+
+def serialize_progress_row(row, now=None):
+    """The /api/exam-progress entry for one exam_progress_query row."""
+    now = now or datetime.utcnow()
+    total_questions = row.total_questions
+    progress = round((row.answered / total_questions * 100) if total_questions > 0 else 0, 1)
+
+    latest_grade = None
+    average_score = 0
+    if row.attempt_count > 0:
+        latest_grade = {
+            'score': round((row.latest_score / 100) * row.latest_total),
+            'total': row.latest_total
+        }
+        average_score = round(float(row.average_score), 2)
+
+    if row.latest_attempt_date is not None:
+        timestamp = row.latest_attempt_date.timestamp() * 1000
+        last_update = relative_time(row.latest_attempt_date, now)
+    elif row.answered > 0:
+        timestamp = now.timestamp() * 1000
+        last_update = "In Progress"
+    elif row.last_visit_date is not None:
+        timestamp = row.last_visit_date.timestamp() * 1000
+        last_update = relative_time(row.last_visit_date, now)
+    else:
+        timestamp = None
+        last_update = "Not Started"
+
+    return {
+        'id': row.id,
+        'exam': format_display_title(row.title),
+        'examType': 'Actual',
+        'attempts': row.attempt_count,
+        'averageScore': average_score,
+        'progress': progress,
+        'latestGrade': latest_grade or {
+            'score': 0,
+            'total': total_questions
+        },
+        # The query's status, so ?status= filters on exactly what is shown.
+        'status': row.status,
+        'timestamp': timestamp,
+        'updated': last_update
+    }
+
+def group_by_provider(rows, now=None):
+    """Group rows into the response's provider list, keeping row order within and across providers."""
+    now = now or datetime.utcnow()
+    provider_data = {}
+    for row in rows:
+        if row.provider_name not in provider_data:
+            provider_data[row.provider_name] = {
+                'name': row.provider_name,
+                'exams': [],
+                'isPopular': row.is_popular
+            }
+        provider_data[row.provider_name]['exams'].append(serialize_progress_row(row, now))
+    return list(provider_data.values())
@@ -0,0 +1,59 @@
+# backend/grading.py
+
+from collections import namedtuple
+
+# layout is [[topic_number, question_count], ...] in grading order; question ordinals run across
+# it, so bit i of incorrect_bitmap is the i-th graded question (see attempt_results.py).
+GradedAttempt = namedtuple('GradedAttempt', [
+    'total_questions', 'correct_answers', 'incorrect_questions', 'layout', 'incorrect_bitmap', 'topic_scores'
+])
+
+def grade_attempt(topics, user_answers):
+    """
+    Grade submitted answers against exam topics.
+
+    topics is an iterable of objects with .number and .data (the question list);
+    user_answers maps "T<topic> Q<n>" to a list of selected option indices.
+    Besides the totals and the "T<topic> Q<n>" list of wrong answers, returns the exam layout,
+    an LSB-first bitmap of wrong answers over question ordinals and [topic, correct, total] per topic.
+    """
+    topics = list(topics)
+    total_questions = 0
+    correct_answers = 0
+    incorrect_questions = []
+    layout = []
+    topic_scores = []
+    incorrect_bitmap = bytearray((sum(len(topic.data) for topic in topics) + 7) // 8)
+
+    for topic in topics:
+        topic_data = topic.data
+        topic_correct = 0
+        for question_index, question in enumerate(topic_data):
+            ordinal = total_questions
+            total_questions += 1
+            question_id = f"T{topic.number} Q{question_index + 1}"
+
+            user_answer_indices = user_answers.get(question_id, [])
+            if not isinstance(user_answer_indices, list):
+                user_answer_indices = []
+
+            correct_indices = {ord(letter.upper()) - ord('A') for letter in question['answer']}
+            user_indices = {int(index) for index in user_answer_indices if isinstance(index, (int, str)) and str(index).isdigit()}
+
+            if correct_indices == user_indices:
+                correct_answers += 1
+                topic_correct += 1
+            else:
+                incorrect_questions.append(question_id)
+                incorrect_bitmap[ordinal >> 3] |= 1 << (ordinal & 7)
+
+        layout.append([topic.number, len(topic_data)])
+        topic_scores.append([topic.number, topic_correct, len(topic_data)])
+
+    return GradedAttempt(total_questions, correct_answers, incorrect_questions, layout,
+                         bytes(incorrect_bitmap), topic_scores)
+
+def grade_answers(topics, user_answers):
+    """Returns (total_questions, correct_answers, incorrect_questions), see grade_attempt."""
+    graded = grade_attempt(topics, user_answers)
+    return graded.total_questions, graded.correct_answers, graded.incorrect_questions
@@ -0,0 +1,11 @@
+# backend/gunicorn.conf.py
+# Picked up automatically by gunicorn from the working directory (/app); CLI flags in
+# scripts/init-backend.sh still take precedence for everything set there.
+
+import os
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges from the multiprocess metrics directory."""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,156 @@
+# backend/health.py
+"""
+Tiered health endpoints, served at /health/* and /api/health/*:
+
+- live:  the process answers; no database, no locks. For liveness probes and HEALTHCHECK.
+- ready: the worker's cached database status plus pool saturation and cache warmth. For
+         readiness probes; never touches the database itself.
+- deep:  checks the database now, on demand (dashboards, debugging).
+
+/health and /api/health answer like ready.
+"""
+
+import os
+import time
+import threading
+from flask import Blueprint, jsonify, current_app
+from sqlalchemy import text
+from app import db
+from db_pool import pool_status
+from cache import cache_stats
+from singleflight import group_stats
+
+health_bp = Blueprint('health', __name__)
+
+def pool_saturation(status):
+    """Share of the pool's maximum connections currently checked out (None without a QueuePool)."""
+    if 'checked_out' not in status:
+        return None
+    capacity = status['size'] + status['max_overflow']
+    return round(status['checked_out'] / capacity, 4) if capacity else None
+
+class HealthMonitor:
+    """
+    Per-worker database status for readiness probes. A background thread runs SELECT 1 every
+    HEALTH_CHECK_INTERVAL_SECONDS, so probes read the last result instead of checking out a
+    connection each. While every pooled connection is in use the check is skipped rather than
+    queued behind requests; if that lasts longer than HEALTH_STALE_SECONDS the worker reports
+    not ready, as it also does when the last check failed.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._thread = None
+        self.ok = None
+        self.error = None
+        self.latency_ms = None
+        self.checked_at = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('HEALTH_CHECK_INTERVAL_SECONDS', 10)
+        app.config.setdefault('HEALTH_STALE_SECONDS', 60)
+        app.config.setdefault('HEALTH_CHECK_TIMEOUT_MS', 2000)
+        self.app = app
+        app.extensions['health'] = self
+
+    def start(self):
+        """Start the background checker in this process (after gunicorn forked it), once."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='health-check', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self.app.app_context():
+                if not self._pool_exhausted():
+                    self.check()
+            time.sleep(self.app.config['HEALTH_CHECK_INTERVAL_SECONDS'])
+
+    def _pool_exhausted(self):
+        status = pool_status(db.engine)
+        return 'checked_out' in status and status['checked_out'] >= status['size'] + status['max_overflow']
+
+    def check(self):
+        """Run SELECT 1 now and record the outcome; returns True when the database answered."""
+        start = time.perf_counter()
+        try:
+            db.session.execute(text(f"SET LOCAL statement_timeout = {int(self.app.config['HEALTH_CHECK_TIMEOUT_MS'])}"))
+            db.session.execute(text('SELECT 1'))
+            db.session.rollback()
+            self.ok, self.error = True, None
+        except Exception as e:
+            db.session.rollback()
+            self.ok, self.error = False, str(e)
+        finally:
+            db.session.remove()
+        self.latency_ms = round((time.perf_counter() - start) * 1000, 2)
+        self.checked_at = time.monotonic()
+        return self.ok
+
+    def database_status(self):
+        age = time.monotonic() - self.checked_at if self.checked_at is not None else None
+        return {
+            'ok': bool(self.ok) and age is not None and age <= self.app.config['HEALTH_STALE_SECONDS'],
+            'last_check_ok': self.ok,
+            'checked_seconds_ago': round(age, 2) if age is not None else None,
+            'latency_ms': self.latency_ms,
+            'error': self.error
+        }
+
+def health_monitor():
+    monitor = current_app.extensions['health']
+    monitor.start()
+    return monitor
+
+def readiness():
+    monitor = health_monitor()
+    if monitor.checked_at is None:
+        # First probe in this worker: answer from a real check rather than "unknown".
+        monitor.check()
+    database = monitor.database_status()
+    pool = pool_status(db.engine)
+    pool['saturation'] = pool_saturation(pool)
+    caches = {
+        name: {'warm': stats['entries'] > 0, 'entries': stats['entries'], 'bytes_used': stats['bytes_used']}
+        for name, stats in cache_stats().items()
+    }
+    ready = database['ok']
+    return jsonify({
+        'status': 'ready' if ready else 'not_ready',
+        'database': database,
+        'pool': pool,
+        'caches': caches
+    }), 200 if ready else 503
+
+@health_bp.route('/health')
+@health_bp.route('/health/ready')
+def ready_check():
+    return readiness()
+
+@health_bp.route('/health/live')
+def live_check():
+    return jsonify({'status': 'alive', 'pid': os.getpid()}), 200
+
+@health_bp.route('/health/deep')
+def deep_check():
+    monitor = health_monitor()
+    healthy = monitor.check()
+    pool = pool_status(db.engine)
+    pool['saturation'] = pool_saturation(pool)
+    return jsonify({
+        'status': 'healthy' if healthy else 'unhealthy',
+        'database': 'connected' if healthy else monitor.error,
+        'latency_ms': monitor.latency_ms,
+        'pool': pool,
+        'caches': cache_stats(),
+        'admission': current_app.extensions['admission'].stats(),
+        'singleflight': group_stats(),
+        'startup': current_app.extensions['startup'].summary(),
+        'env': os.getenv('FLASK_ENV', 'production')
+    }), 200 if healthy else 500
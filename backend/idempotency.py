@@ -0,0 +1,127 @@
+# backend/idempotency.py
+
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+from app import db
+from cache import ByteLRUCache, register_cache
+from models import SubmissionIdempotency
+
+MAX_KEY_LENGTH = 255
+
+class IdempotencyKeyMismatch(Exception):
+    """The key was already used for a different request body."""
+
+def request_fingerprint(payload):
+    """Stable hash of a request body, independent of key order."""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+def _entry_size(entry):
+    return 128 + len(entry[2])
+
+class IdempotencyStore:
+    """
+    Remembers results of requests made with an Idempotency-Key, per user.
+
+    A per-worker ByteLRUCache answers repeats without a query; submission_idempotency makes
+    results durable and shared across workers for IDEMPOTENCY_TTL_HOURS. The key is claimed
+    with INSERT ... ON CONFLICT DO NOTHING in the same transaction that writes the result, so a
+    concurrent duplicate blocks on the uncommitted key and then replays the committed result;
+    if the first request fails and rolls back, the duplicate's claim succeeds and it runs itself.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('IDEMPOTENCY_TTL_HOURS', 24)
+        app.config.setdefault('IDEMPOTENCY_CACHE_MAX_BYTES', 8 * 1024 * 1024)
+        app.config.setdefault('IDEMPOTENCY_PRUNE_SECONDS', 600)
+        app.config.setdefault('IDEMPOTENCY_PRUNE_BATCH', 1000)
+        self.app = app
+        # (user_id, key) -> (request_hash, status_code, response bytes, stored at)
+        self.cache = register_cache(
+            'idempotency',
+            ByteLRUCache(app.config['IDEMPOTENCY_CACHE_MAX_BYTES'], sizeof=_entry_size)
+        )
+        app.extensions['idempotency'] = self
+
+    @property
+    def ttl(self):
+        return timedelta(hours=self.app.config['IDEMPOTENCY_TTL_HOURS'])
+
+    def _check(self, request_hash, stored_hash):
+        if stored_hash != request_hash:
+            raise IdempotencyKeyMismatch()
+
+    def begin(self, user_id, key, request_hash):
+        """
+        Claim key for this request in the current transaction. Returns None when the caller
+        should process the request, or (status_code, response) of the original request to replay.
+        Raises IdempotencyKeyMismatch if the key was used for a different request.
+        """
+        entry = self.cache.get((user_id, key))
+        if entry is not None and time.time() - entry[3] < self.ttl.total_seconds():
+            self._check(request_hash, entry[0])
+            return entry[1], json.loads(entry[2])
+
+        self.maybe_prune()
+        claimed = db.session.execute(insert(SubmissionIdempotency).values(
+            user_id=user_id,
+            key=key,
+            request_hash=request_hash,
+            created_at=datetime.utcnow()
+        ).on_conflict_do_nothing().returning(SubmissionIdempotency.key)).first()
+        if claimed is not None:
+            return None
+
+        # Either a committed result, or an expired row that pruning has not reached yet.
+        row = db.session.execute(select(SubmissionIdempotency).where(
+            SubmissionIdempotency.user_id == user_id,
+            SubmissionIdempotency.key == key
+        )).scalar_one()
+        if row.created_at < datetime.utcnow() - self.ttl:
+            db.session.delete(row)
+            db.session.flush()
+            return self.begin(user_id, key, request_hash)
+        self._check(request_hash, row.request_hash)
+        self.remember(user_id, key, row.request_hash, row.status_code, row.response, row.created_at)
+        return row.status_code, row.response
+
+    def complete(self, user_id, key, status_code, response, attempt_id=None):
+        """Store the result with the claim; call before the transaction commits."""
+        SubmissionIdempotency.query.filter_by(user_id=user_id, key=key).update({
+            SubmissionIdempotency.status_code: status_code,
+            SubmissionIdempotency.response: response,
+            SubmissionIdempotency.attempt_id: attempt_id
+        }, synchronize_session=False)
+
+    def remember(self, user_id, key, request_hash, status_code, response, created_at=None):
+        """Keep a committed result in this worker's cache."""
+        age = (datetime.utcnow() - created_at).total_seconds() if created_at is not None else 0
+        self.cache.put((user_id, key), (request_hash, status_code, json.dumps(response).encode('utf-8'), time.time() - age))
+
+    def maybe_prune(self):
+        """Delete one batch of expired keys, at most every IDEMPOTENCY_PRUNE_SECONDS per worker."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_prune < self.app.config['IDEMPOTENCY_PRUNE_SECONDS']:
+                return 0
+            self._last_prune = now
+        return self.prune(self.app.config['IDEMPOTENCY_PRUNE_BATCH'])
+
+    def prune(self, batch_size):
+        cutoff = datetime.utcnow() - self.ttl
+        expired = select(SubmissionIdempotency.user_id, SubmissionIdempotency.key).where(
+            SubmissionIdempotency.created_at < cutoff
+        ).limit(batch_size).with_for_update(skip_locked=True)
+        return db.session.execute(delete(SubmissionIdempotency).where(
+            db.tuple_(SubmissionIdempotency.user_id, SubmissionIdempotency.key).in_(expired)
+        ).execution_options(synchronize_session=False)).rowcount
@@ -0,0 +1,75 @@
+# backend/json_provider.py
+
+import re
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# The stdlib escapes everything outside printable ASCII when ensure_ascii is on, including DEL.
+_NEEDS_ESCAPE = re.compile(r'[^\x00-\x7e]')
+
+def _escape_char(match):
+    code = ord(match.group(0))
+    if code < 0x10000:
+        return '\\u{0:04x}'.format(code)
+    code -= 0x10000
+    return '\\u{0:04x}\\u{1:04x}'.format(0xd800 | (code >> 10), 0xdc00 | (code & 0x3ff))
+
+def _ensure_ascii(data):
+    """Rewrite orjson's UTF-8 output with the same \\uXXXX escapes json.dumps(ensure_ascii=True) emits."""
+    if data.isascii() and b'\x7f' not in data:
+        return data
+    return _NEEDS_ESCAPE.sub(_escape_char, data.decode('utf-8')).encode('ascii')
+
+class JSONProvider(DefaultJSONProvider):
+    """
+    Stdlib JSON provider that honours the JSON_SORT_KEYS config key (Flask 2.3+ ignores it)
+    and encodes compact responses straight to bytes.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.sort_keys = app.config.get('JSON_SORT_KEYS', True)
+
+    def dumps_bytes(self, obj):
+        """Compact encoding identical to the body of a non-debug jsonify() response, without the newline."""
+        return self.dumps(obj, separators=(',', ':')).encode('ascii' if self.ensure_ascii else 'utf-8')
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
+
+class OrjsonProvider(JSONProvider):
+    """
+    orjson-backed provider whose compact output is byte-identical to JSONProvider for the
+    payloads this API produces: non-str keys are stringified, datetimes and dataclasses go
+    through Flask's default hook, and non-ASCII is escaped as the stdlib does.
+    Anything orjson rejects (sorted output, >64-bit ints, unknown types) falls back to the stdlib.
+    Floats outside 1e-4..1e16 are the one known difference (1e+16 vs 1e16); the API only
+    returns scores, percentages and millisecond timestamps.
+    """
+
+    OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson else 0
+
+    def dumps_bytes(self, obj):
+        if self.sort_keys:
+            return super().dumps_bytes(obj)
+        try:
+            data = orjson.dumps(obj, default=self.default, option=self.OPTIONS)
+        except TypeError:
+            return super().dumps_bytes(obj)
+        return _ensure_ascii(data) if self.ensure_ascii else data
+
+def make_json_provider(app):
+    """Build the provider named by JSON_PROVIDER ('orjson' or 'stdlib'), falling back to the stdlib."""
+    name = app.config.get('JSON_PROVIDER', 'orjson')
+    if name == 'orjson' and orjson is not None:
+        return OrjsonProvider(app)
+    if name == 'orjson':
+        app.logger.warning("JSON_PROVIDER=orjson but orjson is not installed; using the stdlib encoder")
+    return JSONProvider(app)
@@ -0,0 +1,196 @@
+# backend/metrics.py
+
+import os
+import threading
+import time
+from flask import g, request, current_app
+
+try:
+    from prometheus_client import (
+        CollectorRegistry, Counter, Gauge, Histogram, REGISTRY,
+        CONTENT_TYPE_LATEST, generate_latest, multiprocess
+    )
+except ImportError:
+    CollectorRegistry = None
+
+from cache import cache_stats
+from db_pool import pool_stats, pool_status
+import singleflight
+
+# Latency buckets stretch past the gunicorn timeout's useful range; sizes cover 100 B .. ~25 MB.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = tuple(100 * 4 ** n for n in range(10))
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+CHECKOUT_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+def multiprocess_enabled():
+    """prometheus_client switches to file-backed values when this is set before it is imported."""
+    return bool(os.getenv('PROMETHEUS_MULTIPROC_DIR'))
+
+class Metrics:
+    """
+    Prometheus metrics for requests, the SQLAlchemy pools, admission control, single-flight
+    loads and in-process caches, served at /metrics.
+
+    Under gunicorn, init-backend.sh points PROMETHEUS_MULTIPROC_DIR at a shared directory so
+    every worker writes its own files and a scrape of any worker aggregates all of them.
+    Counters and histograms are summed across workers; pool and cache gauges are summed over
+    live workers only (gunicorn.conf.py drops a worker's files when it exits). Gauges are
+    refreshed at most every METRICS_GAUGE_INTERVAL seconds, after a request, because a scrape
+    only runs in one worker and cannot read the others' pools.
+    """
+
+    def __init__(self, app=None):
+        self._last_sync = 0.0
+        self._sync_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('METRICS_ENABLED', True)
+        app.config.setdefault('METRICS_GAUGE_INTERVAL', 1.0)
+
+        if not app.config['METRICS_ENABLED']:
+            return
+        if CollectorRegistry is None:
+            app.logger.warning("METRICS_ENABLED but prometheus_client is not installed; /metrics is disabled")
+            return
+
+        self._create_metrics()
+        pool_stats.add_observer(self._observe_checkout)
+        singleflight.add_observer(self._observe_flight)
+
+        app.extensions['metrics'] = self
+        app.after_request(self.after_request)
+        app.add_url_rule('/metrics', 'metrics', self.export)
+
+    def _create_metrics(self):
+        self.request_latency = Histogram(
+            'http_request_duration_seconds', 'Request latency by route',
+            ['method', 'endpoint'], buckets=LATENCY_BUCKETS
+        )
+        self.response_size = Histogram(
+            'http_response_size_bytes', 'Response body size on the wire by route',
+            ['endpoint'], buckets=SIZE_BUCKETS
+        )
+        self.request_count = Counter(
+            'http_requests_total', 'Requests by route and status',
+            ['method', 'endpoint', 'status']
+        )
+        self.request_queries = Histogram(
+            'http_request_db_queries', 'SQL statements issued per request',
+            ['endpoint'], buckets=QUERY_COUNT_BUCKETS
+        )
+
+        self.pool_size = Gauge('db_pool_size', 'Configured pool size', ['engine'], multiprocess_mode='livesum')
+        self.pool_checked_out = Gauge('db_pool_checked_out', 'Connections currently checked out', ['engine'], multiprocess_mode='livesum')
+        self.pool_overflow = Gauge('db_pool_overflow', 'Connections open beyond the pool size', ['engine'], multiprocess_mode='livesum')
+        self.pool_checkout_wait = Histogram(
+            'db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled connection',
+            buckets=CHECKOUT_WAIT_BUCKETS
+        )
+        self.pool_checkout_timeouts = Counter('db_pool_checkout_timeouts_total', 'Pool checkouts that timed out')
+
+        self.cache_hits = Gauge('cache_hits', 'Cache hits since the worker started', ['cache'], multiprocess_mode='livesum')
+        self.cache_misses = Gauge('cache_misses', 'Cache misses since the worker started', ['cache'], multiprocess_mode='livesum')
+        self.cache_evictions = Gauge('cache_evictions', 'Cache evictions since the worker started', ['cache'], multiprocess_mode='livesum')
+        self.cache_bytes = Gauge('cache_bytes', 'Bytes held by the cache', ['cache'], multiprocess_mode='livesum')
+        self.cache_hit_ratio = Gauge('cache_hit_ratio', 'Per-worker cache hit ratio', ['cache'], multiprocess_mode='liveall')
+
+        self.admission_active = Gauge('admission_active', 'Requests running under an admission limit', ['route'], multiprocess_mode='livesum')
+        self.admission_waiting = Gauge('admission_queue_depth', 'Requests waiting for an admission slot', ['route'], multiprocess_mode='livesum')
+        self.admission_wait = Histogram(
+            'admission_wait_seconds', 'Time admitted requests waited for a slot',
+            ['route'], buckets=CHECKOUT_WAIT_BUCKETS
+        )
+        self.admission_rejected = Counter(
+            'admission_rejected_total', 'Requests answered 503 by admission control',
+            ['route', 'reason']
+        )
+
+        self.singleflight_loads = Counter(
+            'singleflight_calls_total', 'Single-flight loads and the callers that waited on one instead',
+            ['group', 'outcome']
+        )
+
+        self.startup_seconds = Gauge('app_startup_seconds', 'Seconds from process start to the app being ready', multiprocess_mode='liveall')
+        self.startup_to_first_request = Gauge(
+            'app_startup_to_first_request_seconds', 'Seconds from process start to the first request served',
+            multiprocess_mode='liveall'
+        )
+
+    def _observe_checkout(self, seconds, timed_out):
+        self.pool_checkout_wait.observe(seconds)
+        if timed_out:
+            self.pool_checkout_timeouts.inc()
+
+    def _observe_flight(self, group, outcome):
+        self.singleflight_loads.labels(group, outcome).inc()
+
+    def observe_admission(self, route, outcome, waited):
+        if outcome == 'admitted':
+            self.admission_wait.labels(route).observe(waited)
+        else:
+            self.admission_rejected.labels(route, outcome).inc()
+
+    def after_request(self, response):
+        endpoint = request.endpoint or 'unmatched'
+        if endpoint != 'metrics':
+            started = g.get('request_started')
+            if started is not None:
+                self.request_latency.labels(request.method, endpoint).observe(time.perf_counter() - started)
+                self.request_queries.labels(endpoint).observe(g.get('db_query_count', 0))
+            self.request_count.labels(request.method, endpoint, str(response.status_code)).inc()
+            if not response.is_streamed:
+                self.response_size.labels(endpoint).observe(response.calculate_content_length() or 0)
+
+        self.sync_gauges()
+        return response
+
+    def sync_gauges(self, force=False):
+        """Copy pool occupancy and cache counters into gauges, at most once per interval."""
+        now = time.monotonic()
+        if not force and now - self._last_sync < current_app.config['METRICS_GAUGE_INTERVAL']:
+            return
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_sync = now
+            engines = current_app.extensions['sqlalchemy'].engines
+            for bind_key, engine in engines.items():
+                label = bind_key or 'primary'
+                status = pool_status(engine)
+                self.pool_size.labels(label).set(status.get('size', 0))
+                self.pool_checked_out.labels(label).set(status.get('checked_out', 0))
+                self.pool_overflow.labels(label).set(status.get('overflow', 0))
+
+            for name, stats in cache_stats().items():
+                self.cache_hits.labels(name).set(stats['hits'])
+                self.cache_misses.labels(name).set(stats['misses'])
+                self.cache_evictions.labels(name).set(stats['evictions'])
+                self.cache_bytes.labels(name).set(stats['bytes_used'])
+                self.cache_hit_ratio.labels(name).set(stats['hit_rate'])
+
+            admission = current_app.extensions.get('admission')
+            if admission is not None:
+                for limits in (admission.limits, admission.async_limits):
+                    for route, limit in limits.items():
+                        self.admission_active.labels(route).set(limit.active)
+                        self.admission_waiting.labels(route).set(limit.waiting)
+
+            timer = current_app.extensions.get('startup')
+            if timer is not None and timer.seconds_to_ready is not None:
+                self.startup_seconds.set(timer.seconds_to_ready)
+            if timer is not None and timer.seconds_to_first_request is not None:
+                self.startup_to_first_request.set(timer.seconds_to_first_request)
+        finally:
+            self._sync_lock.release()
+
+    def export(self):
+        self.sync_gauges(force=True)
+        if multiprocess_enabled():
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return current_app.response_class(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
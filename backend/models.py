@@ -86,6 +86,71 @@ class ExamAttempt(db.Model):
         db.UniqueConstraint('user_id', 'exam_id', 'attempt_date', name='unique_exam_attempt'),
     )
 
+class ExamAttemptResult(db.Model):
+    """
+    Compact result of an attempt: an LSB-first bitmap of wrong answers over the exam's question
+    ordinals (the same bit order as Postgres get_bit/set_bit on bytea), the [topic_number,
+    question_count] layout the ordinals refer to, and [topic_number, correct, total] per topic.
+    revision is the ExamRevision version graded against (null for backfilled attempts).
+    Attempts with a result row store an empty incorrect_questions list.
+    """
+    __tablename__ = 'exam_attempt_result'
+    attempt_id = db.Column(db.Integer, db.ForeignKey('exam_attempt.id', ondelete='CASCADE'), primary_key=True)
+    layout = db.Column(db.JSON, nullable=False)
+    incorrect_bitmap = db.Column(db.LargeBinary, nullable=False)
+    topic_scores = db.Column(db.JSON, nullable=False)
+    revision = db.Column(db.Integer)
+
+class ExamScoreTally(db.Model):
+    """
+    Running grade of a user's saved answers for one exam: an LSB-first bitmap of questions whose
+    saved answer is correct, graded against the answer key of exam revision `revision`.
+    save_answer flips single bits in SQL; a stale revision means the tally is rebuilt.
+    """
+    __tablename__ = 'exam_score_tally'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    exam_id = db.Column(db.String(255), db.ForeignKey('exam.id'), primary_key=True)
+    revision = db.Column(db.Integer, nullable=False)
+    correct_bitmap = db.Column(db.LargeBinary, nullable=False)
+    correct_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class SubmissionIdempotency(db.Model):
+    """
+    The result of a submission made with an Idempotency-Key, so retries replay it instead of
+    grading again. request_hash guards against reusing a key for a different submission.
+    """
+    __tablename__ = 'submission_idempotency'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    key = db.Column(db.String(255), primary_key=True)
+    request_hash = db.Column(db.String(64), nullable=False)
+    attempt_id = db.Column(db.Integer, db.ForeignKey('exam_attempt.id', ondelete='SET NULL'))
+    status_code = db.Column(db.Integer)
+    response = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+class QuestionStat(db.Model):
+    """Merged per-question totals across all users; see question_stats.py."""
+    __tablename__ = 'question_stat'
+    exam_id = db.Column(db.String(255), db.ForeignKey('exam.id'), primary_key=True)
+    topic_number = db.Column(db.Integer, primary_key=True)
+    question_number = db.Column(db.Integer, primary_key=True)
+    attempts = db.Column(db.BigInteger, nullable=False, default=0)
+    correct = db.Column(db.BigInteger, nullable=False, default=0)
+
+class QuestionStatShard(db.Model):
+    """
+    Per-question increments not yet merged into question_stat. Each submission adds to one of
+    QUESTION_STATS_SHARDS rows per question, so concurrent submissions rarely wait on each other.
+    """
+    __tablename__ = 'question_stat_shard'
+    exam_id = db.Column(db.String(255), db.ForeignKey('exam.id'), primary_key=True)
+    topic_number = db.Column(db.Integer, primary_key=True)
+    question_number = db.Column(db.Integer, primary_key=True)
+    shard = db.Column(db.SmallInteger, primary_key=True)
+    attempts = db.Column(db.BigInteger, nullable=False, default=0)
+    correct = db.Column(db.BigInteger, nullable=False, default=0)
+
 class ExamVisit(db.Model):
     __tablename__ = 'exam_visit'
     id = db.Column(db.Integer, primary_key=True)
@@ -98,4 +163,39 @@ class ExamVisit(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint('user_id', 'exam_id', name='unique_exam_visit'),
-    )
\ No newline at end of file
+    )
+
+class ExamRevision(db.Model):
+    """Content version of an exam's topics, bumped by the migration whenever they change."""
+    __tablename__ = 'exam_revision'
+    exam_id = db.Column(db.String(255), db.ForeignKey('exam.id'), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class PurgeJob(db.Model):
+    """
+    A background reset of one user's progress (answers, attempts, visits, favorites).
+
+    watermarks holds each table's max id when the job was enqueued: only rows at or below it are
+    purged, and until the job completes those rows are hidden from the user's reads (tombstoned),
+    so activity after the reset is kept and visible.
+    """
+    __tablename__ = 'purge_job'
+    id = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    scope = db.Column(db.String(20), nullable=False)
+    exam_ids = db.Column(db.JSON)
+    provider_names = db.Column(db.JSON)
+    watermarks = db.Column(db.JSON, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    rows_deleted = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_purge_job_user_status', 'user_id', 'status'),
+    )
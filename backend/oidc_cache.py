@@ -0,0 +1,169 @@
+# backend/oidc_cache.py
+"""
+Outbound calls made while logging in: a keep-alive connection pool shared by every request to
+the identity providers, and OpenID metadata/JWKS cached with a TTL and refreshed in the
+background. Imported lazily from auth.py, like authlib itself, so workers boot without either.
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from flask import current_app
+from authlib.integrations.flask_client import FlaskOAuth2App
+
+_pool_lock = threading.Lock()
+
+class SharedAdapter(HTTPAdapter):
+    """An HTTPAdapter that outlives Session.close(), so short-lived sessions can share its connections."""
+
+    def close(self):
+        pass
+
+class OutboundPool:
+    """Keep-alive connections and a few threads for concurrent calls to identity providers, per worker."""
+
+    def __init__(self, pool_size, timeout):
+        self.timeout = timeout
+        self.adapter = SharedAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session = self.mount(requests.Session())
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='oauth-http')
+
+    def mount(self, session):
+        """Route a session's requests (e.g. authlib's per-call OAuth2Session) through the shared pool."""
+        session.mount('https://', self.adapter)
+        session.mount('http://', self.adapter)
+        return session
+
+    def get_json(self, url, **kwargs):
+        response = self.session.get(url, timeout=self.timeout, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def concurrently(self, *calls):
+        """Run independent calls at once and return their results in order; the first error is raised."""
+        futures = [self._executor.submit(call) for call in calls]
+        return [future.result() for future in futures]
+
+    def submit(self, fn):
+        return self._executor.submit(fn)
+
+def outbound_pool():
+    pool = current_app.extensions.get('oauth_http')
+    if pool is not None:
+        return pool
+    with _pool_lock:
+        pool = current_app.extensions.get('oauth_http')
+        if pool is None:
+            config = current_app.config
+            pool = current_app.extensions['oauth_http'] = OutboundPool(
+                config['OAUTH_HTTP_POOL_SIZE'], config['OAUTH_HTTP_TIMEOUT']
+            )
+    return pool
+
+class CachedDocument:
+    """
+    A fetched JSON document, reused for ttl seconds. After that the stale copy is still served
+    while one background refresh runs; only with no copy, or one older than max_stale, does the
+    caller wait, and concurrent callers then share a single fetch.
+    """
+
+    def __init__(self, name, fetch, ttl, max_stale, pool, logger):
+        self.name = name
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._fetch = fetch
+        self._pool = pool
+        self._logger = logger
+        self._value = None
+        self._fetched_at = 0.0
+        self._fetch_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._refreshing = False
+
+    def age(self):
+        return time.monotonic() - self._fetched_at
+
+    def get(self):
+        value, age = self._value, self.age()
+        if value is not None and age < self.ttl:
+            return value
+        if value is not None and age < self.max_stale:
+            self.refresh_in_background()
+            return value
+        return self.refresh(min_age=self.ttl)
+
+    def refresh(self, min_age=0.0):
+        """Fetch a new copy unless another caller fetched one less than min_age seconds ago."""
+        with self._fetch_lock:
+            if self._value is not None and self.age() < min_age:
+                return self._value
+            value = self._fetch()
+            self._value, self._fetched_at = value, time.monotonic()
+            return value
+
+    def refresh_in_background(self):
+        with self._state_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        self._pool.submit(self._background_refresh)
+
+    def _background_refresh(self):
+        try:
+            self.refresh(min_age=self.ttl)
+        except Exception as e:
+            self._logger.warning(f"Background refresh of {self.name} failed: {str(e)}")
+        finally:
+            self._refreshing = False
+
+class OpenIDConfiguration:
+    """An OpenID provider's discovery document and signing keys, cached per worker."""
+
+    def __init__(self, metadata_url, pool, config, logger):
+        self.config = config
+        self.metadata = CachedDocument(
+            metadata_url,
+            lambda: pool.get_json(metadata_url),
+            config['OIDC_METADATA_TTL_SECONDS'], config['OIDC_MAX_STALE_SECONDS'], pool, logger
+        )
+        self.jwks = CachedDocument(
+            f"JWKS of {metadata_url}",
+            lambda: pool.get_json(self.metadata.get()['jwks_uri']),
+            config['OIDC_JWKS_TTL_SECONDS'], config['OIDC_MAX_STALE_SECONDS'], pool, logger
+        )
+
+    def key_set(self, force=False):
+        if force:
+            # An unknown key id: the provider may have rotated keys, but never refetch on every token.
+            return self.jwks.refresh(min_age=self.config['OIDC_JWKS_MIN_REFRESH_SECONDS'])
+        return self.jwks.get()
+
+    def warm(self):
+        """Fetch metadata and keys in the background, ahead of the first login that needs them."""
+        self.jwks.refresh_in_background()
+
+class PooledOAuth2App(FlaskOAuth2App):
+    """FlaskOAuth2App whose per-call sessions (token exchange, API calls) use the shared keep-alive pool."""
+
+    pool = None
+
+    def _get_oauth_client(self, **metadata):
+        session = super()._get_oauth_client(**metadata)
+        return self.pool.mount(session) if self.pool is not None else session
+
+class OpenIDApp(PooledOAuth2App):
+    """PooledOAuth2App that reads server metadata and JWKS from an OpenIDConfiguration instead of fetching them itself."""
+
+    openid = None
+
+    def load_server_metadata(self):
+        if self.openid is None:
+            return super().load_server_metadata()
+        return {**self.server_metadata, **self.openid.metadata.get()}
+
+    def fetch_jwk_set(self, force=False):
+        if self.openid is None:
+            return super().fetch_jwk_set(force)
+        return self.openid.key_set(force)
@@ -0,0 +1,52 @@
+# backend/pagination.py
+
+import base64
+import json
+import threading
+import time
+
+def encode_cursor(position):
+    """Opaque, URL-safe token for a keyset position (a small JSON-serializable dict)."""
+    raw = json.dumps(position, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+def decode_cursor(token, required_keys=()):
+    """Inverse of encode_cursor; raises ValueError for anything that is not a cursor we issued."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(position, dict) or any(key not in position for key in required_keys):
+        raise ValueError("Invalid cursor")
+    return position
+
+class TTLValue:
+    """A single lazily computed value that is recomputed once it is older than ttl seconds."""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._value = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, compute):
+        if time.monotonic() < self._expires_at:
+            return self._value
+        with self._lock:
+            if time.monotonic() >= self._expires_at:
+                self._value = compute()
+                self._expires_at = time.monotonic() + self.ttl
+            return self._value
+
+    def cached(self):
+        """The value while it is fresh, else None; for callers that compute it themselves (e.g. async code)."""
+        return self._value if time.monotonic() < self._expires_at else None
+
+    def set(self, value):
+        with self._lock:
+            self._value = value
+            self._expires_at = time.monotonic() + self.ttl
+
+    def invalidate(self):
+        self._expires_at = 0.0
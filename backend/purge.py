@@ -0,0 +1,312 @@
+# backend/purge.py
+
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import g, current_app, has_request_context
+from sqlalchemy import select, update, delete, func, and_, or_, not_, true
+from app import db
+from models import Provider, Exam, UserPreference, FavoriteQuestion, UserAnswer, ExamAttempt, ExamVisit, ExamScoreTally, PurgeJob
+
+# Purged in this order; each table is drained in chunks before moving on.
+PURGE_MODELS = (FavoriteQuestion, UserAnswer, ExamAttempt, ExamVisit)
+# A job that gave up after PURGE_MAX_ATTEMPTS stays 'failed' and keeps hiding its rows until it is
+# re-run (scripts/run_purge_jobs.py --include-failed); only 'completed' releases the tombstone.
+ACTIVE_STATUSES = ('queued', 'running', 'failed')
+
+def _provider_exam_ids(provider_names):
+    return select(Exam.id).join(Provider, Provider.id == Exam.provider_id).where(Provider.name.in_(provider_names))
+
+def _scope_condition(job, column):
+    """SQL condition on an exam_id column for the exams a job covers."""
+    if job.scope == 'exams':
+        return column.in_(job.exam_ids)
+    if job.scope == 'providers':
+        return column.in_(_provider_exam_ids(job.provider_names))
+    return true()
+
+def _purged_condition(job, model):
+    """Rows of model the job deletes: the user's rows in scope that existed when it was enqueued."""
+    return and_(
+        model.user_id == job.user_id,
+        model.id <= job.watermarks.get(model.__tablename__, 0),
+        _scope_condition(job, model.exam_id)
+    )
+
+def active_jobs_query(user_id):
+    return select(PurgeJob).where(PurgeJob.user_id == user_id, PurgeJob.status.in_(ACTIVE_STATUSES))
+
+def active_purge_jobs(user_id):
+    """The user's unfinished (queued, running or failed) jobs, looked up once per request."""
+    if has_request_context() and g.get('active_purge_jobs_user') == user_id:
+        return g.active_purge_jobs
+    jobs = db.session.execute(active_jobs_query(user_id)).scalars().all()
+    if has_request_context():
+        g.active_purge_jobs_user = user_id
+        g.active_purge_jobs = jobs
+    return jobs
+
+def hidden_conditions(jobs, model):
+    """WHERE conditions hiding rows of model tombstoned by jobs (for callers that load jobs themselves)."""
+    return [not_(_purged_condition(job, model)) for job in jobs]
+
+def tombstoned_condition(jobs, model):
+    """WHERE condition matching rows of model that any of jobs is about to purge."""
+    return or_(*[_purged_condition(job, model) for job in jobs])
+
+def visible_conditions(user_id, model):
+    """WHERE conditions hiding rows tombstoned by the user's pending purges (empty when there are none)."""
+    return hidden_conditions(active_purge_jobs(user_id), model)
+
+def discard_if_tombstoned(row):
+    """
+    Delete a single row that a pending purge is about to remove and return None, so write paths
+    (save answer, favorite toggle, visit tracking) start fresh instead of updating a row that is
+    hidden and will be purged. Returns the row unchanged otherwise.
+    """
+    if row is None:
+        return None
+    model = type(row)
+    for job in active_purge_jobs(row.user_id):
+        if row.id > job.watermarks.get(model.__tablename__, 0):
+            continue
+        if job.scope == 'exams' and row.exam_id not in job.exam_ids:
+            continue
+        if job.scope == 'providers' and not db.session.execute(
+                _provider_exam_ids(job.provider_names).where(Exam.id == row.exam_id)).first():
+            continue
+        db.session.delete(row)
+        db.session.flush()
+        return None
+    return row
+
+def serialize_job(job):
+    return {
+        'job_id': job.id,
+        'status': job.status,
+        'scope': job.scope,
+        'exam_ids': job.exam_ids,
+        'provider_names': job.provider_names,
+        'rows_deleted': job.rows_deleted or {},
+        'error': job.error,
+        'attempts': job.attempts,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None
+    }
+
+class PurgeQueue:
+    """
+    Runs purge jobs on a small per-process thread pool.
+
+    Each chunk deletes at most PURGE_CHUNK_SIZE rows through a LIMITed id subquery and commits
+    with a heartbeat, so no transaction holds many row locks and the shared exam table is never
+    written. A job is claimed with a conditional UPDATE, so exactly one worker runs it; jobs whose
+    heartbeat is older than PURGE_STALE_SECONDS (e.g. the worker was killed) are re-claimed by
+    the next worker that enqueues or polls, and resume where they stopped because chunks only
+    ever delete what is still there. A job that raises goes back to 'queued' with its error and is
+    retried after PURGE_RETRY_BACKOFF_SECONDS, doubling per attempt, up to PURGE_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, app=None):
+        self._executor = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PURGE_WORKERS', 1)
+        app.config.setdefault('PURGE_CHUNK_SIZE', 1000)
+        app.config.setdefault('PURGE_CHUNK_PAUSE_SECONDS', 0.0)
+        app.config.setdefault('PURGE_STALE_SECONDS', 120)
+        app.config.setdefault('PURGE_JOB_RETENTION_DAYS', 7)
+        app.config.setdefault('PURGE_MAX_ATTEMPTS', 5)
+        app.config.setdefault('PURGE_RETRY_BACKOFF_SECONDS', 30)
+        self.app = app
+        app.extensions['purge_queue'] = self
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.app.config['PURGE_WORKERS'],
+                        thread_name_prefix='purge'
+                    )
+        return self._executor
+
+    def enqueue(self, user_id, scope, exam_ids=None, provider_names=None):
+        """
+        Record a purge job and hide its rows immediately; the caller's transaction is committed here.
+        The user's last-visited exam and running score tallies are cleared synchronously since they
+        are a row per exam at most.
+        """
+        watermarks = {
+            model.__tablename__: db.session.query(func.max(model.id)).scalar() or 0
+            for model in PURGE_MODELS
+        }
+        job = PurgeJob(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            scope=scope,
+            exam_ids=exam_ids,
+            provider_names=provider_names,
+            watermarks=watermarks,
+            status='queued',
+            rows_deleted={}
+        )
+        db.session.add(job)
+
+        preference = UserPreference.query.filter_by(user_id=user_id)
+        if scope != 'all':
+            preference = preference.filter(_scope_condition(job, UserPreference.last_visited_exam))
+        preference.update({UserPreference.last_visited_exam: None}, synchronize_session=False)
+
+        ExamScoreTally.query.filter(
+            ExamScoreTally.user_id == user_id,
+            _scope_condition(job, ExamScoreTally.exam_id)
+        ).delete(synchronize_session=False)
+
+        retention = datetime.utcnow() - timedelta(days=self.app.config['PURGE_JOB_RETENTION_DAYS'])
+        PurgeJob.query.filter(
+            PurgeJob.status == 'completed',
+            PurgeJob.finished_at < retention
+        ).delete(synchronize_session=False)
+
+        db.session.commit()
+        self.submit(job.id)
+        self.resume_stale()
+        return job
+
+    def submit(self, job_id):
+        self.executor.submit(self._run_in_context, job_id)
+
+    def retry_delay(self, attempts):
+        """Seconds to wait before running a job again after its attempts-th attempt failed."""
+        return self.app.config['PURGE_RETRY_BACKOFF_SECONDS'] * 2 ** max(attempts - 1, 0)
+
+    def _runnable(self, now):
+        """Jobs a worker may take: new ones, retries whose backoff has passed, and dead workers' jobs."""
+        stale_before = now - timedelta(seconds=self.app.config['PURGE_STALE_SECONDS'])
+        # A retry is queued with heartbeat_at set to when its last attempt failed.
+        backoff = func.make_interval(
+            0, 0, 0, 0, 0, 0,
+            self.app.config['PURGE_RETRY_BACKOFF_SECONDS'] * func.power(2, PurgeJob.attempts - 1)
+        )
+        return or_(
+            and_(PurgeJob.status == 'queued', or_(PurgeJob.attempts == 0, PurgeJob.heartbeat_at + backoff <= now)),
+            and_(PurgeJob.status == 'running', PurgeJob.heartbeat_at < stale_before)
+        )
+
+    def resume_stale(self):
+        """Re-submit jobs left queued or running by a worker that died, and retries that are due."""
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=self.app.config['PURGE_STALE_SECONDS'])
+        stale_ids = db.session.scalars(select(PurgeJob.id).where(
+            self._runnable(now),
+            # Fresh jobs were submitted by enqueue(); only pick them up once that worker looks gone.
+            or_(PurgeJob.attempts > 0, PurgeJob.created_at < stale_before)
+        )).all()
+        for job_id in stale_ids:
+            self.submit(job_id)
+        return stale_ids
+
+    def schedule_retry(self, job_id, delay):
+        """Re-submit job_id in this process after delay; resume_stale picks it up if the process dies first."""
+        timer = threading.Timer(delay, self.submit, args=(job_id,))
+        timer.daemon = True
+        timer.start()
+
+    def _run_in_context(self, job_id):
+        with self.app.app_context():
+            try:
+                self.run(job_id)
+            except Exception as e:
+                current_app.logger.error(f"Purge job {job_id} crashed: {str(e)}")
+            finally:
+                db.session.remove()
+
+    def claim(self, job_id):
+        now = datetime.utcnow()
+        result = db.session.execute(
+            update(PurgeJob).where(
+                PurgeJob.id == job_id,
+                self._runnable(now)
+            ).values(
+                status='running',
+                started_at=func.coalesce(PurgeJob.started_at, now),
+                heartbeat_at=now,
+                attempts=PurgeJob.attempts + 1
+            )
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    def run(self, job_id):
+        """Claim and run one job to completion or its next retry; returns False if another worker owns it."""
+        if not self.claim(job_id):
+            return False
+
+        config = self.app.config
+        chunk_size = config['PURGE_CHUNK_SIZE']
+        pause = config['PURGE_CHUNK_PAUSE_SECONDS']
+        job = db.session.get(PurgeJob, job_id)
+        attempts = job.attempts
+        rows_deleted = dict(job.rows_deleted or {})
+
+        try:
+            for model in PURGE_MODELS:
+                table = model.__tablename__
+                while True:
+                    chunk = select(model.id).where(_purged_condition(job, model)).limit(chunk_size).scalar_subquery()
+                    deleted = db.session.execute(
+                        delete(model).where(model.id.in_(chunk)).execution_options(synchronize_session=False)
+                    ).rowcount
+                    rows_deleted[table] = rows_deleted.get(table, 0) + deleted
+                    db.session.execute(
+                        update(PurgeJob).where(PurgeJob.id == job_id).values(
+                            heartbeat_at=datetime.utcnow(),
+                            rows_deleted=rows_deleted
+                        )
+                    )
+                    db.session.commit()
+                    if deleted < chunk_size:
+                        break
+                    if pause:
+                        time.sleep(pause)
+
+            db.session.execute(
+                update(PurgeJob).where(PurgeJob.id == job_id).values(
+                    status='completed',
+                    error=None,
+                    finished_at=datetime.utcnow(),
+                    rows_deleted=rows_deleted
+                )
+            )
+            db.session.commit()
+            current_app.logger.info(f"Purge job {job_id} completed: {rows_deleted}")
+        except Exception as e:
+            db.session.rollback()
+            # Either way the job stays unfinished, so its rows stay hidden.
+            retry = attempts < config['PURGE_MAX_ATTEMPTS']
+            now = datetime.utcnow()
+            db.session.execute(
+                update(PurgeJob).where(PurgeJob.id == job_id).values(
+                    status='queued' if retry else 'failed',
+                    error=f"Attempt {attempts}: {str(e)}",
+                    heartbeat_at=now,
+                    finished_at=None if retry else now,
+                    rows_deleted=rows_deleted
+                )
+            )
+            db.session.commit()
+            if retry:
+                delay = self.retry_delay(attempts)
+                current_app.logger.warning(f"Purge job {job_id} attempt {attempts} failed, retrying in {delay}s: {str(e)}")
+                self.schedule_retry(job_id, delay)
+            else:
+                current_app.logger.error(f"Purge job {job_id} failed after {attempts} attempts: {str(e)}")
+        return True
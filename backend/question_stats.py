@@ -0,0 +1,155 @@
+# backend/question_stats.py
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from sqlalchemy import select, func, text, cast, union_all, BigInteger
+from sqlalchemy.dialects.postgresql import insert
+from app import db
+from models import QuestionStat, QuestionStatShard
+from attempt_results import bitmap_to_int
+
+# Transaction-level advisory lock taken by each merge batch, so only one worker merges at a time.
+MERGE_LOCK_KEY = 4307
+
+MERGE_SQL = text("""
+    WITH moved AS (
+        DELETE FROM question_stat_shard
+        WHERE ctid IN (SELECT ctid FROM question_stat_shard LIMIT :batch FOR UPDATE SKIP LOCKED)
+        RETURNING exam_id, topic_number, question_number, attempts, correct
+    ), upserted AS (
+        INSERT INTO question_stat (exam_id, topic_number, question_number, attempts, correct)
+        SELECT exam_id, topic_number, question_number, sum(attempts), sum(correct)
+        FROM moved GROUP BY exam_id, topic_number, question_number
+        ORDER BY exam_id, topic_number, question_number
+        ON CONFLICT (exam_id, topic_number, question_number) DO UPDATE SET
+            attempts = question_stat.attempts + excluded.attempts,
+            correct = question_stat.correct + excluded.correct
+        RETURNING 1
+    )
+    SELECT count(*) FROM moved
+""")
+
+def graded_rows(exam_id, layout, incorrect_bitmap):
+    """One (attempts=1, correct=0|1) increment per question of a graded attempt."""
+    wrong = bitmap_to_int(incorrect_bitmap)
+    rows = []
+    ordinal = 0
+    for topic_number, count in layout:
+        for question_number in range(1, count + 1):
+            rows.append({
+                'exam_id': exam_id,
+                'topic_number': topic_number,
+                'question_number': question_number,
+                'attempts': 1,
+                'correct': 0 if wrong >> ordinal & 1 else 1
+            })
+            ordinal += 1
+    return rows
+
+_shard_table = QuestionStatShard.__table__
+_shard_insert = insert(_shard_table)
+# Compiled once and sent through executemany, which SQLAlchemy batches into multi-row VALUES;
+# building a fresh VALUES list per call would recompile the statement on every submission.
+SHARD_UPSERT = _shard_insert.on_conflict_do_update(
+    index_elements=[_shard_table.c.exam_id, _shard_table.c.topic_number,
+                    _shard_table.c.question_number, _shard_table.c.shard],
+    set_={
+        'attempts': _shard_table.c.attempts + _shard_insert.excluded.attempts,
+        'correct': _shard_table.c.correct + _shard_insert.excluded.correct
+    }
+)
+
+def record_attempt(exam_id, layout, incorrect_bitmap, shard):
+    """
+    Add one graded attempt to the shard counters in the caller's transaction: one batched
+    upsert, with rows sorted by question so concurrent submissions lock them in the same order
+    and cannot deadlock, whichever topic order the layout was built in.
+    """
+    rows = graded_rows(exam_id, layout, incorrect_bitmap)
+    if not rows:
+        return
+    rows.sort(key=lambda row: (row['topic_number'], row['question_number']))
+    for row in rows:
+        row['shard'] = shard
+    db.session.execute(SHARD_UPSERT, rows)
+
+def exam_stats_query(exam_id):
+    """Totals per question: merged rows plus pending shard rows, both read by their exam_id key prefix."""
+    merged = select(QuestionStat.topic_number, QuestionStat.question_number,
+                    QuestionStat.attempts, QuestionStat.correct).where(QuestionStat.exam_id == exam_id)
+    pending = select(QuestionStatShard.topic_number, QuestionStatShard.question_number,
+                     QuestionStatShard.attempts, QuestionStatShard.correct).where(QuestionStatShard.exam_id == exam_id)
+    combined = union_all(merged, pending).subquery('combined')
+    return select(
+        combined.c.topic_number,
+        combined.c.question_number,
+        cast(func.sum(combined.c.attempts), BigInteger).label('attempts'),
+        cast(func.sum(combined.c.correct), BigInteger).label('correct')
+    ).group_by(combined.c.topic_number, combined.c.question_number).order_by(
+        combined.c.topic_number, combined.c.question_number
+    )
+
+def merge_shards(batch_size=5000):
+    """
+    Fold shard rows into question_stat in batches, one short transaction each. Rows that a
+    submission is updating right now are skipped and picked up by the next merge. Returns the
+    number of shard rows merged, or None when another worker holds the merge lock.
+    """
+    merged = 0
+    while True:
+        if not db.session.execute(select(func.pg_try_advisory_xact_lock(MERGE_LOCK_KEY))).scalar():
+            db.session.rollback()
+            return merged or None
+        moved = db.session.execute(MERGE_SQL, {'batch': batch_size}).scalar()
+        db.session.commit()
+        merged += moved
+        if moved < batch_size:
+            return merged
+
+class QuestionStats:
+    """
+    Merges shard rows into question_stat in the background, at most every
+    QUESTION_STATS_MERGE_SECONDS per worker, triggered by submissions.
+    """
+
+    def __init__(self, app=None):
+        self._executor = None
+        self._lock = threading.Lock()
+        self._last_merge = time.monotonic()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('QUESTION_STATS_SHARDS', 16)
+        app.config.setdefault('QUESTION_STATS_MERGE_SECONDS', 300)
+        app.config.setdefault('QUESTION_STATS_MERGE_BATCH', 5000)
+        self.app = app
+        app.extensions['question_stats'] = self
+
+    def shard_for(self, attempt_id):
+        return attempt_id % self.app.config['QUESTION_STATS_SHARDS']
+
+    def maybe_merge(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_merge < self.app.config['QUESTION_STATS_MERGE_SECONDS']:
+                return False
+            self._last_merge = now
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='question-stats')
+        self._executor.submit(self._merge_in_context)
+        return True
+
+    def _merge_in_context(self):
+        with self.app.app_context():
+            try:
+                merged = merge_shards(self.app.config['QUESTION_STATS_MERGE_BATCH'])
+                if merged:
+                    current_app.logger.info(f"Merged {merged} question stat shard rows")
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.error(f"Question stats merge failed: {str(e)}")
+            finally:
+                db.session.remove()
@@ -0,0 +1,77 @@
+# backend/request_timing.py
+
+import time
+from flask import g, request, current_app, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start_time')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    if has_request_context() and 'request_started' in g:
+        g.db_query_count += 1
+        g.db_seconds += elapsed
+
+def request_db_stats():
+    """(query count, seconds spent in the database) for the current request so far."""
+    return g.get('db_query_count', 0), g.get('db_seconds', 0.0)
+
+class RequestTiming:
+    """
+    Counts SQL statements and database time per request.
+
+    Emits a Server-Timing header when SERVER_TIMING is on (the default outside production)
+    and logs requests above SLOW_REQUEST_QUERY_COUNT statements or SLOW_REQUEST_DB_MS of DB time.
+    """
+
+    _listening = False
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SERVER_TIMING', app.config.get('ENV') != 'production')
+        app.config.setdefault('SLOW_REQUEST_QUERY_COUNT', 50)
+        app.config.setdefault('SLOW_REQUEST_DB_MS', 500)
+
+        if not RequestTiming._listening:
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            RequestTiming._listening = True
+
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+
+    def before_request(self):
+        g.request_started = time.perf_counter()
+        g.db_query_count = 0
+        g.db_seconds = 0.0
+
+    def after_request(self, response):
+        if 'request_started' not in g:
+            return response
+
+        total_ms = (time.perf_counter() - g.request_started) * 1000
+        query_count, db_seconds = request_db_stats()
+        db_ms = db_seconds * 1000
+        config = current_app.config
+
+        if config['SERVER_TIMING']:
+            response.headers.add(
+                'Server-Timing',
+                f'db;dur={db_ms:.2f};desc="{query_count} queries", app;dur={total_ms:.2f}'
+            )
+
+        if query_count > config['SLOW_REQUEST_QUERY_COUNT'] or db_ms > config['SLOW_REQUEST_DB_MS']:
+            current_app.logger.warning(
+                f"Expensive request {request.method} {request.path} ({request.endpoint}): "
+                f"{query_count} queries, {db_ms:.1f}ms in database, {total_ms:.1f}ms total"
+            )
+
+        return response
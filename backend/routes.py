@@ -1,19 +1,38 @@
 # backend/routes.py
 
-from flask import jsonify, abort, request, current_app, Blueprint
+from flask import jsonify, abort, request, current_app, Blueprint, g
 from app import db
-from models import Provider, Exam, Topic, UserPreference, FavoriteQuestion, UserAnswer, ExamAttempt, ExamVisit
-from utils import get_exam_order, format_display_title
+from db_routing import read_only, use_primary, replica_in_use
+from models import Provider, Exam, Topic, UserPreference, FavoriteQuestion, UserAnswer, ExamAttempt, ExamAttemptResult, ExamVisit, ExamRevision, PurgeJob
+from cache import CachedBody
+from compression import compress_variants, precompressed_response
+from utils import get_exam_order
+from grading import grade_attempt
+from attempt_results import results_for, incorrect_questions, diff_attempts, serialize_topic_scores, parse_question_id, question_bodies, decode_incorrect, changed_topics
+from scoring import record_saved_answer, stored_grade, exam_revision
+from pagination import encode_cursor, decode_cursor, TTLValue
+from exam_progress import exam_progress_query, group_by_provider, STATUSES
+from purge import visible_conditions, discard_if_tombstoned, serialize_job
+from question_stats import record_attempt, exam_stats_query
+from admission import admit, rejected_response
+from singleflight import Group, SingleFlightTimeout, register_group
+from idempotency import request_fingerprint, IdempotencyKeyMismatch, MAX_KEY_LENGTH
 from provider_categories import get_provider_categories, get_total_providers, get_total_categories
 from urllib.parse import unquote
 from sqlalchemy import func, text
+from sqlalchemy.orm import selectinload
 from datetime import datetime
 from functools import wraps
 import jwt
+import os
 from auth import User
 
 routes_bp = Blueprint('routes', __name__, url_prefix='/api')
 
+# Per-worker single-flight groups for cache misses and catalog reads, see singleflight.py.
+exam_loads = register_group(Group('exam_payloads'))
+catalog_loads = register_group(Group('catalog'))
+
 def handle_route_error(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
@@ -38,7 +57,12 @@ def require_auth(f):
         token = auth_header.split(' ')[1]
         try:
             payload = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
+            g.current_user_id = payload['user_id']
             user = User.query.get(payload['user_id'])
+            if not user and replica_in_use():
+                # A just-created account may not have reached the replica yet.
+                with use_primary():
+                    user = User.query.get(payload['user_id'])
             if not user:
                 return jsonify({'error': 'User not found'}), 404
             return f(user, *args, **kwargs)
@@ -52,6 +76,20 @@ def require_auth(f):
 
     return decorated
 
+def is_admin(user):
+    config = current_app.config
+    return user.id in config['ADMIN_USER_IDS'] or (user.email or '').lower() in config['ADMIN_EMAILS']
+
+def require_admin(f):
+    @wraps(f)
+    @require_auth
+    def decorated(current_user, *args, **kwargs):
+        if not is_admin(current_user):
+            return jsonify({'error': 'Admin access required'}), 403
+        return f(current_user, *args, **kwargs)
+
+    return decorated
+
 @routes_bp.errorhandler(404)
 def not_found_error(error):
     return jsonify({"error": "Not found", "message": str(error)}), 404
@@ -82,81 +120,156 @@ def get_provider_description(provider_name):
                 return provider['description']
     return f"Official certification exams from {provider_name}"
 
+def build_exam_payload(exam, provider_name):
+    """Build the /api/exams/<exam_id> response body for an exam and its topics"""
+    return {
+        'id': exam.id,
+        'provider': provider_name,
+        'examTitle': exam.title.split(': ')[1] if ': ' in exam.title else exam.title,
+        'examCode': exam.title.split(': ')[0] if ': ' in exam.title else '',
+        'topics': {topic.number: topic.data for topic in exam.topics}
+    }
+
+def get_exam_body(exam, provider_name):
+    """Serialized exam payload, served from the per-worker cache while the exam's revision is unchanged"""
+    cache = current_app.extensions.get('exam_cache')
+    version = db.session.query(ExamRevision.version).filter_by(exam_id=exam.id).scalar() or 0
+    key = (exam.id, version)
+    
+    entry = cache.get(key) if cache is not None else None
+    if entry is None:
+        # Concurrent misses (cold cache after a deploy, a popular exam) wait for one load.
+        entry = exam_loads.do(
+            key,
+            lambda: load_exam_body(cache, key, exam, provider_name),
+            current_app.config['SINGLEFLIGHT_TIMEOUT_SECONDS']
+        )
+    return entry
+
+def load_exam_body(cache, key, exam, provider_name):
+    """get_exam_body's miss path: load topics, serialize, pre-compress and cache"""
+    # A load that finished just before this one started has already cached the body.
+    entry = cache.get(key) if cache is not None else None
+    if entry is not None:
+        return entry
+    body = current_app.json.dumps_bytes(build_exam_payload(exam, provider_name)) + b'\n'
+    variants = {}
+    if current_app.config['COMPRESS_ENABLED'] and len(body) >= current_app.config['COMPRESS_MIN_SIZE']:
+        variants = compress_variants(
+            body,
+            current_app.config['COMPRESS_GZIP_LEVEL'],
+            current_app.config['COMPRESS_BROTLI_QUALITY']
+        )
+    entry = CachedBody(body, variants)
+    if cache is not None:
+        cache.put(key, entry)
+    return entry
+
+def serialize_provider(provider):
+    """Catalog entry for a provider whose exams are already loaded."""
+    return {
+        'name': provider.name,
+        'description': get_provider_description(provider.name),
+        'image': f"/api/placeholder/100/100",
+        'totalExams': len(provider.exams),
+        'totalQuestions': sum(exam.total_questions or 0 for exam in provider.exams),
+        'exams': sorted([
+            {
+                'id': f"{provider.name}-{exam.title}",
+                'title': exam.title,
+                'progress': exam.progress,
+                'totalQuestions': exam.total_questions,
+                'order': get_exam_order(exam.title, provider.name)
+            } for exam in provider.exams
+        ], key=lambda x: (x['order'], x['title'])),
+        'isPopular': provider.is_popular
+    }
+
+def cached_provider_total():
+    """Provider count, cached per worker for PROVIDER_TOTAL_CACHE_SECONDS."""
+    total = current_app.extensions.get('provider_total')
+    if total is None:
+        total = current_app.extensions.setdefault(
+            'provider_total', TTLValue(current_app.config['PROVIDER_TOTAL_CACHE_SECONDS'])
+        )
+    return total.get(lambda: db.session.query(func.count(Provider.id)).scalar())
+
 @routes_bp.route('/providers', methods=['GET'])
+@read_only
 def get_providers():
+    """
+    Provider catalog. Three modes:
+    - ?limit=N[&cursor=...][&include_total=true]: keyset pagination by provider id with an opaque cursor
+    - ?page=N&per_page=M: legacy offset pagination
+    - no parameters: every provider
+    """
+    limit = request.args.get('limit', type=int)
     page = request.args.get('page', type=int)
     per_page = request.args.get('per_page', type=int)
     
-    provider_stats = db.session.query(
-        Provider.id,
-        func.count(Exam.id).label('total_exams'),
-        func.sum(Exam.total_questions).label('total_questions')
-    ).join(
-        Exam, Provider.id == Exam.provider_id, isouter=True
-    ).group_by(Provider.id).all()
-    
-    stats_lookup = {
-        id: {
-            'total_exams': total_exams or 0,
-            'total_questions': total_questions or 0
-        }
-        for id, total_exams, total_questions in provider_stats
-    }
-    
-    if page is None or per_page is None:
-        providers = Provider.query.all()
-        return jsonify({
-            'providers': [
-                {
-                    'name': provider.name,
-                    'description': get_provider_description(provider.name),
-                    'image': f"/api/placeholder/100/100",
-                    'totalExams': stats_lookup.get(provider.id, {}).get('total_exams', 0),
-                    'totalQuestions': stats_lookup.get(provider.id, {}).get('total_questions', 0),
-                    'exams': sorted([
-                        {
-                            'id': f"{provider.name}-{exam.title}",
-                            'title': exam.title,
-                            'progress': exam.progress,
-                            'totalQuestions': exam.total_questions,
-                            'order': get_exam_order(exam.title, provider.name)
-                        } for exam in provider.exams
-                    ], key=lambda x: (x['order'], x['title'])),
-                    'isPopular': provider.is_popular
-                } for provider in providers
-            ],
-            'total': len(providers),
-            'pages': 1,
-            'current_page': 1
-        })
+    if limit is not None:
+        limit = max(1, min(limit, current_app.config['PROVIDERS_MAX_PAGE_SIZE']))
+        cursor = request.args.get('cursor')
+        after_id = None
+        if cursor:
+            try:
+                after_id = int(decode_cursor(cursor, required_keys=('id',))['id'])
+            except (ValueError, TypeError):
+                return jsonify({'error': 'Invalid cursor'}), 400
+        key, load = ('cursor', after_id, limit), lambda: provider_keyset_page(after_id, limit)
+    elif page is None or per_page is None:
+        key, load = ('all',), all_providers
     else:
-        providers = Provider.query.paginate(page=page, per_page=per_page, error_out=False)
-        return jsonify({
-            'providers': [
-                {
-                    'name': provider.name,
-                    'description': get_provider_description(provider.name),
-                    'image': f"/api/placeholder/100/100",
-                    'totalExams': stats_lookup.get(provider.id, {}).get('total_exams', 0),
-                    'totalQuestions': stats_lookup.get(provider.id, {}).get('total_questions', 0),
-                    'exams': sorted([
-                        {
-                            'id': f"{provider.name}-{exam.title}",
-                            'title': exam.title,
-                            'progress': exam.progress,
-                            'totalQuestions': exam.total_questions,
-                            'order': get_exam_order(exam.title, provider.name)
-                        } for exam in provider.exams
-                    ], key=lambda x: (x['order'], x['title'])),
-                    'isPopular': provider.is_popular
-                } for provider in providers.items
-            ],
-            'total': providers.total,
-            'pages': providers.pages,
-            'current_page': page
-        })
+        key, load = ('page', page, per_page), lambda: provider_offset_page(page, per_page)
+    
+    # Identical catalog requests arriving together share one query; the result is only read.
+    try:
+        result = catalog_loads.do(key, load, current_app.config['SINGLEFLIGHT_TIMEOUT_SECONDS'])
+    except SingleFlightTimeout:
+        return rejected_response()
+    if limit is not None and request.args.get('include_total', 'false').lower() == 'true':
+        result = {**result, 'total': cached_provider_total()}
+    return jsonify(result)
+
+def provider_query():
+    # Exams for every provider on the page come from one SELECT ... WHERE provider_id IN (...).
+    return Provider.query.options(selectinload(Provider.exams))
+
+def provider_keyset_page(after_id, limit):
+    query = provider_query()
+    if after_id is not None:
+        query = query.filter(Provider.id > after_id)
+    providers = query.order_by(Provider.id).limit(limit + 1).all()
+    has_more = len(providers) > limit
+    providers = providers[:limit]
+    return {
+        'providers': [serialize_provider(provider) for provider in providers],
+        'next_cursor': encode_cursor({'id': providers[-1].id}) if has_more else None,
+        'has_more': has_more,
+        'limit': limit
+    }
+
+def all_providers():
+    providers = provider_query().all()
+    return {
+        'providers': [serialize_provider(provider) for provider in providers],
+        'total': len(providers),
+        'pages': 1,
+        'current_page': 1
+    }
+
+def provider_offset_page(page, per_page):
+    providers = provider_query().order_by(Provider.id).paginate(page=page, per_page=per_page, error_out=False)
+    return {
+        'providers': [serialize_provider(provider) for provider in providers.items],
+        'total': providers.total,
+        'pages': providers.pages,
+        'current_page': page
+    }
 
 @routes_bp.route('/exams/<exam_id>', methods=['GET'])
+@admit('exam')
+@read_only
 @require_auth
 def get_exam(user, exam_id):
     if exam_id == 'undefined' or '-' not in exam_id:
@@ -193,43 +306,41 @@ def get_exam(user, exam_id):
     if not exam:
         abort(404, description="Exam not found")
 
-    exam_data = {
-        'id': exam.id,
-        'provider': provider.name,
-        'examTitle': exam.title.split(': ')[1] if ': ' in exam.title else exam.title,
-        'examCode': exam.title.split(': ')[0] if ': ' in exam.title else '',
-        'topics': {topic.number: topic.data for topic in exam.topics}
-    }
+    try:
+        exam_body = get_exam_body(exam, provider.name)
+    except SingleFlightTimeout:
+        return rejected_response()
     
     try:
-        visit = ExamVisit.query.filter_by(
-            user_id=user.id,
-            exam_id=exam.id
-        ).first()
-        
-        if not visit:
-            visit = ExamVisit(
+        with use_primary():
+            visit = discard_if_tombstoned(ExamVisit.query.filter_by(
                 user_id=user.id,
                 exam_id=exam.id
-            )
-            db.session.add(visit)
-        else:
-            visit.last_visit_date = datetime.utcnow()
-        
-        preference = UserPreference.query.filter_by(user_id=user.id).first()
-        if preference:
-            preference.last_visited_exam = exam.id
-        else:
-            preference = UserPreference(user_id=user.id, last_visited_exam=exam.id)
-            db.session.add(preference)
-        
-        db.session.commit()
+            ).first())
+            
+            if not visit:
+                visit = ExamVisit(
+                    user_id=user.id,
+                    exam_id=exam.id
+                )
+                db.session.add(visit)
+            else:
+                visit.last_visit_date = datetime.utcnow()
+            
+            preference = UserPreference.query.filter_by(user_id=user.id).first()
+            if preference:
+                preference.last_visited_exam = exam.id
+            else:
+                preference = UserPreference(user_id=user.id, last_visited_exam=exam.id)
+                db.session.add(preference)
+            
+            db.session.commit()
         
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Error tracking exam visit: {str(e)}")
     
-    return jsonify(exam_data)
+    return precompressed_response(exam_body.variants, exam_body.identity)
 
 @routes_bp.route('/user-preference', methods=['GET', 'POST'])
 @require_auth
@@ -274,14 +385,14 @@ def favorite_question(user):
         
         exam_id = exam.id
 
-    favorite = FavoriteQuestion.query.filter_by(
-        user_id=user.id,
-        exam_id=exam_id,
-        topic_number=topic_number,
-        question_index=question_index
-    ).first()
-
     try:
+        favorite = discard_if_tombstoned(FavoriteQuestion.query.filter_by(
+            user_id=user.id,
+            exam_id=exam_id,
+            topic_number=topic_number,
+            question_index=question_index
+        ).first())
+
         if favorite:
             db.session.delete(favorite)
             db.session.commit()
@@ -301,12 +412,13 @@ def favorite_question(user):
         return jsonify({'error': str(e)}), 500
 
 @routes_bp.route('/favorites/<exam_id>', methods=['GET'])
+@read_only
 @require_auth
 def get_favorite_questions(user, exam_id):
     favorites = FavoriteQuestion.query.filter_by(
         user_id=user.id,
         exam_id=exam_id
-    ).order_by(FavoriteQuestion.topic_number, FavoriteQuestion.question_index).all()
+    ).filter(*visible_conditions(user.id, FavoriteQuestion)).order_by(FavoriteQuestion.topic_number, FavoriteQuestion.question_index).all()
     
     return jsonify({
         'favorites': [
@@ -326,12 +438,12 @@ def save_answer(user):
     question_index = data['question_index']
     selected_options = data['selected_options']
 
-    user_answer = UserAnswer.query.filter_by(
+    user_answer = discard_if_tombstoned(UserAnswer.query.filter_by(
         user_id=user.id,
         exam_id=exam_id,
         topic_number=topic_number,
         question_index=question_index
-    ).first()
+    ).first())
 
     if user_answer:
         user_answer.selected_options = selected_options
@@ -345,16 +457,19 @@ def save_answer(user):
         )
         db.session.add(user_answer)
 
+    db.session.flush()
+    record_saved_answer(user.id, exam_id, topic_number, question_index, selected_options)
     db.session.commit()
     return jsonify({'message': 'Answer saved successfully'}), 200
 
 @routes_bp.route('/get-answers/<exam_id>', methods=['GET'])
+@read_only
 @require_auth
 def get_answers(user, exam_id):
     user_answers = UserAnswer.query.filter_by(
         user_id=user.id,
         exam_id=exam_id
-    ).all()
+    ).filter(*visible_conditions(user.id, UserAnswer)).all()
     
     return jsonify({
         'answers': [
@@ -367,12 +482,21 @@ def get_answers(user, exam_id):
     })
 
 @routes_bp.route('/submit-answers', methods=['POST'])
+@admit('submit_answers')
 @require_auth
 def submit_answers(user):
     try:
         data = request.json
         exam_id = unquote(data['exam_id'])
-        user_answers = data['user_answers']
+        # 'stored' grades the answers saved through /save-answer from the running tally;
+        # 'payload' (the default) re-grades the user_answers map sent with the request.
+        mode = data.get('mode', 'payload')
+        if mode not in ('payload', 'stored'):
+            return jsonify({'error': "Invalid mode, expected 'payload' or 'stored'"}), 400
+        # Retries carrying the same Idempotency-Key get the original result back instead of a new attempt.
+        idempotency_key = request.headers.get('Idempotency-Key')
+        if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_KEY_LENGTH:
+            return jsonify({'error': f'Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters'}), 400
         
         exam = Exam.query.filter_by(id=exam_id).first()
         if not exam:
@@ -399,53 +523,80 @@ def submit_answers(user):
             return jsonify({'error': 'Exam not found'}), 404
 
         exam_id = exam.id
-        
-        total_questions = 0
-        correct_answers = 0
-        incorrect_questions = []
-
-        for topic in exam.topics:
-            topic_data = topic.data
-            for question_index, question in enumerate(topic_data):
-                total_questions += 1
-                question_id = f"T{topic.number} Q{question_index + 1}"
-                
-                user_answer_indices = user_answers.get(question_id, [])
-                if not isinstance(user_answer_indices, list):
-                    user_answer_indices = []
-                
-                correct_indices = {ord(letter.upper()) - ord('A') for letter in question['answer']}
-                user_indices = {int(index) for index in user_answer_indices if isinstance(index, (int, str)) and str(index).isdigit()}
 
-                if correct_indices == user_indices:
-                    correct_answers += 1
-                else:
-                    incorrect_questions.append(question_id)
+        if idempotency_key is not None:
+            idempotency = current_app.extensions['idempotency']
+            request_hash = request_fingerprint({
+                'exam_id': exam_id,
+                'mode': mode,
+                'user_answers': data.get('user_answers') if mode == 'payload' else None
+            })
+            try:
+                # Blocks while a concurrent duplicate holds the key, then replays its result.
+                replay = idempotency.begin(user.id, idempotency_key, request_hash)
+            except IdempotencyKeyMismatch:
+                db.session.rollback()
+                return jsonify({'error': 'Idempotency-Key was already used for a different submission'}), 422
+            if replay is not None:
+                db.session.commit()
+                status_code, body = replay
+                response = jsonify(body)
+                response.headers['Idempotent-Replayed'] = 'true'
+                return response, status_code
+        
+        # Read before grading, so content changed meanwhile is newer than the recorded revision.
+        revision = exam_revision(exam_id)
+        if mode == 'stored':
+            total_questions, correct_answers, layout, incorrect_bitmap, topic_scores = stored_grade(user.id, exam_id)
+            incorrect_list = decode_incorrect(layout, incorrect_bitmap)
+        else:
+            graded = grade_attempt(exam.topics, data['user_answers'])
+            total_questions, correct_answers = graded.total_questions, graded.correct_answers
+            layout, incorrect_bitmap, topic_scores = graded.layout, graded.incorrect_bitmap, graded.topic_scores
+            incorrect_list = graded.incorrect_questions
 
         score = (correct_answers / total_questions) * 100 if total_questions > 0 else 0
         passed = score >= 75
 
-        current_app.logger.info(f"Exam submission - User: {user.id}, Exam: {exam_id}, Score: {score}, Correct: {correct_answers}/{total_questions}")
+        current_app.logger.info(f"Exam submission ({mode}) - User: {user.id}, Exam: {exam_id}, Score: {score}, Correct: {correct_answers}/{total_questions}")
 
+        # Wrong answers live in the attempt's result bitmap; the JSON list is only kept for old attempts.
         exam_attempt = ExamAttempt(
             user_id=user.id,
             exam_id=exam_id,
             score=score,
             total_questions=total_questions,
             correct_answers=correct_answers,
-            incorrect_questions=incorrect_questions,
+            incorrect_questions=[],
             attempt_date=datetime.utcnow()
         )
         db.session.add(exam_attempt)
-        db.session.commit()
+        db.session.flush()
+        db.session.add(ExamAttemptResult(
+            attempt_id=exam_attempt.id,
+            layout=layout,
+            incorrect_bitmap=incorrect_bitmap,
+            topic_scores=topic_scores,
+            revision=revision
+        ))
+        question_stats = current_app.extensions['question_stats']
+        record_attempt(exam_id, layout, incorrect_bitmap, question_stats.shard_for(exam_attempt.id))
 
         result = {
+            'attempt_id': exam_attempt.id,
             'total_questions': total_questions,
             'correct_answers': correct_answers,
             'score': round(score, 2),
             'passed': passed,
-            'incorrect_questions': incorrect_questions
+            'incorrect_questions': incorrect_list,
+            'topic_scores': serialize_topic_scores(topic_scores)
         }
+        if idempotency_key is not None:
+            idempotency.complete(user.id, idempotency_key, 200, result, attempt_id=exam_attempt.id)
+        db.session.commit()
+        if idempotency_key is not None:
+            idempotency.remember(user.id, idempotency_key, request_hash, 200, result)
+        question_stats.maybe_merge()
 
         return jsonify(result)
 
@@ -460,239 +611,227 @@ def get_incorrect_questions(user, exam_id):
     latest_attempt = ExamAttempt.query.filter_by(
         user_id=user.id,
         exam_id=exam_id
-    ).order_by(ExamAttempt.attempt_date.desc()).first()
+    ).filter(*visible_conditions(user.id, ExamAttempt)).order_by(ExamAttempt.attempt_date.desc()).first()
     
     if not latest_attempt:
         return jsonify({'incorrect_questions': []})
     
-    return jsonify({'incorrect_questions': latest_attempt.incorrect_questions})
-
-@routes_bp.route('/exam-progress', methods=['GET'])
+    result = db.session.get(ExamAttemptResult, latest_attempt.id)
+    response = {'incorrect_questions': incorrect_questions(latest_attempt, result)}
+    if result is not None:
+        response['topic_scores'] = serialize_topic_scores(result.topic_scores)
+    return jsonify(response)
+
+@routes_bp.route('/review-questions/<exam_id>', methods=['GET'])
+@read_only
 @require_auth
-def get_exam_progress(user):
-    try:
-        print("Starting exam progress fetch for user_id:", user.id)
-        
+def get_review_questions(user, exam_id):
+    """
+    Bodies of the questions answered incorrectly in the latest attempt, in exam order.
+
+    Optional topic=<number> filter; with limit=N the response is one page plus next_cursor.
+    Only the matching questions are read from the database, not the whole exam. Questions whose
+    topic changed since the attempt, or that no longer exist, come back with question null and
+    an `unavailable` reason.
+    """
+    topic = request.args.get('topic', type=int)
+    limit = request.args.get('limit', type=int)
+    cursor = request.args.get('cursor')
+    
+    attempts = ExamAttempt.query.filter_by(
+        user_id=user.id,
+        exam_id=exam_id
+    ).filter(*visible_conditions(user.id, ExamAttempt))
+    
+    offset = 0
+    if cursor:
         try:
-            base_query = db.session.query(Exam).distinct().join(
-                Provider,
-                Exam.provider_id == Provider.id
-            )
-            
-            exam_queries = []
-            
-            try:
-                user_answer_query = base_query.join(
-                    UserAnswer, 
-                    UserAnswer.exam_id == Exam.id
-                ).filter(UserAnswer.user_id == user.id)
-                exam_queries.append(user_answer_query)
-            except Exception as e:
-                print(f"Error in UserAnswer join: {str(e)}")
-            
-            try:
-                exam_attempt_query = base_query.join(
-                    ExamAttempt, 
-                    ExamAttempt.exam_id == Exam.id
-                ).filter(ExamAttempt.user_id == user.id)
-                exam_queries.append(exam_attempt_query)
-            except Exception as e:
-                print(f"Error in ExamAttempt join: {str(e)}")
-            
-            try:
-                exam_visit_query = base_query.join(
-                    ExamVisit, 
-                    ExamVisit.exam_id == Exam.id
-                ).filter(ExamVisit.user_id == user.id)
-                exam_queries.append(exam_visit_query)
-            except Exception as e:
-                print(f"Error in ExamVisit join: {str(e)}")
-            
-            try:
-                user_pref_query = base_query.join(
-                    UserPreference, 
-                    UserPreference.last_visited_exam == Exam.id
-                ).filter(UserPreference.user_id == user.id)
-                exam_queries.append(user_pref_query)
-            except Exception as e:
-                print(f"Error in UserPreference join: {str(e)}")
-
-            if not exam_queries:
-                print("No valid queries constructed")
-                return jsonify({'providers': []})
+            position = decode_cursor(cursor, required_keys=('attempt_id', 'offset'))
+            attempt_id = int(position['attempt_id'])
+            offset = max(0, int(position['offset']))
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        # Keep paging the attempt the first page came from, even if a newer one was submitted since.
+        attempt = attempts.filter(ExamAttempt.id == attempt_id).first()
+    else:
+        attempt = attempts.order_by(ExamAttempt.attempt_date.desc()).first()
+    
+    if not attempt:
+        if cursor:
+            return jsonify({'error': 'Attempt not found'}), 404
+        return jsonify({'attempt_id': None, 'total': 0, 'questions': []})
+    
+    result = db.session.get(ExamAttemptResult, attempt.id)
+    positions = [
+        position for position in map(parse_question_id, incorrect_questions(attempt, result))
+        if position is not None and (topic is None or position[0] == topic)
+    ]
+    
+    page = positions[offset:]
+    if limit is not None:
+        limit = max(1, min(limit, current_app.config['REVIEW_MAX_PAGE_SIZE']))
+        page = positions[offset:offset + limit]
+    
+    # Question numbers refer to the exam as it was graded. In topics changed since, the current
+    # question at that number may not be the one answered, so it is reported rather than served.
+    changed = changed_topics(exam_id, result, {number for number, _ in page})
+    bodies = question_bodies(exam_id, [position for position in page if position[0] not in changed])
+    
+    def unavailable(topic_number, question_number):
+        if topic_number in changed:
+            return 'content_changed'
+        if (topic_number, question_number) not in bodies:
+            return 'not_found'
+        return None
+    
+    response = {
+        'attempt_id': attempt.id,
+        'total': len(positions),
+        'content_changed': bool(changed),
+        'questions': [
+            {
+                'question_id': f"T{topic_number} Q{question_number}",
+                'topic_number': topic_number,
+                'question_number': question_number,
+                'question': bodies.get((topic_number, question_number)),
+                'unavailable': unavailable(topic_number, question_number)
+            } for topic_number, question_number in page
+        ]
+    }
+    if limit is not None:
+        has_more = offset + limit < len(positions)
+        response.update({
+            'next_cursor': encode_cursor({'attempt_id': attempt.id, 'offset': offset + limit}) if has_more else None,
+            'has_more': has_more,
+            'limit': limit
+        })
+    return jsonify(response)
 
-            final_query = exam_queries[0]
-            for query in exam_queries[1:]:
-                final_query = final_query.union(query)
+@routes_bp.route('/attempt-diff/<exam_id>', methods=['GET'])
+@read_only
+@require_auth
+def get_attempt_diff(user, exam_id):
+    """
+    Questions fixed and newly broken between two attempts of an exam, with per-topic scores.
+    Compares ?from=<attempt_id> to ?to=<attempt_id>, by default the previous attempt to the latest.
+    """
+    attempts = ExamAttempt.query.filter_by(
+        user_id=user.id,
+        exam_id=exam_id
+    ).filter(*visible_conditions(user.id, ExamAttempt))
+    
+    from_id = request.args.get('from', type=int)
+    to_id = request.args.get('to', type=int)
+    if from_id is not None and to_id is not None:
+        selected = {attempt.id: attempt for attempt in attempts.filter(ExamAttempt.id.in_((from_id, to_id)))}
+        if from_id not in selected or to_id not in selected:
+            return jsonify({'error': 'Attempt not found'}), 404
+        before, after = selected[from_id], selected[to_id]
+    elif from_id is None and to_id is None:
+        latest = attempts.order_by(ExamAttempt.attempt_date.desc()).limit(2).all()
+        if len(latest) < 2:
+            return jsonify({'error': 'At least two attempts are needed for a diff'}), 404
+        after, before = latest
+    else:
+        return jsonify({'error': 'Provide both from and to, or neither'}), 400
+    
+    results = results_for((before, after))
+    before_result, after_result = results.get(before.id), results.get(after.id)
+    diff = diff_attempts(before, before_result, after, after_result)
+    
+    def summary(attempt, result):
+        return {
+            'attempt_id': attempt.id,
+            'attempt_date': attempt.attempt_date.isoformat() if attempt.attempt_date else None,
+            'score': round(attempt.score, 2),
+            'correct_answers': attempt.correct_answers,
+            'total_questions': attempt.total_questions,
+            'topic_scores': serialize_topic_scores(result.topic_scores) if result is not None else None
+        }
+    
+    return jsonify({
+        'from': summary(before, before_result),
+        'to': summary(after, after_result),
+        **diff
+    })
 
-            user_exams = final_query.all()
-            print(f"Found {len(user_exams)} exams for user")
+@routes_bp.route('/question-stats/<exam_id>', methods=['GET'])
+@read_only
+@require_auth
+def get_question_stats(user, exam_id):
+    """How often each question of an exam is answered correctly, across all users' attempts."""
+    rows = db.session.execute(exam_stats_query(exam_id)).all()
+    
+    return jsonify({
+        'exam_id': exam_id,
+        'questions': [
+            {
+                'question_id': f"T{row.topic_number} Q{row.question_number}",
+                'topic_number': row.topic_number,
+                'question_number': row.question_number,
+                'attempts': row.attempts,
+                'correct': row.correct,
+                'correct_rate': round(row.correct / row.attempts, 4) if row.attempts else None
+            } for row in rows
+        ]
+    })
 
-        except Exception as e:
-            print(f"Error in query construction: {str(e)}")
-            return jsonify({'error': 'Database query error', 'message': str(e)}), 500
+@routes_bp.route('/exam-progress', methods=['GET'])
+@admit('exam_progress')
+@require_auth
+def get_exam_progress(user):
+    """
+    The user's exams grouped by provider, most recent activity first.
 
-        provider_data = {}
+    Optional filters: provider=<name> (repeatable or comma-separated) and status=Passed|Failed|
+    Not Attempted|In Progress. With limit=N the response is one keyset page plus next_cursor.
+    """
+    try:
+        provider_names = [
+            name.strip()
+            for value in request.args.getlist('provider')
+            for name in value.split(',') if name.strip()
+        ]
+        status = request.args.get('status')
+        if status and status not in STATUSES:
+            return jsonify({'error': f"Invalid status, expected one of: {', '.join(STATUSES)}"}), 400
         
-        for exam in user_exams:
-            try:
-                total_questions = exam.total_questions
-                
+        limit = request.args.get('limit', type=int)
+        after = None
+        if limit is not None:
+            limit = max(1, min(limit, current_app.config['EXAM_PROGRESS_MAX_PAGE_SIZE']))
+            cursor = request.args.get('cursor')
+            if cursor:
                 try:
-                    answered_questions = UserAnswer.query.filter_by(
-                        user_id=user.id,
-                        exam_id=exam.id
-                    ).count()
-                except Exception as e:
-                    print(f"Error counting answered questions for exam {exam.id}: {str(e)}")
-                    answered_questions = 0
-
-                progress = round((answered_questions / total_questions * 100) if total_questions > 0 else 0, 1)
-                
-                try:
-                    attempts = ExamAttempt.query.filter_by(
-                        user_id=user.id,
-                        exam_id=exam.id
-                    ).order_by(ExamAttempt.attempt_date.desc()).all()
-                except Exception as e:
-                    print(f"Error fetching attempts for exam {exam.id}: {str(e)}")
-                    attempts = []
-                
-                attempt_count = len(attempts)
-                latest_grade = None
-                average_score = 0
-                status = "Not Attempted"
-                
-                if attempt_count > 0:
-                    try:
-                        latest_attempt = attempts[0]
-                        correct_answers = round((latest_attempt.score / 100) * latest_attempt.total_questions)
-                        latest_grade = {
-                            'score': correct_answers,
-                            'total': latest_attempt.total_questions
-                        }
-                        status = "Passed" if latest_attempt.score >= 75 else "Failed"
-                        average_score = round(sum(attempt.score for attempt in attempts) / attempt_count, 2)
-                    except Exception as e:
-                        print(f"Error processing attempt data for exam {exam.id}: {str(e)}")
-                
-                try:
-                    last_update = None
-                    timestamp = None
-                    
-                    if attempts:
-                        time_diff = datetime.utcnow() - attempts[0].attempt_date
-                        timestamp = attempts[0].attempt_date.timestamp() * 1000
-                        
-                        if time_diff.days == 0:
-                            if time_diff.seconds < 3600:
-                                if time_diff.seconds < 300:
-                                    last_update = "Just now"
-                                else:
-                                    minutes = time_diff.seconds // 60
-                                    last_update = f"{minutes} {'minute' if minutes == 1 else 'minutes'} ago"
-                            else:
-                                hours = time_diff.seconds // 3600
-                                last_update = f"{hours} {'hour' if hours == 1 else 'hours'} ago"
-                        elif time_diff.days == 1:
-                            last_update = "Yesterday"
-                        elif time_diff.days < 7:
-                            last_update = f"{time_diff.days} {'day' if time_diff.days == 1 else 'days'} ago"
-                        elif time_diff.days < 30:
-                            weeks = time_diff.days // 7
-                            last_update = f"{weeks} {'week' if weeks == 1 else 'weeks'} ago"
-                        else:
-                            months = time_diff.days // 30
-                            last_update = f"{months} {'month' if months == 1 else 'months'} ago"
-                    else:
-                        last_answer = UserAnswer.query.filter_by(
-                            user_id=user.id,
-                            exam_id=exam.id
-                        ).order_by(UserAnswer.id.desc()).first()
-                        
-                        if last_answer:
-                            last_update = "In Progress"
-                            timestamp = datetime.utcnow().timestamp() * 1000
-                        else:
-                            visit = ExamVisit.query.filter_by(
-                                user_id=user.id,
-                                exam_id=exam.id
-                            ).first()
-                            
-                            if visit:
-                                time_diff = datetime.utcnow() - visit.last_visit_date
-                                timestamp = visit.last_visit_date.timestamp() * 1000
-                                
-                                if time_diff.days == 0:
-                                    if time_diff.seconds < 3600:
-                                        if time_diff.seconds < 300:
-                                            last_update = "Just now"
-                                        else:
-                                            minutes = time_diff.seconds // 60
-                                            last_update = f"{minutes} {'minute' if minutes == 1 else 'minutes'} ago"
-                                    else:
-                                        hours = time_diff.seconds // 3600
-                                        last_update = f"{hours} {'hour' if hours == 1 else 'hours'} ago"
-                                elif time_diff.days == 1:
-                                    last_update = "Yesterday"
-                                elif time_diff.days < 7:
-                                    last_update = f"{time_diff.days} {'day' if time_diff.days == 1 else 'days'} ago"
-                                elif time_diff.days < 30:
-                                    weeks = time_diff.days // 7
-                                    last_update = f"{weeks} {'week' if weeks == 1 else 'weeks'} ago"
-                                else:
-                                    months = time_diff.days // 30
-                                    last_update = f"{months} {'month' if months == 1 else 'months'} ago"
-                            else:
-                                last_update = "Not Started"
-                                
-                except Exception as e:
-                    print(f"Error calculating last update for exam {exam.id}: {str(e)}")
-                    last_update = "Unknown"
-                    timestamp = None
-
-                exam_data = {
-                    'id': exam.id,
-                    'exam': format_display_title(exam.title),
-                    'examType': 'Actual',
-                    'attempts': attempt_count,
-                    'averageScore': average_score,
-                    'progress': progress,
-                    'latestGrade': latest_grade or {
-                        'score': 0,
-                        'total': total_questions
-                    },
-                    'status': status,
-                    'timestamp': timestamp,
-                    'updated': last_update
-                }
-                
-                provider_name = exam.provider.name
-                if provider_name not in provider_data:
-                    provider_data[provider_name] = {
-                        'name': provider_name,
-                        'exams': [],
-                        'isPopular': exam.provider.is_popular
-                    }
-                provider_data[provider_name]['exams'].append(exam_data)
-
-            except Exception as e:
-                print(f"Error processing exam {exam.id}: {str(e)}")
-                continue
-
-        for provider in provider_data.values():
-            try:
-                provider['exams'].sort(
-                    key=lambda x: x['timestamp'] if x['timestamp'] else 0,
-                    reverse=True
-                )
-            except Exception as e:
-                print(f"Error sorting exams for provider {provider['name']}: {str(e)}")
-
-        return jsonify({'providers': list(provider_data.values())})
+                    position = decode_cursor(cursor, required_keys=('sort_key', 'id'))
+                    after = (float(position['sort_key']), str(position['id']))
+                except (ValueError, TypeError):
+                    return jsonify({'error': 'Invalid cursor'}), 400
+        
+        rows = db.session.execute(exam_progress_query(
+            user.id,
+            provider_names=provider_names or None,
+            status=status,
+            after=after,
+            limit=limit + 1 if limit is not None else None,
+            visibility=lambda model: visible_conditions(user.id, model)
+        )).all()
+        
+        if limit is None:
+            return jsonify({'providers': group_by_provider(rows)})
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return jsonify({
+            'providers': group_by_provider(rows),
+            'next_cursor': encode_cursor({'sort_key': rows[-1].sort_key, 'id': rows[-1].id}) if has_more else None,
+            'has_more': has_more,
+            'limit': limit
+        })
 
     except Exception as e:
-        print(f"Unhandled error in get_exam_progress: {str(e)}")
+        current_app.logger.error(f"Error in get_exam_progress: {str(e)}")
+        db.session.rollback()
         return jsonify({
             'error': 'Internal server error',
             'message': str(e) if current_app.debug else 'An unexpected error occurred'
@@ -707,10 +846,10 @@ def track_exam_visit(user):
     if not exam_id:
         return jsonify({'error': 'Exam ID is required'}), 400
         
-    visit = ExamVisit.query.filter_by(
+    visit = discard_if_tombstoned(ExamVisit.query.filter_by(
         user_id=user.id,
         exam_id=exam_id
-    ).first()
+    ).first())
     
     if not visit:
         visit = ExamVisit(
@@ -724,6 +863,18 @@ def track_exam_visit(user):
     db.session.commit()
     return jsonify({'message': 'Visit tracked successfully'}), 200
 
+def enqueue_purge_response(user, message, scope, exam_ids=None, provider_names=None):
+    """Queue a background purge; its rows are hidden from reads as soon as this returns."""
+    job = current_app.extensions['purge_queue'].enqueue(
+        user.id, scope, exam_ids=exam_ids, provider_names=provider_names
+    )
+    return jsonify({
+        'message': message,
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f"/api/purge-jobs/{job.id}"
+    }), 202
+
 @routes_bp.route('/delete-exams', methods=['POST'])
 @require_auth
 def delete_exams(user):
@@ -734,38 +885,7 @@ def delete_exams(user):
         return jsonify({'error': 'No exam IDs provided'}), 400
     
     try:
-        UserPreference.query.filter(
-            UserPreference.user_id == user.id,
-            UserPreference.last_visited_exam.in_(exam_ids)
-        ).update({UserPreference.last_visited_exam: None}, synchronize_session=False)
-        
-        FavoriteQuestion.query.filter(
-            FavoriteQuestion.user_id == user.id,
-            FavoriteQuestion.exam_id.in_(exam_ids)
-        ).delete(synchronize_session=False)
-        
-        UserAnswer.query.filter(
-            UserAnswer.user_id == user.id,
-            UserAnswer.exam_id.in_(exam_ids)
-        ).delete(synchronize_session=False)
-        
-        ExamAttempt.query.filter(
-            ExamAttempt.user_id == user.id,
-            ExamAttempt.exam_id.in_(exam_ids)
-        ).delete(synchronize_session=False)
-        
-        ExamVisit.query.filter(
-            ExamVisit.user_id == user.id,
-            ExamVisit.exam_id.in_(exam_ids)
-        ).delete(synchronize_session=False)
-        
-        Exam.query.filter(Exam.id.in_(exam_ids)).update(
-            {Exam.progress: 0}, 
-            synchronize_session=False
-        )
-        
-        db.session.commit()
-        return jsonify({'message': 'Exams deleted successfully'}), 200
+        return enqueue_purge_response(user, 'Exam deletion queued', 'exams', exam_ids=list(exam_ids))
         
     except Exception as e:
         db.session.rollback()
@@ -781,46 +901,14 @@ def delete_provider_exams(user):
         return jsonify({'error': 'No provider names provided'}), 400
     
     try:
-        exam_ids = db.session.query(Exam.id).join(Provider).filter(
+        has_exams = db.session.query(Exam.id).join(Provider).filter(
             Provider.name.in_(provider_names)
-        ).all()
-        exam_ids = [eid[0] for eid in exam_ids]
+        ).first()
         
-        if not exam_ids:
+        if not has_exams:
             return jsonify({'message': 'No exams found for the specified providers'}), 200
         
-        UserPreference.query.filter(
-            UserPreference.user_id == user.id,
-            UserPreference.last_visited_exam.in_(exam_ids)
-        ).update({UserPreference.last_visited_exam: None}, synchronize_session=False)
-        
-        FavoriteQuestion.query.filter(
-            FavoriteQuestion.user_id == user.id,
-            FavoriteQuestion.exam_id.in_(exam_ids)
-        ).delete(synchronize_session=False)
-        
-        UserAnswer.query.filter(
-            UserAnswer.user_id == user.id,
-            UserAnswer.exam_id.in_(exam_ids)
-        ).delete(synchronize_session=False)
-        
-        ExamAttempt.query.filter(
-            ExamAttempt.user_id == user.id,
-            ExamAttempt.exam_id.in_(exam_ids)
-        ).delete(synchronize_session=False)
-        
-        ExamVisit.query.filter(
-            ExamVisit.user_id == user.id,
-            ExamVisit.exam_id.in_(exam_ids)
-        ).delete(synchronize_session=False)
-        
-        Exam.query.filter(Exam.id.in_(exam_ids)).update(
-            {Exam.progress: 0}, 
-            synchronize_session=False
-        )
-        
-        db.session.commit()
-        return jsonify({'message': 'Provider exams deleted successfully'}), 200
+        return enqueue_purge_response(user, 'Provider exam deletion queued', 'providers', provider_names=list(provider_names))
         
     except Exception as e:
         db.session.rollback()
@@ -829,26 +917,26 @@ def delete_provider_exams(user):
 @routes_bp.route('/delete-all-progress', methods=['POST'])
 @require_auth
 def delete_all_progress(user):
-    """Delete all exam progress for the user"""
+    """Queue deletion of all exam progress for the user"""
     try:
-        UserPreference.query.filter_by(user_id=user.id).update(
-            {UserPreference.last_visited_exam: None}, 
-            synchronize_session=False
-        )
-        FavoriteQuestion.query.filter_by(user_id=user.id).delete(synchronize_session=False)
-        UserAnswer.query.filter_by(user_id=user.id).delete(synchronize_session=False)
-        ExamAttempt.query.filter_by(user_id=user.id).delete(synchronize_session=False)
-        ExamVisit.query.filter_by(user_id=user.id).delete(synchronize_session=False)
-        
-        Exam.query.update({Exam.progress: 0}, synchronize_session=False)
-        
-        db.session.commit()
-        return jsonify({'message': 'All progress deleted successfully'}), 200
+        return enqueue_purge_response(user, 'Progress deletion queued', 'all')
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@routes_bp.route('/purge-jobs/<job_id>', methods=['GET'])
+@require_auth
+def get_purge_job(user, job_id):
+    job = db.session.get(PurgeJob, job_id)
+    if not job or job.user_id != user.id:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    if job.status in ('queued', 'running'):
+        current_app.extensions['purge_queue'].resume_stale()
+    
+    return jsonify(serialize_job(job))
+
 @routes_bp.route('/sidebar-state', methods=['GET'])
 @require_auth
 def get_sidebar_state(user):
@@ -882,6 +970,7 @@ def update_sidebar_state(user):
     return jsonify({'message': 'Sidebar state updated successfully'})
 
 @routes_bp.route('/provider-statistics', methods=['GET'])
+@read_only
 def get_provider_statistics():
     """Get provider statistics and categories."""
     try:
@@ -929,13 +1018,23 @@ def get_provider_statistics():
         print(f"Error in provider_statistics: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
-@routes_bp.route('/health')
-def health_check():
-    try:
-        db.session.execute(text('SELECT 1'))
-        return jsonify({'status': 'healthy', 'database': 'connected'}), 200
-    except Exception as e:
-        return jsonify({'status': 'unhealthy', 'database': str(e)}), 500
+@routes_bp.route('/admin/slow-queries', methods=['GET', 'DELETE'])
+@require_admin
+def admin_slow_queries(current_user):
+    """Slow statements recorded by this worker, newest first; DELETE clears the buffer."""
+    recorder = current_app.extensions['slow_queries']
+    if request.method == 'DELETE':
+        recorder.clear()
+        return jsonify({'message': 'Slow query buffer cleared'}), 200
+
+    limit = request.args.get('limit', type=int)
+    route = request.args.get('route')
+    return jsonify({
+        'enabled': recorder.enabled,
+        'threshold_ms': current_app.config['SLOW_QUERY_THRESHOLD_MS'],
+        'worker_pid': os.getpid(),
+        'records': recorder.snapshot(limit=limit, route=route)
+    }), 200
 
 @routes_bp.route('/debug/sidebar-state', methods=['GET'])
 def debug_sidebar_state():
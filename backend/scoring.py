@@ -0,0 +1,186 @@
+# backend/scoring.py
+
+from collections import namedtuple
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import select, update, func, column, JSON
+from sqlalchemy.dialects.postgresql import insert
+from app import db
+from models import Topic, ExamRevision, UserAnswer, ExamScoreTally
+from attempt_results import bitmap_to_int, int_to_bitmap
+from purge import visible_conditions
+
+# The answer key of one exam revision. masks[ordinal] is the set of correct option indices as a
+# bitmask (-1 when the key can never match, e.g. a non-letter answer); starts maps topic number
+# to its first ordinal. Ordinals follow the layout grade_attempt produces.
+AnswerKey = namedtuple('AnswerKey', ['revision', 'layout', 'starts', 'masks'])
+
+def answer_key_size(key):
+    return 64 + 8 * len(key.layout) + 32 * len(key.masks)
+
+def option_mask(indices):
+    """Bitmask of option indices; -1 if any index is negative (it can never be selected)."""
+    mask = 0
+    for index in indices:
+        if index < 0:
+            return -1
+        mask |= 1 << index
+    return mask
+
+def selection_mask(selected_options):
+    """The options a saved answer selects, filtered exactly as grade_attempt filters them."""
+    if not isinstance(selected_options, list):
+        selected_options = []
+    return option_mask({int(index) for index in selected_options if isinstance(index, (int, str)) and str(index).isdigit()})
+
+def exam_revision(exam_id):
+    return db.session.query(ExamRevision.version).filter_by(exam_id=exam_id).scalar() or 0
+
+def answer_key(exam_id, revision=None):
+    """
+    The exam's answer key, cached per (exam, revision). Only each question's answer letters are
+    read, unnested in SQL, so building a key does not load the question bodies.
+    """
+    if revision is None:
+        revision = exam_revision(exam_id)
+    cache = current_app.extensions.get('answer_key_cache')
+    cache_key = (exam_id, revision)
+    key = cache.get(cache_key) if cache is not None else None
+    if key is not None:
+        return key
+
+    elements = func.json_array_elements(Topic.data).table_valued(column('value', JSON), with_ordinality='ordinality').render_derived()
+    rows = db.session.execute(
+        select(Topic.number, elements.c.value.op('->>')('answer')).select_from(Topic).join(elements, db.true()).where(
+            Topic.exam_id == exam_id
+        ).order_by(Topic.id, elements.c.ordinality)
+    ).all()
+
+    layout, starts, masks = [], {}, []
+    for topic_number, answer in rows:
+        if not layout or layout[-1][0] != topic_number:
+            starts.setdefault(topic_number, len(masks))
+            layout.append([topic_number, 0])
+        layout[-1][1] += 1
+        masks.append(option_mask(ord(letter.upper()) - ord('A') for letter in answer or ''))
+
+    key = AnswerKey(revision, layout, starts, masks)
+    if cache is not None:
+        cache.put(cache_key, key)
+    return key
+
+def question_ordinal(key, topic_number, question_index):
+    try:
+        topic_number, question_index = int(topic_number), int(question_index)
+    except (TypeError, ValueError):
+        return None
+    start = key.starts.get(topic_number)
+    if start is None:
+        return None
+    count = next(count for number, count in key.layout if number == topic_number)
+    return start + question_index if 0 <= question_index < count else None
+
+def empty_correct_bits(key):
+    """Questions graded correct with no answer saved (an empty answer key)."""
+    bits = 0
+    for ordinal, mask in enumerate(key.masks):
+        if mask == 0:
+            bits |= 1 << ordinal
+    return bits
+
+def _rebuild(user_id, exam_id, key):
+    """Grade every visible saved answer of the user for the exam against key."""
+    bits = empty_correct_bits(key)
+    answers = db.session.query(UserAnswer.topic_number, UserAnswer.question_index, UserAnswer.selected_options).filter(
+        UserAnswer.user_id == user_id,
+        UserAnswer.exam_id == exam_id,
+        *visible_conditions(user_id, UserAnswer)
+    )
+    for topic_number, question_index, selected_options in answers:
+        ordinal = question_ordinal(key, topic_number, question_index)
+        if ordinal is None:
+            continue
+        if selection_mask(selected_options) == key.masks[ordinal]:
+            bits |= 1 << ordinal
+        else:
+            bits &= ~(1 << ordinal)
+    return bits
+
+def current_tally(user_id, exam_id, key):
+    """
+    The user's tally for key's revision as an int bitmap, rebuilt from saved answers when it is
+    missing or graded against another revision. The row stays locked until the caller commits,
+    so concurrent saves queue behind a rebuild instead of being lost by it.
+    """
+    locked = select(ExamScoreTally.revision, ExamScoreTally.correct_bitmap).where(
+        ExamScoreTally.user_id == user_id,
+        ExamScoreTally.exam_id == exam_id
+    ).with_for_update()
+    tally = db.session.execute(locked).first()
+    if tally is None:
+        db.session.execute(insert(ExamScoreTally).values(
+            user_id=user_id, exam_id=exam_id, revision=-1, correct_bitmap=b'', correct_count=0
+        ).on_conflict_do_nothing())
+        tally = db.session.execute(locked).one()
+    if tally.revision == key.revision:
+        return bitmap_to_int(tally.correct_bitmap)
+
+    bits = _rebuild(user_id, exam_id, key)
+    db.session.execute(update(ExamScoreTally).where(
+        ExamScoreTally.user_id == user_id,
+        ExamScoreTally.exam_id == exam_id
+    ).values(
+        revision=key.revision,
+        correct_bitmap=int_to_bitmap(bits, len(key.masks)),
+        correct_count=bin(bits).count('1'),
+        updated_at=datetime.utcnow()
+    ))
+    return bits
+
+def record_saved_answer(user_id, exam_id, topic_number, question_index, selected_options):
+    """
+    Regrade one saved answer into the user's tally, in the caller's transaction. The common case
+    is a single UPDATE flipping one bit with set_bit, guarded by the answer key's revision.
+    """
+    key = answer_key(exam_id)
+    ordinal = question_ordinal(key, topic_number, question_index)
+    if ordinal is None:
+        return
+    bit = 1 if selection_mask(selected_options) == key.masks[ordinal] else 0
+    if not _apply_bit(user_id, exam_id, key, ordinal, bit):
+        # No tally yet, or it predates the current revision. A rebuild that ran in another
+        # transaction (ours queued behind its lock) could not see this uncommitted answer, so
+        # apply the bit again on the now locked, current row; it is a no-op if already set.
+        current_tally(user_id, exam_id, key)
+        _apply_bit(user_id, exam_id, key, ordinal, bit)
+
+def _apply_bit(user_id, exam_id, key, ordinal, bit):
+    """Set one question's bit in a tally of key's revision; returns whether such a tally exists."""
+    return db.session.execute(update(ExamScoreTally).where(
+        ExamScoreTally.user_id == user_id,
+        ExamScoreTally.exam_id == exam_id,
+        ExamScoreTally.revision == key.revision
+    ).values(
+        correct_count=ExamScoreTally.correct_count + bit - func.get_bit(ExamScoreTally.correct_bitmap, ordinal),
+        correct_bitmap=func.set_bit(ExamScoreTally.correct_bitmap, ordinal, bit),
+        updated_at=datetime.utcnow()
+    )).rowcount
+
+def stored_grade(user_id, exam_id):
+    """
+    (total_questions, correct_answers, layout, incorrect_bitmap, topic_scores) from the running
+    tally, for submitting without re-grading: the counts come from bit operations only.
+    """
+    key = answer_key(exam_id)
+    total_questions = len(key.masks)
+    correct_bits = current_tally(user_id, exam_id, key)
+    incorrect_bits = ((1 << total_questions) - 1) & ~correct_bits
+
+    topic_scores = []
+    start = 0
+    for topic_number, count in key.layout:
+        correct = bin((correct_bits >> start) & ((1 << count) - 1)).count('1')
+        topic_scores.append([topic_number, correct, count])
+        start += count
+    correct_answers = sum(correct for _, correct, _ in topic_scores)
+    return total_questions, correct_answers, key.layout, int_to_bitmap(incorrect_bits, total_questions), topic_scores
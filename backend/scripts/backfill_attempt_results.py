@@ -0,0 +1,99 @@
+# backend/scripts/backfill_attempt_results.py
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+script_dir = Path(__file__).resolve().parent
+backend_dir = script_dir.parent
+sys.path.append(str(backend_dir))
+
+os.environ.setdefault('CREATE_TABLES_ON_STARTUP', 'false')
+
+from app import app, db
+from models import Topic, ExamAttempt, ExamAttemptResult
+from attempt_results import ordinal_index, int_to_bitmap
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def exam_layout(exam_id):
+    """[[topic_number, question_count], ...] in the order submit_answers grades topics."""
+    topics = db.session.query(Topic.number, db.func.json_array_length(Topic.data)).filter(
+        Topic.exam_id == exam_id
+    ).order_by(Topic.id).all()
+    return [[number, count] for number, count in topics]
+
+def encode(attempt, layout, index):
+    """Result row for an old attempt, or None when its list does not fit the exam's current layout."""
+    total = sum(count for _, count in layout)
+    if total != attempt.total_questions:
+        return None
+    bits = 0
+    for question_id in attempt.incorrect_questions or []:
+        ordinal = index.get(question_id)
+        if ordinal is None:
+            return None
+        bits |= 1 << ordinal
+
+    topic_scores = []
+    start = 0
+    for topic_number, count in layout:
+        wrong = bin((bits >> start) & ((1 << count) - 1)).count('1')
+        topic_scores.append([topic_number, count - wrong, count])
+        start += count
+    return ExamAttemptResult(
+        attempt_id=attempt.id,
+        layout=layout,
+        incorrect_bitmap=int_to_bitmap(bits, total),
+        topic_scores=topic_scores
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert incorrect_questions lists of old attempts into result bitmaps.')
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    with app.app_context():
+        layouts = {}
+        converted = skipped = 0
+        last_id = 0
+        while True:
+            attempts = ExamAttempt.query.outerjoin(
+                ExamAttemptResult, ExamAttemptResult.attempt_id == ExamAttempt.id
+            ).filter(
+                ExamAttemptResult.attempt_id.is_(None),
+                ExamAttempt.id > last_id
+            ).order_by(ExamAttempt.id).limit(args.batch_size).all()
+            if not attempts:
+                break
+            last_id = attempts[-1].id
+
+            for attempt in attempts:
+                if attempt.exam_id not in layouts:
+                    layout = exam_layout(attempt.exam_id)
+                    layouts[attempt.exam_id] = (layout, ordinal_index(layout))
+                layout, index = layouts[attempt.exam_id]
+                result = encode(attempt, layout, index)
+                if result is None:
+                    # The exam changed since this attempt; it keeps its JSON list.
+                    skipped += 1
+                    continue
+                db.session.add(result)
+                attempt.incorrect_questions = []
+                converted += 1
+
+            if args.dry_run:
+                db.session.rollback()
+            else:
+                db.session.commit()
+            logger.info(f"Up to attempt {last_id}: {converted} converted, {skipped} skipped")
+
+        logger.info(f"{'Would convert' if args.dry_run else 'Converted'} {converted} attempts; "
+                    f"{skipped} left as JSON lists because their exam changed")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+# backend/scripts/check_admission.py
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+script_dir = Path(__file__).resolve().parent
+backend_dir = script_dir.parent
+sys.path.append(str(backend_dir))
+
+os.environ.setdefault('CREATE_TABLES_ON_STARTUP', 'false')
+
+from sqlalchemy import text
+from app import app, db
+from auth import User, generate_token
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+USERNAME = 'admission-check'
+
+def seed():
+    with app.app_context():
+        user = User.query.filter_by(username=USERNAME).first()
+        if not user:
+            user = User(username=USERNAME, name='Admission Check')
+            db.session.add(user)
+            db.session.commit()
+        return generate_token(user.id)
+
+def start_server(port, threads, queue_timeout_ms):
+    """One gthread worker, as a single pod worker under init-backend.sh."""
+    import requests
+    env = dict(os.environ, GUNICORN_THREADS=str(threads), ADMISSION_QUEUE_TIMEOUT_MS=str(queue_timeout_ms))
+    process = subprocess.Popen([
+        sys.executable, '-m', 'gunicorn',
+        '--workers', '1',
+        '--threads', str(threads),
+        '--worker-class', 'gthread',
+        '--bind', f'127.0.0.1:{port}',
+        '--log-level', 'warning',
+        'app:app'
+    ], cwd=backend_dir, env=env)
+
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f'{url}/health/live', timeout=2).status_code == 200:
+                return process, url
+        except requests.RequestException:
+            pass
+        if process.poll() is not None:
+            raise SystemExit(f"Server exited with {process.returncode}")
+        time.sleep(0.5)
+    process.terminate()
+    raise SystemExit(f"Server did not start on {url}")
+
+def timed_get(url, timeout=60, **kwargs):
+    """(response, seconds); the response is None when it did not arrive within timeout."""
+    import requests
+    start = time.perf_counter()
+    try:
+        response = requests.get(url, timeout=timeout, **kwargs)
+    except requests.Timeout:
+        response = None
+    return response, time.perf_counter() - start
+
+def check_admission(port, threads, parallel, hold, queue_timeout_ms):
+    token = seed()
+    process, url = start_server(port, threads, queue_timeout_ms)
+    failures = []
+    try:
+        with app.app_context(), db.engine.connect() as blocker:
+            # Stall /api/exam-progress on the database, like a slow primary would.
+            blocker.execute(text('LOCK TABLE exam_visit IN ACCESS EXCLUSIVE MODE'))
+            with ThreadPoolExecutor(max_workers=parallel) as executor:
+                futures = [
+                    executor.submit(timed_get, f'{url}/api/exam-progress', headers={'Authorization': f'Bearer {token}'})
+                    for _ in range(parallel)
+                ]
+                time.sleep(0.5)
+                cheap = [(path, *timed_get(f'{url}{path}', timeout=5)) for path in ('/api/health/live', '/api/providers?limit=5')]
+                time.sleep(hold)
+                blocker.rollback()
+                results = [future.result() for future in futures]
+
+        rejected = [(r, seconds) for r, seconds in results if r is not None and r.status_code == 503]
+        admitted = [(r, seconds) for r, seconds in results if r is not None and r.status_code == 200]
+        logger.info(f"exam-progress: {len(admitted)} served, {len(rejected)} shed out of {parallel}")
+        for path, response, seconds in cheap:
+            status = response.status_code if response is not None else 'no answer'
+            logger.info(f"{path} while saturated: {status} in {seconds * 1000:.0f} ms")
+            if status != 200 or seconds > 1:
+                failures.append(f"{path} answered {status} in {seconds:.2f}s while exam-progress was saturated")
+
+        if not rejected:
+            failures.append("No request was shed")
+        if len(admitted) + len(rejected) != parallel:
+            failures.append(f"Unexpected statuses: {[r.status_code if r is not None else None for r, _ in results]}")
+        slowest_rejection = max((seconds for _, seconds in rejected), default=0)
+        if slowest_rejection > queue_timeout_ms / 1000 + 1:
+            failures.append(f"A 503 took {slowest_rejection:.2f}s, more than the queue timeout")
+        if any('Retry-After' not in r.headers for r, _ in rejected):
+            failures.append("503 without Retry-After")
+
+        metrics, _ = timed_get(f'{url}/metrics')
+        if metrics.status_code == 200:
+            shed = [line for line in metrics.text.splitlines() if line.startswith('admission_rejected_total')]
+            logger.info(f"Metrics: {shed}")
+            if not shed:
+                failures.append("admission_rejected_total missing from /metrics")
+    finally:
+        process.terminate()
+        process.wait()
+
+    if failures:
+        for failure in failures:
+            logger.error(failure)
+        sys.exit(1)
+    logger.info("✓ Saturated exam-progress requests are shed with 503 while cheap endpoints keep answering")
+
+def main():
+    parser = argparse.ArgumentParser(description='Verify admission control sheds expensive requests while the database stalls.')
+    parser.add_argument('--port', type=int, default=5111)
+    parser.add_argument('--threads', type=int, default=4, help='GUNICORN_THREADS of the worker')
+    parser.add_argument('--parallel', type=int, default=16, help='Concurrent /api/exam-progress requests')
+    parser.add_argument('--hold', type=float, default=4, help='Seconds to keep the database stalled')
+    parser.add_argument('--queue-timeout-ms', type=int, default=1000)
+    args = parser.parse_args()
+    check_admission(args.port, args.threads, args.parallel, args.hold, args.queue_timeout_ms)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+# backend/scripts/check_idempotent_submit.py
+
+import os
+import sys
+import uuid
+import argparse
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+script_dir = Path(__file__).resolve().parent
+backend_dir = script_dir.parent
+sys.path.append(str(backend_dir))
+
+os.environ.setdefault('CREATE_TABLES_ON_STARTUP', 'false')
+# Every duplicate must reach the idempotency key; admission control would shed most of them.
+os.environ.setdefault('ADMISSION_ENABLED', 'false')
+
+from app import app, db
+from models import Provider, Exam, Topic, ExamAttempt, SubmissionIdempotency
+from auth import User, generate_token
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROVIDER_NAME = 'IdempotencyCheck'
+EXAM_ID = f"{PROVIDER_NAME}-Retry Exam-code-IC-001"
+USERNAME = 'idempotency-check'
+
+def seed():
+    provider = Provider.query.filter_by(name=PROVIDER_NAME).first()
+    if not provider:
+        provider = Provider(name=PROVIDER_NAME, is_popular=False)
+        db.session.add(provider)
+        db.session.flush()
+    if not db.session.get(Exam, EXAM_ID):
+        db.session.add(Exam(id=EXAM_ID, title='IC-001: Retry Exam', total_questions=3, provider_id=provider.id))
+        db.session.add(Topic(number=1, exam_id=EXAM_ID, data=[
+            {'question': f'Question {number}?', 'options': ['A. yes', 'B. no'], 'answer': 'A'}
+            for number in range(1, 4)
+        ]))
+    user = User.query.filter_by(username=USERNAME).first()
+    if not user:
+        user = User(username=USERNAME, name='Idempotency Check')
+        db.session.add(user)
+    db.session.commit()
+    return user.id
+
+def attempt_count(user_id):
+    with app.app_context():
+        return ExamAttempt.query.filter_by(user_id=user_id, exam_id=EXAM_ID).count()
+
+def check_idempotent_submit(parallel):
+    with app.app_context():
+        user_id = seed()
+        token = generate_token(user_id)
+
+    payload = {'exam_id': EXAM_ID, 'user_answers': {'T1 Q1': [0], 'T1 Q2': [1]}}
+    key = str(uuid.uuid4())
+    failures = []
+    before = attempt_count(user_id)
+
+    # Release every duplicate at once so they race for the key.
+    start = threading.Barrier(parallel)
+
+    def submit(body=payload, idempotency_key=key):
+        start.wait()
+        return post(body, idempotency_key)
+
+    def post(body=payload, idempotency_key=key):
+        response = app.test_client().post('/api/submit-answers', json=body, headers={
+            'Authorization': f'Bearer {token}',
+            'Idempotency-Key': idempotency_key
+        })
+        return response.status_code, response.get_json(), response.headers.get('Idempotent-Replayed') == 'true'
+
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        results = list(pool.map(lambda _: submit(), range(parallel)))
+
+    created = attempt_count(user_id) - before
+    statuses = {status for status, _, _ in results}
+    bodies = {repr(sorted(body.items())) for _, body, _ in results}
+    replayed = sum(1 for _, _, was_replayed in results if was_replayed)
+    logger.info(f"{parallel} parallel duplicates: statuses={sorted(statuses)}, distinct bodies={len(bodies)}, "
+                f"replayed={replayed}, attempts created={created}")
+    if statuses != {200}:
+        failures.append(f"expected only HTTP 200, got {sorted(statuses)}")
+    if len(bodies) != 1:
+        failures.append(f"duplicates returned {len(bodies)} different results")
+    if created != 1:
+        failures.append(f"expected exactly 1 attempt, {created} were created")
+    if replayed != parallel - 1:
+        failures.append(f"expected {parallel - 1} replayed responses, got {replayed}")
+
+    # A retry after this worker forgot the key must replay from Postgres.
+    app.extensions['idempotency'].cache.clear()
+    status, body, was_replayed = post()
+    if status != 200 or not was_replayed or body['attempt_id'] != results[0][1]['attempt_id']:
+        failures.append(f"retry after clearing the cache was not replayed (HTTP {status})")
+
+    status, _, _ = post({**payload, 'user_answers': {'T1 Q1': [1]}})
+    if status != 422:
+        failures.append(f"reusing the key for a different submission returned {status}, expected 422")
+
+    status, _, was_replayed = post(idempotency_key=str(uuid.uuid4()))
+    if status != 200 or was_replayed:
+        failures.append(f"a fresh key did not create a new attempt (HTTP {status})")
+    if attempt_count(user_id) - before != 2:
+        failures.append(f"expected 2 attempts after a fresh key, found {attempt_count(user_id) - before}")
+
+    with app.app_context():
+        stored = db.session.get(SubmissionIdempotency, (user_id, key))
+        if stored is None or stored.attempt_id != results[0][1]['attempt_id']:
+            failures.append("the stored key does not point at the attempt it created")
+
+    if failures:
+        for failure in failures:
+            logger.error(failure)
+        sys.exit(1)
+    logger.info("✓ Duplicate submissions with one Idempotency-Key create a single attempt")
+
+def main():
+    parser = argparse.ArgumentParser(description='Fire parallel duplicate submissions with one Idempotency-Key and check only one attempt is recorded.')
+    parser.add_argument('--parallel', type=int, default=16, help='Number of concurrent duplicates')
+    args = parser.parse_args()
+    check_idempotent_submit(args.parallel)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+# backend/scripts/check_replica_routing.py
+
+import os
+import sys
+import time
+from pathlib import Path
+
+script_dir = Path(__file__).resolve().parent
+backend_dir = script_dir.parent
+sys.path.append(str(backend_dir))
+
+# Without a real replica, route "replica" reads through a second engine on the same database.
+if os.getenv('DATABASE_URL') and not os.getenv('DATABASE_REPLICA_URL'):
+    os.environ['DATABASE_REPLICA_URL'] = os.environ['DATABASE_URL']
+
+from app import app, db
+from models import Provider, Exam, Topic
+from auth import User, generate_token
+from db_routing import REPLICA_BIND_KEY, PIN_HEADER, _pins
+from sqlalchemy import event
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROVIDER_NAME = 'ReplicaCheck'
+EXAM_ID = f"{PROVIDER_NAME}-Routing Exam-code-RC-001"
+
+def count_statements(counts):
+    """Count statements per engine label into counts['primary'] / counts['replica']."""
+    engines = db.engines
+    for label, engine in (('primary', engines[None]), ('replica', engines[REPLICA_BIND_KEY])):
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _count(conn, cursor, statement, parameters, context, executemany, label=label):
+            counts[label] = counts.get(label, 0) + 1
+
+def seed():
+    provider = Provider.query.filter_by(name=PROVIDER_NAME).first()
+    if not provider:
+        provider = Provider(name=PROVIDER_NAME, is_popular=False)
+        db.session.add(provider)
+        db.session.flush()
+    if not db.session.get(Exam, EXAM_ID):
+        db.session.add(Exam(id=EXAM_ID, title='RC-001: Routing Exam', total_questions=1, provider_id=provider.id))
+        db.session.add(Topic(number=1, exam_id=EXAM_ID, data=[
+            {'question': 'Which engine served this?', 'options': ['A. primary', 'B. replica'], 'answer': 'B'}
+        ]))
+    user = User.query.filter_by(username='replica-check').first()
+    if not user:
+        user = User(username='replica-check', name='Replica Check')
+        db.session.add(user)
+    db.session.commit()
+    return user.id
+
+def check_replica_routing():
+    if REPLICA_BIND_KEY not in app.config['SQLALCHEMY_BINDS']:
+        raise SystemExit("DATABASE_REPLICA_URL (or DATABASE_URL) must be set")
+
+    with app.app_context():
+        user_id = seed()
+        token = generate_token(user_id)
+        counts = {}
+        count_statements(counts)
+
+    headers = {'Authorization': f'Bearer {token}'}
+    client = app.test_client()
+    failures = []
+
+    def measure(label, method, path, expect, extra_headers=None, **kwargs):
+        counts.clear()
+        response = client.open(path, method=method, headers={**headers, **(extra_headers or {})}, **kwargs)
+        logger.info(f"{label}: HTTP {response.status_code}, primary={counts.get('primary', 0)}, replica={counts.get('replica', 0)}")
+        if response.status_code >= 400:
+            failures.append(f"{label} returned {response.status_code}")
+        elif expect == 'replica' and not counts.get('replica'):
+            failures.append(f"{label} did not read from the replica")
+        elif expect == 'primary' and counts.get('replica'):
+            failures.append(f"{label} read from the replica inside the read-your-writes window")
+        return response
+
+    # Allow a real streaming replica to catch up with the seed data.
+    time.sleep(float(os.getenv('REPLICA_LAG_SECONDS', 0)))
+
+    measure('GET /api/providers', 'GET', '/api/providers', 'replica')
+    measure('GET /api/provider-statistics', 'GET', '/api/provider-statistics', 'replica')
+    measure('GET /api/exams/<id>', 'GET', f'/api/exams/{EXAM_ID}', 'replica')
+    measure('GET /api/favorites/<id>', 'GET', f'/api/favorites/{EXAM_ID}', 'replica')
+    saved = measure('POST /api/save-answer', 'POST', '/api/save-answer', 'primary', json={
+        'exam_id': EXAM_ID, 'topic_number': 1, 'question_index': 0, 'selected_options': [1]
+    })
+
+    if app.config['DB_READ_YOUR_WRITES_SECONDS'] > 0:
+        measure('GET /api/get-answers/<id> after write', 'GET', f'/api/get-answers/{EXAM_ID}', 'primary')
+
+        # The next read usually reaches another worker or pod, which only has the client's pin.
+        pin = saved.headers.get(PIN_HEADER)
+        if not pin:
+            failures.append(f"POST /api/save-answer did not return {PIN_HEADER}")
+        _pins.clear()
+        measure('GET /api/get-answers/<id> on another worker', 'GET', f'/api/get-answers/{EXAM_ID}', 'primary',
+                extra_headers={PIN_HEADER: pin or ''})
+        measure('GET /api/get-answers/<id> with a forged pin', 'GET', f'/api/get-answers/{EXAM_ID}', 'replica',
+                extra_headers={PIN_HEADER: f"{user_id}:{int((time.time() + 60) * 1000)}.forged"})
+
+    if failures:
+        for failure in failures:
+            logger.error(failure)
+        sys.exit(1)
+    logger.info("✓ Replica routing behaves as expected")
+
+if __name__ == '__main__':
+    check_replica_routing()
@@ -0,0 +1,150 @@
+# backend/scripts/check_singleflight.py
+
+import os
+import sys
+import time
+import argparse
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+script_dir = Path(__file__).resolve().parent
+backend_dir = script_dir.parent
+sys.path.append(str(backend_dir))
+
+os.environ.setdefault('CREATE_TABLES_ON_STARTUP', 'false')
+# Every request of a burst must reach the exam load; admission control would shed most of them.
+os.environ.setdefault('ADMISSION_ENABLED', 'false')
+
+from sqlalchemy import event, text
+from app import app, db
+from models import Provider, Exam, Topic
+from auth import User, generate_token
+from routes import exam_loads
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROVIDER_NAME = 'SingleFlightCheck'
+EXAM_ID = f"{PROVIDER_NAME}-Cold Cache Exam"
+USERNAME = 'singleflight-check'
+
+def seed():
+    with app.app_context():
+        provider = Provider.query.filter_by(name=PROVIDER_NAME).first()
+        if not provider:
+            provider = Provider(name=PROVIDER_NAME, is_popular=False)
+            db.session.add(provider)
+            db.session.flush()
+        if not db.session.get(Exam, EXAM_ID):
+            db.session.add(Exam(id=EXAM_ID, title='Cold Cache Exam', total_questions=40, provider_id=provider.id))
+            for number in range(1, 5):
+                db.session.add(Topic(number=number, exam_id=EXAM_ID, data=[
+                    {'question': f'Topic {number} question {index}?', 'options': ['A. yes', 'B. no'], 'answer': 'A'}
+                    for index in range(1, 11)
+                ]))
+        user = User.query.filter_by(username=USERNAME).first()
+        if not user:
+            user = User(username=USERNAME, name='Single-flight Check')
+            db.session.add(user)
+        db.session.commit()
+        return generate_token(user.id)
+
+class TopicQueries:
+    """Counts SELECTs against the topic table, i.e. exam content loads."""
+
+    def __init__(self, engine):
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, 'before_cursor_execute', self._before_execute)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'FROM topic' in statement:
+            with self._lock:
+                self.count += 1
+
+def burst(token, parallel, while_stalled):
+    """
+    Fire parallel GET /api/exams/<id> on a cold cache while topic is locked, run
+    while_stalled(blocker) once they are all waiting, then release the lock.
+    """
+    app.extensions['exam_cache'].clear()
+    start = threading.Barrier(parallel)
+
+    def get_exam():
+        start.wait()
+        response = app.test_client().get(f'/api/exams/{EXAM_ID}', headers={'Authorization': f'Bearer {token}'})
+        return response.status_code, response.get_data(), response.headers.get('Retry-After')
+
+    with app.app_context(), db.engine.connect() as blocker:
+        blocker.execute(text('LOCK TABLE topic IN ACCESS EXCLUSIVE MODE'))
+        with ThreadPoolExecutor(max_workers=parallel) as pool:
+            futures = [pool.submit(get_exam) for _ in range(parallel)]
+            time.sleep(1)
+            while_stalled(blocker)
+            blocker.rollback()
+            return [future.result() for future in futures]
+
+def cancel_load(blocker):
+    """Cancel the one exam content query waiting on the lock, as a statement timeout would."""
+    blocker.execute(text("""
+        SELECT pg_cancel_backend(pid) FROM pg_stat_activity
+        WHERE pid <> pg_backend_pid() AND wait_event_type = 'Lock' AND query ~ 'FROM\s+topic'
+    """))
+    time.sleep(0.5)
+
+def check_singleflight(parallel):
+    token = seed()
+    with app.app_context():
+        topics = TopicQueries(db.engine)
+    failures = []
+
+    def expect(name, results, before, statuses, queries=1):
+        counts = exam_loads.stats()
+        seen = sorted(status for status, _, _ in results)
+        logger.info(f"{name}: statuses={dict((s, seen.count(s)) for s in set(seen))}, "
+                    f"topic queries={topics.count - before}, group={counts}")
+        if set(seen) != statuses:
+            failures.append(f"{name}: expected statuses {sorted(statuses)}, got {seen}")
+        if topics.count - before != queries:
+            failures.append(f"{name}: {topics.count - before} topic queries, expected {queries}")
+
+    # Cold cache: one load, every caller gets its body.
+    before, coalesced = topics.count, exam_loads.counts['coalesced']
+    results = burst(token, parallel, lambda blocker: None)
+    expect('cold cache', results, before, {200})
+    if len({body for _, body, _ in results}) != 1:
+        failures.append("cold cache: callers received different bodies")
+    if exam_loads.counts['coalesced'] - coalesced != parallel - 1:
+        failures.append(f"cold cache: {exam_loads.counts['coalesced'] - coalesced} coalesced waiters, expected {parallel - 1}")
+
+    # The load fails: every waiter gets the failure, nobody retries the query behind it.
+    before = topics.count
+    results = burst(token, parallel, cancel_load)
+    expect('failed load', results, before, {500})
+
+    # Waiters give up after SINGLEFLIGHT_TIMEOUT_SECONDS with a 503; the load itself completes.
+    app.config['SINGLEFLIGHT_TIMEOUT_SECONDS'] = 0.5
+    before = topics.count
+    results = burst(token, parallel, lambda blocker: time.sleep(0.5))
+    expect('waiter timeout', results, before, {200, 503})
+    if sum(1 for status, _, _ in results if status == 200) != 1:
+        failures.append("waiter timeout: expected only the loading request to succeed")
+    if any(retry_after is None for status, _, retry_after in results if status == 503):
+        failures.append("waiter timeout: 503 without Retry-After")
+
+    if failures:
+        for failure in failures:
+            logger.error(failure)
+        sys.exit(1)
+    logger.info("✓ Concurrent exam cache misses share one load, its failure, and time out on their own")
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that concurrent cold-cache exam loads are coalesced into one.')
+    parser.add_argument('--parallel', type=int, default=24, help='Concurrent requests per burst')
+    args = parser.parse_args()
+    check_singleflight(args.parallel)
+
+if __name__ == '__main__':
+    main()
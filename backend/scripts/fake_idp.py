@@ -0,0 +1,200 @@
+# backend/scripts/fake_idp.py
+
+import os
+import sys
+import time
+import uuid
+import argparse
+import threading
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+script_dir = Path(__file__).resolve().parent
+backend_dir = script_dir.parent
+sys.path.append(str(backend_dir))
+
+from flask import Flask, jsonify, request, redirect
+from werkzeug.serving import make_server
+from authlib.jose import JsonWebKey, jwt
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CLIENT_ID = 'fake-idp-client'
+CLIENT_SECRET = 'fake-idp-secret'
+
+def create_idp(base_url, latency):
+    """
+    A stand-in for GitHub and Google: OAuth authorize/token endpoints, the GitHub user APIs, and
+    OpenID discovery, JWKS and RS256 ID tokens. Every response waits latency seconds, like a
+    round trip to the real provider; hits per endpoint are counted at /stats.
+    """
+    idp = Flask('fake_idp')
+    key = JsonWebKey.generate_key('RSA', 2048, is_private=True, options={'kid': 'fake-idp-key'})
+    codes = {}
+    stats = {}
+    stats_lock = threading.Lock()
+
+    @idp.before_request
+    def simulate_latency():
+        with stats_lock:
+            stats[request.path] = stats.get(request.path, 0) + 1
+        time.sleep(latency)
+
+    def issue_code():
+        code = uuid.uuid4().hex
+        codes[code] = request.args.to_dict()
+        target = request.args['redirect_uri']
+        separator = '&' if '?' in target else '?'
+        return redirect(f"{target}{separator}{urlencode({'code': code, 'state': request.args.get('state', '')})}")
+
+    @idp.route('/stats')
+    def get_stats():
+        return jsonify(stats)
+
+    @idp.route('/github/login/oauth/authorize')
+    def github_authorize():
+        return issue_code()
+
+    @idp.route('/github/login/oauth/access_token', methods=['POST'])
+    def github_token():
+        codes.pop(request.form.get('code'), None)
+        return jsonify({'access_token': uuid.uuid4().hex, 'token_type': 'bearer', 'scope': 'user:email'})
+
+    @idp.route('/github/api/user')
+    def github_user():
+        return jsonify({'id': 4242, 'login': 'fake-idp-user', 'name': 'Fake IdP User',
+                        'avatar_url': f'{base_url}/avatar.png'})
+
+    @idp.route('/github/api/user/emails')
+    def github_emails():
+        return jsonify([{'email': 'fake-idp-user@example.com', 'primary': True, 'verified': True}])
+
+    @idp.route('/.well-known/openid-configuration')
+    def openid_configuration():
+        return jsonify({
+            'issuer': base_url,
+            'authorization_endpoint': f'{base_url}/authorize',
+            'token_endpoint': f'{base_url}/token',
+            'jwks_uri': f'{base_url}/jwks',
+            'response_types_supported': ['code'],
+            'subject_types_supported': ['public'],
+            'id_token_signing_alg_values_supported': ['RS256']
+        })
+
+    @idp.route('/jwks')
+    def jwks():
+        return jsonify({'keys': [key.as_dict(is_private=False)]})
+
+    @idp.route('/authorize')
+    def authorize():
+        return issue_code()
+
+    @idp.route('/token', methods=['POST'])
+    def token():
+        grant = codes.pop(request.form.get('code'), None)
+        if grant is None:
+            return jsonify({'error': 'invalid_grant'}), 400
+        now = int(time.time())
+        claims = {
+            'iss': base_url,
+            'sub': 'fake-idp-google-user',
+            'aud': grant.get('client_id', CLIENT_ID),
+            'iat': now,
+            'exp': now + 300,
+            'nonce': grant.get('nonce'),
+            'email': 'fake-idp-user@example.com',
+            'name': 'Fake IdP User'
+        }
+        id_token = jwt.encode({'alg': 'RS256', 'kid': key.kid}, claims, key).decode('ascii')
+        return jsonify({'access_token': uuid.uuid4().hex, 'token_type': 'Bearer', 'expires_in': 300, 'id_token': id_token})
+
+    return idp, stats
+
+def idp_environment(base_url):
+    """Settings that point the backend's logins at the fake provider."""
+    return {
+        'GITHUB_CLIENT_ID': CLIENT_ID,
+        'GITHUB_CLIENT_SECRET': CLIENT_SECRET,
+        'GITHUB_AUTHORIZE_URL': f'{base_url}/github/login/oauth/authorize',
+        'GITHUB_ACCESS_TOKEN_URL': f'{base_url}/github/login/oauth/access_token',
+        'GITHUB_API_URL': f'{base_url}/github/api/',
+        'GOOGLE_CLIENT_ID': CLIENT_ID,
+        'GOOGLE_CLIENT_SECRET': CLIENT_SECRET,
+        'GOOGLE_METADATA_URL': f'{base_url}/.well-known/openid-configuration'
+    }
+
+def login(client, requests, provider):
+    """Run one login through the backend and the fake provider; returns (callback seconds, redirect target)."""
+    start = client.get(f'/api/auth/{provider}', base_url='https://localhost')
+    at_idp = requests.get(start.headers['Location'], allow_redirects=False)
+    callback = urlsplit(at_idp.headers['Location'])
+    began = time.perf_counter()
+    done = client.get(f'{callback.path}?{callback.query}', base_url='https://localhost')
+    return time.perf_counter() - began, done.headers.get('Location', '')
+
+def check(port, latency, logins):
+    import requests
+
+    base_url = f'http://127.0.0.1:{port}'
+    idp, stats = create_idp(base_url, latency)
+    server = make_server('127.0.0.1', port, idp, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ.update(idp_environment(base_url))
+    os.environ['API_URL'] = 'https://localhost/api'
+    os.environ.setdefault('CREATE_TABLES_ON_STARTUP', 'false')
+    from app import app
+
+    failures = []
+    client = app.test_client()
+    for provider, round_trips in (('github', 2), ('google', 1)):
+        timings = []
+        for _ in range(logins):
+            seconds, target = login(client, requests, provider)
+            timings.append(seconds)
+            if '?token=' not in target:
+                failures.append(f"{provider} login did not finish with a token: {target}")
+                break
+        fastest = min(timings)
+        logger.info(f"{provider}: {logins} logins, fastest callback {fastest * 1000:.0f} ms "
+                    f"(IdP latency {latency * 1000:.0f} ms, {round_trips} round trips expected)")
+        # GitHub: token exchange, then user and user/emails at once. Google: token exchange only,
+        # with metadata and keys already cached.
+        if fastest > (round_trips + 0.5) * latency:
+            failures.append(f"{provider} callback took {fastest * 1000:.0f} ms, more than {round_trips} round trips")
+
+    logger.info(f"Fake IdP hits: {stats}")
+    for path in ('/.well-known/openid-configuration', '/jwks'):
+        if stats.get(path) != 1:
+            failures.append(f"{path} was fetched {stats.get(path, 0)} times, expected once")
+    server.shutdown()
+
+    if failures:
+        for failure in failures:
+            logger.error(failure)
+        sys.exit(1)
+    logger.info("✓ Logins run against the fake IdP with concurrent profile calls and cached OpenID metadata")
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the GitHub and Google identity providers.')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--latency-ms', type=float, default=100, help='Delay added to every IdP response')
+    parser.add_argument('--check', action='store_true', help='Run GitHub and Google logins through the backend against it and verify them')
+    parser.add_argument('--logins', type=int, default=5, help='Logins per provider with --check')
+    args = parser.parse_args()
+
+    if args.check:
+        check(args.port, args.latency_ms / 1000, args.logins)
+        return
+
+    base_url = f'http://127.0.0.1:{args.port}'
+    idp, _ = create_idp(base_url, args.latency_ms / 1000)
+    print("Point the backend at this provider with:")
+    for name, value in idp_environment(base_url).items():
+        print(f"  export {name}='{value}'")
+    make_server('127.0.0.1', args.port, idp, threaded=True).serve_forever()
+
+if __name__ == '__main__':
+    main()
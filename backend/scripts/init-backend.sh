@@ -56,13 +56,26 @@ verify_db_connection() {
 }
 
 setup_gunicorn() {
+    # sync: gthread workers running the Flask app (app:app).
+    # async: uvicorn workers running asgi:app, where the dashboard reads run on asyncio and
+    # everything else is the same Flask app on a thread pool.
+    SERVER_MODE=${SERVER_MODE:-sync}
     GUNICORN_WORKERS=${GUNICORN_WORKERS:-4}
     GUNICORN_THREADS=${GUNICORN_THREADS:-4}
     GUNICORN_TIMEOUT=${GUNICORN_TIMEOUT:-300}
     GUNICORN_KEEPALIVE=${GUNICORN_KEEPALIVE:-5}
     BIND_ADDRESS="0.0.0.0:5000"
     
+    if [ "$SERVER_MODE" = "async" ]; then
+        WORKER_CLASS="uvicorn.workers.UvicornWorker"
+        APP_MODULE="asgi:app"
+    else
+        WORKER_CLASS="gthread"
+        APP_MODULE="app:app"
+    fi
+    
     log "Configuring Gunicorn:"
+    log "- Server mode: $SERVER_MODE ($WORKER_CLASS, $APP_MODULE)"
     log "- Workers: $GUNICORN_WORKERS"
     log "- Threads: $GUNICORN_THREADS"
     log "- Timeout: $GUNICORN_TIMEOUT"
@@ -70,6 +83,14 @@ setup_gunicorn() {
     log "- Bind address: $BIND_ADDRESS"
 }
 
+setup_metrics() {
+    # Workers write per-process metric files here; stale files from a previous run must go.
+    export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/dev/shm/hiraya-metrics}
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+    log "- Metrics directory: $PROMETHEUS_MULTIPROC_DIR"
+}
+
 # Main execution flow
 log "Starting initialization process..."
 
@@ -105,6 +126,7 @@ fi
 
 # Setup and start Gunicorn
 setup_gunicorn
+setup_metrics
 
 log "Starting Gunicorn server..."
 exec gunicorn \
@@ -118,6 +140,6 @@ exec gunicorn \
     --error-logfile - \
     --capture-output \
     --enable-stdio-inheritance \
-    --worker-class=gthread \
+    --worker-class=$WORKER_CLASS \
     --worker-tmp-dir=/dev/shm \
-    'app:app'
\ No newline at end of file
+    "$APP_MODULE"
\ No newline at end of file
@@ -15,7 +15,7 @@ backend_dir = script_dir.parent
 sys.path.append(str(backend_dir))
 
 from app import app, db
-from models import Provider, Exam, Topic
+from models import Provider, Exam, Topic, ExamRevision
 
 # Configure logging
 logging.basicConfig(
@@ -174,6 +174,7 @@ def process_exam_group(session, provider, base_key, topic_files, stats):
             logger.info(f"Created new exam: {display_title}")
         
         # Process topics
+        content_changed = False
         for topic_info in topic_files:
             topic = Topic.query.filter_by(
                 exam_id=exam_id,
@@ -188,19 +189,33 @@ def process_exam_group(session, provider, base_key, topic_files, stats):
                 )
                 session.add(topic)
                 stats['topics_migrated'] += 1
+                content_changed = True
                 logger.info(f"Created topic {topic_info['topic_number']} for exam: {display_title}")
-            else:
+            elif topic.data != topic_info['data']:
                 topic.data = topic_info['data']
+                content_changed = True
                 logger.info(f"Updated topic {topic_info['topic_number']} for exam: {display_title}")
         
+        # Bumping the revision invalidates cached /api/exams payloads in every worker.
+        if content_changed:
+            session.flush()
+            revision = ExamRevision.query.get(exam_id)
+            if revision:
+                revision.version += 1
+            else:
+                session.add(ExamRevision(exam_id=exam_id, version=1))
+        
         session.flush()
         
     except Exception as e:
         logger.error(f"Error processing exam {exam_id}: {str(e)}")
         raise
 
-def migrate_providers_to_db():
-    """Main migration function with improved error handling and progress tracking."""
+def migrate_providers_to_db(root_dir=None):
+    """
+    Main migration function with improved error handling and progress tracking.
+    Reads backend/providers unless root_dir (or PROVIDERS_DIR) points elsewhere; returns the stats.
+    """
     start_time = datetime.now()
     logger.info(f"Starting provider migration at {start_time}")
     
@@ -212,7 +227,7 @@ def migrate_providers_to_db():
     }
     
     try:
-        root_dir = os.path.join(backend_dir, 'providers')
+        root_dir = root_dir or os.getenv('PROVIDERS_DIR') or os.path.join(backend_dir, 'providers')
         if not os.path.exists(root_dir):
             raise FileNotFoundError(f"Providers directory not found at: {root_dir}")
             
@@ -252,6 +267,8 @@ Migration completed in {duration}:
             logger.warning("The following errors occurred during migration:")
             for error in stats['errors']:
                 logger.warning(error)
+        
+        return stats
                 
     except Exception as e:
         logger.error(f"Fatal error during migration: {str(e)}")
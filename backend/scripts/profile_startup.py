@@ -0,0 +1,114 @@
+# backend/scripts/profile_startup.py
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+
+script_dir = Path(__file__).resolve().parent
+backend_dir = script_dir.parent
+
+# Runs inside the child interpreter so that -X importtime sees a cold import of app.py.
+CHILD_CODE = """
+import json, sys, time
+start = time.perf_counter()
+import app
+result = {'import_app_seconds': round(time.perf_counter() - start, 4)}
+probe = sys.argv[1] if len(sys.argv) > 1 else ''
+if probe:
+    with app.app.test_client() as client:
+        response = client.get(probe)
+        result['probe_status'] = response.status_code
+result.update(app.app.extensions['startup'].summary())
+print('STARTUP_PROFILE ' + json.dumps(result))
+"""
+
+def parse_importtime(stderr):
+    """Parse `python -X importtime` output into (module, self_us, cumulative_us, depth) rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line.split(':', 1)[1].split('|')
+        except ValueError:
+            continue
+        # Nested imports are indented by two spaces per level after the single separator space.
+        module = name.rstrip()[1:]
+        depth = (len(module) - len(module.lstrip())) // 2
+        rows.append((module.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+def top_level_packages(rows):
+    """Sum self import time by top-level package, so the totals add up to the whole import."""
+    totals = {}
+    for module, self_us, _, _ in rows:
+        package = module.split('.')[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+def profile_startup(probe_path=None, create_tables=False):
+    env = dict(os.environ)
+    env.setdefault('CREATE_TABLES_ON_STARTUP', 'true' if create_tables else 'false')
+
+    args = [sys.executable, '-X', 'importtime', '-c', CHILD_CODE]
+    if probe_path:
+        args.append(probe_path)
+
+    proc = subprocess.run(args, cwd=str(backend_dir), env=env, capture_output=True, text=True)
+
+    profile = None
+    for line in proc.stdout.splitlines():
+        if line.startswith('STARTUP_PROFILE '):
+            profile = json.loads(line[len('STARTUP_PROFILE '):])
+
+    if proc.returncode != 0 or profile is None:
+        raise RuntimeError(f"Startup profiling failed (exit {proc.returncode}):\n{proc.stderr[-4000:]}")
+
+    rows = parse_importtime(proc.stderr)
+    profile['packages'] = [
+        {'package': package, 'self_ms': round(us / 1000, 2)}
+        for package, us in top_level_packages(rows)
+    ]
+    profile['slowest_modules'] = [
+        {'module': module, 'self_ms': round(self_us / 1000, 2), 'cumulative_ms': round(cumulative_us / 1000, 2)}
+        for module, self_us, cumulative_us, _ in sorted(rows, key=lambda row: row[1], reverse=True)[:25]
+    ]
+    return profile
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile backend cold start: import breakdown and app-factory phases.')
+    parser.add_argument('--probe', default=None, help='Path to request once after startup, e.g. /health')
+    parser.add_argument('--create-tables', action='store_true', help='Include db.create_all() in the profile')
+    parser.add_argument('--top', type=int, default=15, help='Number of packages to print')
+    parser.add_argument('--json', dest='json_path', help='Write the full profile to this file')
+    parser.add_argument('--max-import-seconds', type=float, help='Fail if importing app.py takes longer than this')
+    args = parser.parse_args()
+
+    profile = profile_startup(args.probe, args.create_tables)
+
+    print(f"Import app.py: {profile['import_app_seconds']:.3f}s")
+    print(f"Startup to ready: {profile['seconds_to_ready']}s")
+    if profile.get('seconds_to_first_request') is not None:
+        print(f"Startup to first request ({args.probe} -> {profile.get('probe_status')}): {profile['seconds_to_first_request']}s")
+
+    print("\nApp factory phases:")
+    for name, seconds in profile['phases'].items():
+        print(f"- {name}: {seconds * 1000:.1f}ms")
+
+    print(f"\nTop {args.top} packages by import time:")
+    for entry in profile['packages'][:args.top]:
+        print(f"- {entry['package']}: {entry['self_ms']}ms")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(profile, f, indent=2)
+
+    if args.max_import_seconds is not None and profile['import_app_seconds'] > args.max_import_seconds:
+        print(f"\nImport time {profile['import_app_seconds']:.3f}s exceeds budget of {args.max_import_seconds}s")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
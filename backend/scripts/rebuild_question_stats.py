@@ -0,0 +1,99 @@
+# backend/scripts/rebuild_question_stats.py
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+script_dir = Path(__file__).resolve().parent
+backend_dir = script_dir.parent
+sys.path.append(str(backend_dir))
+
+os.environ.setdefault('CREATE_TABLES_ON_STARTUP', 'false')
+
+from app import app, db
+from models import Exam, ExamAttempt, ExamAttemptResult, QuestionStat, QuestionStatShard
+from attempt_results import bitmap_to_int, ordinal_index, set_ordinals
+from question_stats import merge_shards
+from backfill_attempt_results import exam_layout
+from sqlalchemy import text, insert
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def rebuild_exam(exam_id):
+    """
+    Recompute one exam's question_stat rows from every attempt, in one transaction.
+
+    The shard table is locked against writes first, so submissions and merges for the duration
+    wait instead of racing: each attempt is counted exactly once, either here or by its own
+    increment after the rebuild commits. Returns (attempts counted, attempts skipped).
+    """
+    db.session.execute(text("LOCK TABLE question_stat_shard IN SHARE ROW EXCLUSIVE MODE"))
+
+    layout = exam_layout(exam_id)
+    index = ordinal_index(layout)
+    totals = {}
+    counted = skipped = 0
+
+    attempts = db.session.query(ExamAttempt, ExamAttemptResult).outerjoin(
+        ExamAttemptResult, ExamAttemptResult.attempt_id == ExamAttempt.id
+    ).filter(ExamAttempt.exam_id == exam_id).yield_per(500)
+
+    for attempt, result in attempts:
+        if result is not None:
+            attempt_layout, wrong = result.layout, set(set_ordinals(bitmap_to_int(result.incorrect_bitmap)))
+        elif attempt.total_questions == sum(count for _, count in layout) and all(
+                question_id in index for question_id in attempt.incorrect_questions or []):
+            attempt_layout, wrong = layout, {index[question_id] for question_id in attempt.incorrect_questions or []}
+        else:
+            # Attempt stored before result bitmaps, against content that has changed since.
+            skipped += 1
+            continue
+
+        ordinal = 0
+        for topic_number, count in attempt_layout:
+            for question_number in range(1, count + 1):
+                key = (topic_number, question_number)
+                attempts_so_far, correct_so_far = totals.get(key, (0, 0))
+                totals[key] = (attempts_so_far + 1, correct_so_far + (ordinal not in wrong))
+                ordinal += 1
+        counted += 1
+
+    QuestionStatShard.query.filter_by(exam_id=exam_id).delete(synchronize_session=False)
+    QuestionStat.query.filter_by(exam_id=exam_id).delete(synchronize_session=False)
+    if totals:
+        db.session.execute(insert(QuestionStat), [
+            {'exam_id': exam_id, 'topic_number': topic_number, 'question_number': question_number,
+             'attempts': attempts_count, 'correct': correct}
+            for (topic_number, question_number), (attempts_count, correct) in sorted(totals.items())
+        ])
+    db.session.commit()
+    return counted, skipped
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild per-question difficulty stats from historical attempts, or merge pending shards.')
+    parser.add_argument('--exam', action='append', help='Only rebuild this exam id (repeatable)')
+    parser.add_argument('--merge-only', action='store_true', help='Only fold pending shard rows into question_stat')
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.merge_only:
+            merged = merge_shards(app.config['QUESTION_STATS_MERGE_BATCH'])
+            logger.info(f"Merged {merged or 0} shard rows" if merged is not None else "Another worker is merging; try again later")
+            return
+
+        exam_ids = args.exam or [exam_id for (exam_id,) in db.session.query(Exam.id).order_by(Exam.id)]
+        total_counted = total_skipped = 0
+        for exam_id in exam_ids:
+            counted, skipped = rebuild_exam(exam_id)
+            total_counted += counted
+            total_skipped += skipped
+            if counted or skipped:
+                logger.info(f"{exam_id}: {counted} attempts counted, {skipped} skipped")
+        logger.info(f"Rebuilt {len(exam_ids)} exams from {total_counted} attempts; "
+                    f"{total_skipped} attempts skipped because their exam changed")
+
+if __name__ == '__main__':
+    main()
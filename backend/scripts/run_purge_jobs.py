@@ -0,0 +1,61 @@
+# backend/scripts/run_purge_jobs.py
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+script_dir = Path(__file__).resolve().parent
+backend_dir = script_dir.parent
+sys.path.append(str(backend_dir))
+
+os.environ.setdefault('CREATE_TABLES_ON_STARTUP', 'false')
+
+from app import app, db
+from models import PurgeJob
+from purge import serialize_job
+from sqlalchemy import or_, and_
+from datetime import datetime, timedelta
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description='Run pending progress purge jobs in the foreground (e.g. after a deploy killed the workers running them).')
+    parser.add_argument('--job', help='Run only this job id')
+    parser.add_argument('--include-running', action='store_true',
+                        help='Also take over running jobs whose heartbeat is older than PURGE_STALE_SECONDS')
+    parser.add_argument('--include-failed', action='store_true',
+                        help='Also re-run jobs that gave up after PURGE_MAX_ATTEMPTS, and queued retries still backing off')
+    args = parser.parse_args()
+
+    with app.app_context():
+        queue = app.extensions['purge_queue']
+        if args.job:
+            job_ids = [args.job]
+        else:
+            stale_before = datetime.utcnow() - timedelta(seconds=app.config['PURGE_STALE_SECONDS'])
+            condition = PurgeJob.status == 'queued'
+            if args.include_running:
+                condition = or_(condition, and_(PurgeJob.status == 'running', PurgeJob.heartbeat_at < stale_before))
+            if args.include_failed:
+                condition = or_(condition, PurgeJob.status == 'failed')
+            job_ids = [job_id for (job_id,) in db.session.query(PurgeJob.id).filter(condition).order_by(PurgeJob.created_at)]
+
+        logger.info(f"{len(job_ids)} purge job(s) to run")
+        for job_id in job_ids:
+            if args.include_failed:
+                # Forget the backoff: the failure is being re-run deliberately.
+                db.session.query(PurgeJob).filter(PurgeJob.id == job_id, PurgeJob.status.in_(('queued', 'failed'))).update(
+                    {PurgeJob.status: 'queued', PurgeJob.attempts: 0}, synchronize_session=False)
+                db.session.commit()
+            if not queue.run(job_id):
+                logger.info(f"Skipped {job_id}: claimed by another worker, backing off before a retry, or already finished")
+                continue
+            db.session.expire_all()
+            job = serialize_job(db.session.get(PurgeJob, job_id))
+            logger.info(f"{job_id}: {job['status']}, rows deleted {job['rows_deleted']}")
+
+if __name__ == '__main__':
+    main()
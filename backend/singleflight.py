@@ -0,0 +1,116 @@
+# backend/singleflight.py
+"""
+Single-flight loads: concurrent callers asking for the same key while it is being loaded wait
+for that one load and share its result (or its exception) instead of each querying Postgres.
+Nothing is kept once the load finishes; the caches in front of it do that. Group is for
+threads (the Flask routes), AsyncGroup for one event loop (asgi.py).
+"""
+
+import asyncio
+import threading
+
+_registry = {}
+_observers = []
+
+class SingleFlightTimeout(TimeoutError):
+    """A waiter gave up on another caller's load; the load itself keeps running."""
+
+def add_observer(callback):
+    """Call callback(group, outcome) for every 'load', 'coalesced', 'failure' and 'timeout'."""
+    _observers.append(callback)
+
+def register_group(group):
+    """Make a group visible to health reporting, like cache.register_cache."""
+    _registry[group.name] = group
+    return group
+
+def group_stats():
+    return {name: group.stats() for name, group in _registry.items()}
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class Group:
+    """Thread-safe single-flight group."""
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.counts = {'load': 0, 'coalesced': 0, 'failure': 0, 'timeout': 0}
+
+    def _record(self, outcome):
+        with self._lock:
+            self.counts[outcome] += 1
+        for callback in _observers:
+            callback(self.name, outcome)
+
+    def do(self, key, fn, timeout=None):
+        """
+        fn() once for all concurrent callers with this key. Waiters re-raise the loader's
+        exception, or SingleFlightTimeout after timeout seconds.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if leader:
+            self._record('load')
+            try:
+                call.result = fn()
+                return call.result
+            except BaseException as e:
+                call.error = e
+                self._record('failure')
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        self._record('coalesced')
+        if not call.done.wait(timeout):
+            self._record('timeout')
+            raise SingleFlightTimeout(f"{self.name}: gave up waiting for the load of {key!r} after {timeout}s")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            return {'in_flight': len(self._calls), **self.counts}
+
+class AsyncGroup(Group):
+    """
+    Single-flight group for coroutines on one event loop. The load runs as its own task, so a
+    caller that times out or is cancelled (client gone) does not cancel it for the others;
+    fn must therefore not depend on a caller's resources, e.g. open its own session.
+    """
+
+    async def do(self, key, fn, timeout=None):
+        task = self._calls.get(key)
+        if task is None:
+            self._record('load')
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self._record('coalesced')
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            if task.done():
+                raise
+            self._record('timeout')
+            raise SingleFlightTimeout(f"{self.name}: gave up waiting for the load of {key!r} after {timeout}s")
+
+    def _finished(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Retrieve the exception even when every caller already gave up on the task.
+        if not task.cancelled() and task.exception() is not None:
+            self._record('failure')
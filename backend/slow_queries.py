@@ -0,0 +1,175 @@
+# backend/slow_queries.py
+
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from flask import request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+# Expanded IN lists: "IN (%(id_1_1)s, %(id_1_2)s, ...)" from SQLAlchemy, "IN (1, 2, 3)" from text().
+_IN_LIST = re.compile(r'\bIN \((?:\s*(?:%\([^)]+\)s|%s|\?|-?\d+(?:\.\d+)?|\'(?:[^\']|\'\')*\')\s*,?)+\)', re.IGNORECASE)
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w%)])-?\d+(?:\.\d+)?\b')
+_EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT')
+
+def normalize_sql(statement):
+    """Collapse whitespace, IN lists and inline literals so equivalent statements group together."""
+    sql = _WHITESPACE.sub(' ', statement).strip()
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _STRING_LITERAL.sub('?', sql)
+    return _NUMBER_LITERAL.sub('?', sql)
+
+def _redact_value(value):
+    if value is None or isinstance(value, (bool, int, float, datetime)):
+        return value if not isinstance(value, datetime) else value.isoformat()
+    if isinstance(value, (str, bytes)):
+        return f'<{type(value).__name__} len={len(value)}>'
+    if isinstance(value, (list, tuple)):
+        return [_redact_value(item) for item in value[:10]] + (['...'] if len(value) > 10 else [])
+    return f'<{type(value).__name__}>'
+
+def redact_parameters(parameters):
+    """Keep numbers, booleans, dates and NULLs (ids and limits); replace strings and blobs with their type and length."""
+    if isinstance(parameters, dict):
+        return {key: _redact_value(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_parameters(item) if isinstance(item, (dict, list, tuple)) else _redact_value(item) for item in parameters[:10]]
+    return _redact_value(parameters)
+
+def _explain(dbapi_connection, statement, parameters):
+    """
+    Capture the planner's EXPLAIN (FORMAT JSON) for a statement on the connection that ran it.
+    Runs inside a savepoint so a failing EXPLAIN cannot abort the caller's transaction;
+    without ANALYZE nothing is executed, including for UPDATE/DELETE.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute('SAVEPOINT slow_query_explain')
+        try:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {statement}', parameters)
+            plan = cursor.fetchone()[0]
+            cursor.execute('RELEASE SAVEPOINT slow_query_explain')
+        except Exception as e:
+            cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+            return {'error': str(e).strip()}
+        return json.loads(plan) if isinstance(plan, str) else plan
+    except Exception as e:
+        return {'error': str(e).strip()}
+    finally:
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+class SlowQueryLog:
+    """
+    Opt-in recorder for statements slower than SLOW_QUERY_THRESHOLD_MS.
+
+    Each record carries the normalized SQL, redacted parameters, the calling route, the duration
+    and, at most once per SLOW_QUERY_EXPLAIN_INTERVAL seconds per normalized statement, an
+    EXPLAIN (FORMAT JSON) plan. Records are logged and kept in a per-worker ring buffer of
+    SLOW_QUERY_BUFFER_SIZE entries, readable at /api/admin/slow-queries.
+    """
+
+    def __init__(self, app=None):
+        self.records = deque()
+        self._lock = threading.Lock()
+        self._last_explained = {}
+        self.enabled = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SLOW_QUERY_ENABLED', False)
+        app.config.setdefault('SLOW_QUERY_THRESHOLD_MS', 200)
+        app.config.setdefault('SLOW_QUERY_EXPLAIN', True)
+        app.config.setdefault('SLOW_QUERY_EXPLAIN_INTERVAL', 60)
+        app.config.setdefault('SLOW_QUERY_BUFFER_SIZE', 200)
+
+        app.extensions['slow_queries'] = self
+        self.enabled = app.config['SLOW_QUERY_ENABLED']
+        if not self.enabled:
+            return
+
+        self.threshold = app.config['SLOW_QUERY_THRESHOLD_MS'] / 1000
+        self.explain = app.config['SLOW_QUERY_EXPLAIN']
+        self.explain_interval = app.config['SLOW_QUERY_EXPLAIN_INTERVAL']
+        self.records = deque(maxlen=app.config['SLOW_QUERY_BUFFER_SIZE'])
+
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        app.logger.info(f"Slow query log enabled: threshold={app.config['SLOW_QUERY_THRESHOLD_MS']}ms")
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('slow_query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('slow_query_start')
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        if elapsed < self.threshold:
+            return
+        try:
+            self._record(conn, statement, parameters, executemany, elapsed)
+        except Exception as e:
+            logger.error(f"Failed to record slow query: {str(e)}")
+
+    def _should_explain(self, fingerprint, statement, executemany):
+        if not self.explain or executemany or not statement.lstrip().upper().startswith(_EXPLAINABLE):
+            return False
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_explained.get(fingerprint)
+            if last is not None and now - last < self.explain_interval:
+                return False
+            self._last_explained[fingerprint] = now
+            return True
+
+    def _record(self, conn, statement, parameters, executemany, elapsed):
+        fingerprint = normalize_sql(statement)
+        record = {
+            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'duration_ms': round(elapsed * 1000, 2),
+            'sql': fingerprint,
+            'parameters': redact_parameters(parameters),
+            'executemany': executemany,
+            'route': None,
+            'method': None,
+            'path': None,
+            'plan': None
+        }
+        if has_request_context():
+            record.update({'route': request.endpoint, 'method': request.method, 'path': request.path})
+
+        if self._should_explain(fingerprint, statement, executemany):
+            record['plan'] = _explain(conn.connection.dbapi_connection, statement, parameters)
+
+        with self._lock:
+            self.records.append(record)
+
+        logger.warning(
+            f"Slow query {record['duration_ms']}ms in {record['route'] or 'background'}: {fingerprint[:500]}"
+        )
+
+    def snapshot(self, limit=None, route=None):
+        """Most recent records first, optionally filtered by route (endpoint name)."""
+        with self._lock:
+            records = list(self.records)
+        records.reverse()
+        if route:
+            records = [record for record in records if record['route'] == route]
+        return records[:limit] if limit else records
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+            self._last_explained.clear()
@@ -0,0 +1,54 @@
+# backend/startup.py
+
+import threading
+import time
+from contextlib import contextmanager
+
+# Captured on first import, which happens at the very top of app.py, so it is
+# the closest cheap approximation of "process started loading the app".
+PROCESS_START = time.perf_counter()
+
+class StartupTimer:
+    """Records app-factory phase timings and time to the first served request."""
+
+    def __init__(self):
+        self.phases = []
+        self.ready_at = None
+        self.first_request_at = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def mark_ready(self):
+        self.ready_at = time.perf_counter()
+
+    def mark_first_request(self):
+        """Record the first request once; returns True only for the caller that recorded it."""
+        if self.first_request_at is not None:
+            return False
+        with self._lock:
+            if self.first_request_at is not None:
+                return False
+            self.first_request_at = time.perf_counter()
+            return True
+
+    @property
+    def seconds_to_ready(self):
+        return self.ready_at - PROCESS_START if self.ready_at else None
+
+    @property
+    def seconds_to_first_request(self):
+        return self.first_request_at - PROCESS_START if self.first_request_at else None
+
+    def summary(self):
+        return {
+            'phases': {name: round(seconds, 4) for name, seconds in self.phases},
+            'seconds_to_ready': round(self.seconds_to_ready, 4) if self.ready_at else None,
+            'seconds_to_first_request': round(self.seconds_to_first_request, 4) if self.first_request_at else None
+        }
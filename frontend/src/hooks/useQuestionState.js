@@ -1,10 +1,16 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { fetchWithAuth } from '../utils/api';
 
 const useQuestionState = (currentExam, API_URL) => {
   const [userAnswers, setUserAnswers] = useState({});
   const [favoriteQuestions, setFavoriteQuestions] = useState([]);
   const [incorrectQuestions, setIncorrectQuestions] = useState([]);
+  // What a submission may rely on: the latest selections (also before their save returns), the
+  // saves still in flight, and the questions whose latest save failed.
+  const answersRef = useRef({});
+  const pendingSaves = useRef(new Set());
+  const failedSaves = useRef(new Set());
+  const saveSequence = useRef({});
 
   // Fetch all user data when exam changes
   useEffect(() => {
@@ -22,6 +28,8 @@ const useQuestionState = (currentExam, API_URL) => {
           answersMap[`T${answer.topic_number} Q${answer.question_index + 1}`] = 
             answer.selected_options;
         });
+        answersRef.current = answersMap;
+        failedSaves.current = new Set();
         setUserAnswers(answersMap);
 
         // Fetch favorites
@@ -55,45 +63,97 @@ const useQuestionState = (currentExam, API_URL) => {
 
   const saveAnswer = async (topicNumber, questionIndex, selectedOptions) => {
     const questionId = `T${topicNumber} Q${questionIndex + 1}`;
-    
-    try {
-      await fetchWithAuth(`${API_URL}/api/save-answer`, {
+    const sequence = (saveSequence.current[questionId] || 0) + 1;
+    saveSequence.current[questionId] = sequence;
+    answersRef.current = { ...answersRef.current, [questionId]: selectedOptions };
+    setUserAnswers(answersRef.current);
+
+    // The outcome is recorded inside the promise, so whoever awaits it sees it recorded.
+    const save = (async () => {
+      let saved = false;
+      try {
+        const response = await fetchWithAuth(`${API_URL}/api/save-answer`, {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+          },
+          body: JSON.stringify({
+            exam_id: currentExam,
+            topic_number: topicNumber,
+            question_index: questionIndex,
+            selected_options: selectedOptions,
+          }),
+        });
+        saved = Boolean(response && response.ok);
+      } catch (error) {
+        console.error('Error saving answer:', error);
+      }
+      // An older save finishing late says nothing about the answer the user last picked.
+      if (saveSequence.current[questionId] === sequence) {
+        if (saved) {
+          failedSaves.current.delete(questionId);
+        } else {
+          console.error(`Error saving answer: ${questionId} was not saved`);
+          failedSaves.current.add(questionId);
+        }
+      }
+      pendingSaves.current.delete(save);
+      return saved;
+    })();
+
+    pendingSaves.current.add(save);
+    return save;
+  };
+
+  // The Idempotency-Key lets a request retried after a network error, or after the server
+  // shed it with a 503, return the original result instead of recording a second attempt.
+  const postSubmission = async (body, idempotencyKey) => {
+    const send = () =>
+      fetchWithAuth(`${API_URL}/api/submit-answers`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'Idempotency-Key': idempotencyKey,
         },
-        body: JSON.stringify({
-          exam_id: currentExam,
-          topic_number: topicNumber,
-          question_index: questionIndex,
-          selected_options: selectedOptions,
-        }),
+        body: JSON.stringify(body),
       });
-
-      setUserAnswers(prev => ({
-        ...prev,
-        [questionId]: selectedOptions
-      }));
+    let response;
+    try {
+      response = await send();
     } catch (error) {
-      console.error('Error saving answer:', error);
+      return send();
     }
+    if (response.status === 503 && response.headers.get('Retry-After')) {
+      const seconds = Math.min(Number(response.headers.get('Retry-After')) || 1, 10);
+      await new Promise((resolve) => setTimeout(resolve, seconds * 1000));
+      return send();
+    }
+    return response;
   };
 
   const handleExamSubmission = async () => {
     try {
-      const response = await fetchWithAuth(
-        `${API_URL}/api/submit-answers`,
-        {
-          method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-          },
-          body: JSON.stringify({
+      const submissionId = crypto.randomUUID();
+      // Submit from the server's stored tally only when it holds every answer: wait for the
+      // saves still in flight, and upload the full answer map if any of them failed or if the
+      // stored submission does.
+      await Promise.all([...pendingSaves.current]);
+      let response = null;
+      if (failedSaves.current.size === 0) {
+        response = await postSubmission(
+          { exam_id: currentExam, mode: 'stored' },
+          `${submissionId}-stored`
+        );
+      }
+      if (!response || !response.ok) {
+        response = await postSubmission(
+          {
             exam_id: currentExam,
-            user_answers: userAnswers,
-          }),
-        }
-      );
+            user_answers: answersRef.current,
+          },
+          `${submissionId}-payload`
+        );
+      }
 
       if (!response.ok) {
         const errorData = await response.json();
@@ -1,11 +1,29 @@
 // src/utils/api.js
 
+// Signed "<user_id>:<until ms>" the backend sends after a write; echoing it back keeps this
+// user's reads on the primary database until then, whichever backend pod serves them.
+const READ_YOUR_WRITES_HEADER = 'X-Read-Your-Writes';
+const READ_YOUR_WRITES_KEY = 'readYourWrites';
+
+const readYourWritesPin = () => {
+  const pin = localStorage.getItem(READ_YOUR_WRITES_KEY);
+  if (!pin) return null;
+  const until = Number(pin.split('.')[0].split(':')[1]);
+  if (!(until > Date.now())) {
+    localStorage.removeItem(READ_YOUR_WRITES_KEY);
+    return null;
+  }
+  return pin;
+};
+
 export const fetchWithAuth = async (url, options = {}) => {
+  const pin = readYourWritesPin();
   const headers = {
     'Content-Type': 'application/json',
     ...(localStorage.getItem('token') && {
       'Authorization': `Bearer ${localStorage.getItem('token')}`
-    })
+    }),
+    ...(pin && { [READ_YOUR_WRITES_HEADER]: pin })
   };
 
   try {
@@ -19,10 +37,16 @@ export const fetchWithAuth = async (url, options = {}) => {
     
     if (response.status === 401) {
       localStorage.removeItem('token');
+      localStorage.removeItem(READ_YOUR_WRITES_KEY);
       window.location.href = '/auth';
       return;
     }
     
+    const newPin = response.headers.get(READ_YOUR_WRITES_HEADER);
+    if (newPin) {
+      localStorage.setItem(READ_YOUR_WRITES_KEY, newPin);
+    }
+    
     return response;
   } catch (error) {
     console.error('API Error:', error);